@@ -1,4 +1,6 @@
 from PyQt5 import QtWidgets, QtGui, QtCore
+from PyQt5.QtWidgets import QMessageBox
+from src_physics.value_converter import ValueConverter
 import sys
 
 class CustomMessageBox(QtWidgets.QDialog):
@@ -30,3 +32,38 @@ class CustomMessageBox(QtWidgets.QDialog):
         main_layout.addWidget(button_box)
 
         self.setLayout(main_layout)
+
+
+class GuiValueConverter(ValueConverter):
+    """
+    ValueConverter for the GUI: invalid input opens an error dialog with a
+    delay of one second, so that typing into a field does not interrupt.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._error_timer = QtCore.QTimer()
+        self._error_timer.setSingleShot(True)
+        self._error_timer.timeout.connect(self._show_delayed_error)
+        self._pending_error = None
+        self._pending_parent = None
+
+    def report_error(self, value, parent=None):
+        super().report_error(value, parent)
+        self._pending_error = value
+        self._pending_parent = parent
+        self._error_timer.start(1000)
+
+    def _show_delayed_error(self):
+        if self._pending_error is not None:
+            QMessageBox.critical(
+                self._pending_parent,
+                "Error",
+                f"Unknown or invalid value: {self._pending_error}. Please enter a valid number with unit (e.g. '3.5 mm', '1.2 µm')."
+            )
+            self._pending_error = None
+            self._pending_parent = None
+
+    def _cancel_error(self):
+        self._error_timer.stop()
+        self._pending_error = None
+        self._pending_parent = None
@@ -17,6 +17,7 @@ import json
 import pyqtgraph as pg
 import numpy as np
 import copy, time
+import logging
 
 # Custom module imports
 from src_resonator.resonators import Resonator
@@ -25,11 +26,12 @@ from src_libraries.select_items import ItemSelector
 from src_modematcher.modematcher_parameters import ModematcherParameters
 from src_physics.beam import Beam
 from src_physics.matrices import Matrices
-from src_physics.value_converter import ValueConverter
+from src_physics.optical_system import (OpticalSystem, FREE_SPACE, LENS, MIRROR_SAGITTAL,
+                                        MIRROR_TANGENTIAL, CURVED_INTERFACE, ABCD)
 from GUI.actions import Action
 from GUI.setupList import SetupList
 from GUI.componentList import ComponentList
-from GUI.errorHandler import CustomMessageBox
+from GUI.errorHandler import CustomMessageBox, GuiValueConverter
 from src_physics.material import Material
 from GUI.optical_plotter import OpticalSystemPlotter
 
@@ -50,6 +52,9 @@ class PlotWorker(QObject):
         )
         self.finished.emit((z_data, w_data, z_setup))
 
+logger = logging.getLogger(__name__)
+
+
 class MainWindow(QMainWindow):
     """
     Main application window class.
@@ -85,7 +90,7 @@ class MainWindow(QMainWindow):
         self.item_selector_res = ItemSelector(self)
         self.matrices = Matrices()
         self.beam = Beam()
-        self.vc = ValueConverter()
+        self.vc = GuiValueConverter()
         self.action = Action()
         self.material = Material
 
@@ -201,29 +206,16 @@ class MainWindow(QMainWindow):
                 mousePoint = self.plotWidget.getViewBox().mapSceneToView(pos)
                 z = mousePoint.x()
                 self.cursor_vline.setPos(z)
-                idx = np.searchsorted(self.optical_plotter.z_data, z)
-                if idx == 0:
-                    z_val = self.optical_plotter.z_data[0]
-                    w_sag_val = self.optical_plotter.w_sag_data[0]
-                    w_tan_val = self.optical_plotter.w_tan_data[0]
-                elif idx == len(self.optical_plotter.z_data):
-                    z_val = self.optical_plotter.z_data[-1]
-                    w_sag_val = self.optical_plotter.w_sag_data[-1]
-                    w_tan_val = self.optical_plotter.w_tan_data[-1]
-                else:
-                    # Interpolation zwischen idx-1 und idx
-                    z0, z1 = self.optical_plotter.z_data[idx-1], self.optical_plotter.z_data[idx]
-                    w0_sag, w1_sag = self.optical_plotter.w_sag_data[idx-1], self.optical_plotter.w_sag_data[idx]
-                    w0_tan, w1_tan = self.optical_plotter.w_tan_data[idx-1], self.optical_plotter.w_tan_data[idx]
-                    t = (z - z0) / (z1 - z0) if z1 != z0 else 0
-                    z_val = z
-                    w_sag_val = w0_sag + t * (w1_sag - w0_sag)
-                    w_tan_val = w0_tan + t * (w1_tan - w0_tan)
-                self.ui.label_z_position.setText(f"{self.vc.convert_to_nearest_string(z_val, self)}")
-                self.ui.label_w_sag.setText(f"{self.vc.convert_to_nearest_string(w_sag_val, self)}")
-                self.ui.label_w_tan.setText(f"{self.vc.convert_to_nearest_string(w_tan_val, self)}")
-                self.ui.label_roc_sag.setText(f"{self.vc.convert_to_nearest_string(self.beam.radius_of_curvature(z_val, w_sag_val, self.wavelength))}")
-                self.ui.label_roc_tan.setText(f"{self.vc.convert_to_nearest_string(self.beam.radius_of_curvature(z_val, w_tan_val, self.wavelength))}")
+                profile_sag = self.optical_plotter.profile_sag
+                profile_tan = self.optical_plotter.profile_tan
+                if profile_sag is None or profile_tan is None:
+                    return
+                # Exakte Werte aus den gecachten Strahlprofilen statt Interpolation
+                self.ui.label_z_position.setText(f"{self.vc.convert_to_nearest_string(z, self)}")
+                self.ui.label_w_sag.setText(f"{self.vc.convert_to_nearest_string(float(profile_sag.w(z)), self)}")
+                self.ui.label_w_tan.setText(f"{self.vc.convert_to_nearest_string(float(profile_tan.w(z)), self)}")
+                self.ui.label_roc_sag.setText(f"{self.vc.convert_to_nearest_string(float(profile_sag.radius_of_curvature(z)))}")
+                self.ui.label_roc_tan.setText(f"{self.vc.convert_to_nearest_string(float(profile_tan.radius_of_curvature(z)))}")
                 
         # Connect signal to function
         self.plotWidget.scene().sigMouseMoved.connect(mouseMoved)
@@ -511,8 +503,8 @@ class MainWindow(QMainWindow):
 
             elif key == "Lens material":
                 field = QtWidgets.QComboBox()
-                field.addItems(["NBK7", "Fused Silica"])
-                if value in ["NBK7", "Fused Silica"]:
+                field.addItems(Material.names())
+                if value in Material.names():
                     field.setCurrentText(value)
                 layout.addWidget(field, row, 1)
                 self._property_fields[key] = field
@@ -791,7 +783,10 @@ class MainWindow(QMainWindow):
     def build_optical_system_from_setup_list(self, mode="sagittal"):
         """
         Builds the optical system from the components in setupList.
-        Returns a list of (matrix_function, parameters).
+        Returns a compiled OpticalSystem for the given plane.
+
+        Raises:
+            ValueError: If a component has missing or non-numeric parameters.
         """
         optical_system = []
         for i in range(self.setupList.count()):
@@ -809,13 +804,13 @@ class MainWindow(QMainWindow):
             elif ctype == "PROPAGATION" and component.get("name", "").strip().lower() == "propagation":
                 length = props.get("Length", 0.1)
                 n = props.get("Refractive index", 1.0)
-                optical_system.append((self.matrices.free_space, (length, n)))
+                optical_system.append((FREE_SPACE, (length, n)))
                 
             elif ctype == "LENS":
                 material = props.get("Lens material", "NBK7")
                 lambda_design = props.get("Design wavelength", 514e-9)
-                n_design = self.material.get_n(material, lambda_design)
-                n = self.material.get_n(material, self.wavelength)
+                n_design = self.get_refractive_index(material, lambda_design)
+                n = self.get_refractive_index(material, self.wavelength)
                 is_plane = self._to_bool(props.get("Plan lens", False))
                 is_round = props.get("IS_ROUND", False)
                 
@@ -901,17 +896,17 @@ class MainWindow(QMainWindow):
                             )
                             self._property_fields["Radius of curvature tangential"].blockSignals(False)
                     
-                optical_system.append((self.matrices.lens, (f_actual,)))
+                optical_system.append((LENS, (f_actual,)))
                 
             elif ctype == "MIRROR":
                 if mode == "sagittal":
                     r = props.get("Radius of curvature sagittal")
                     theta = props.get("Angle of incidence")
-                    optical_system.append((self.matrices.curved_mirror_sagittal, (r, theta,)))
+                    optical_system.append((MIRROR_SAGITTAL, (r, theta,)))
                 else:
                     r = props.get("Radius of curvature tangential")
                     theta = props.get("Angle of incidence")
-                    optical_system.append((self.matrices.curved_mirror_tangential, (r, theta,)))
+                    optical_system.append((MIRROR_TANGENTIAL, (r, theta,)))
                     
             elif ctype == "ABCD":
                 if mode == "sagittal":
@@ -919,13 +914,13 @@ class MainWindow(QMainWindow):
                     B = props.get("B sagittal")
                     C = props.get("C sagittal")
                     D = props.get("D sagittal")
-                    optical_system.append((self.matrices.ABCD, (A, B, C, D, )))
+                    optical_system.append((ABCD, (A, B, C, D, )))
                 else:
                     A = props.get("A tangential")
                     B = props.get("B tangential")
                     C = props.get("C tangential")
                     D = props.get("D tangential")
-                    optical_system.append((self.matrices.ABCD, (A, B, C, D, )))
+                    optical_system.append((ABCD, (A, B, C, D, )))
                     
             elif ctype == "THICK LENS":
                 n_in = 1  # Default
@@ -947,24 +942,41 @@ class MainWindow(QMainWindow):
                             n_out = next_component.get("properties", {}).get("Refractive index", 1)
                             break
                 material = props.get("Lens material")
-                n_lens = self.material.get_n(material, self.wavelength)
+                n_lens = self.get_refractive_index(material, self.wavelength)
                 thickness = props.get("Thickness", 0.01)
                 if mode == "sagittal":
                     r_in_sag = props.get("Input radius of curvature sagittal", 0.1)
                     r_out_sag = props.get("Output radius of curvature sagittal", 0.1)
-                    optical_system.append((self.matrices.refraction_curved_interface, (r_in_sag, n_in, n_lens)))
-                    optical_system.append((self.matrices.free_space, (thickness, n_lens)))
-                    optical_system.append((self.matrices.refraction_curved_interface, (-r_out_sag, n_lens, n_out)))
+                    optical_system.append((CURVED_INTERFACE, (r_in_sag, n_in, n_lens)))
+                    optical_system.append((FREE_SPACE, (thickness, n_lens)))
+                    optical_system.append((CURVED_INTERFACE, (-r_out_sag, n_lens, n_out)))
                 else:
                     r_in_tan = props.get("Input radius of curvature tangential", 0.1)
                     r_out_tan = props.get("Output radius of curvature tangential", 0.1)
-                    optical_system.append((self.matrices.refraction_curved_interface, (r_in_tan, n_in, n_lens)))
-                    optical_system.append((self.matrices.free_space, (thickness, n_lens)))
-                    optical_system.append((self.matrices.refraction_curved_interface, (-r_out_tan, n_lens, n_out)))
+                    optical_system.append((CURVED_INTERFACE, (r_in_tan, n_in, n_lens)))
+                    optical_system.append((FREE_SPACE, (thickness, n_lens)))
+                    optical_system.append((CURVED_INTERFACE, (-r_out_tan, n_lens, n_out)))
 
             # ... weitere Typen ...
-        return optical_system
+        return OpticalSystem(optical_system, plane=mode)
     
+    def get_refractive_index(self, material, wavelength):
+        """
+        Refractive index from the material catalog, falls back to air for
+        unknown materials. Runs on every replot, so each unknown material is
+        reported only once (log and status bar) instead of with a dialog.
+        """
+        try:
+            return self.material.get_n(material, wavelength)
+        except ValueError as e:
+            if not hasattr(self, "_reported_materials"):
+                self._reported_materials = set()
+            if material not in self._reported_materials:
+                self._reported_materials.add(material)
+                logger.warning("%s Using n = 1.0.", e)
+                self.statusBar().showMessage(f"{e} Using n = 1.0.")
+            return 1.0
+
     def save_properties_to_component(self, component):
         """Save current field values to the given component."""
         # Verhindere rekursive Aufrufe
@@ -2,6 +2,7 @@ import numpy as np
 import pyqtgraph as pg
 from pyqtgraph import LinearRegionItem
 import copy
+import time
 
 from PyQt5.QtCore import Qt
 
@@ -25,11 +26,17 @@ class OpticalSystemPlotter:
         self.n = None
         self.optical_system_sag = None
         self.optical_system_tan = None
+        self.profile_sag = None
+        self.profile_tan = None
         self.z_data = None
         self.w_sag_data = None
         self.w_tan_data = None
         self.z_visible = None
 
+        # Zeitpunkt des ersten fertigen Plots (Startzeitmessung), on_first_plot wird dann aufgerufen
+        self.first_plot_time = None
+        self.on_first_plot = None
+
     def update_live_plot(self, main_window):
         """Update the live plot based on current setup"""
         if main_window._plot_busy:
@@ -45,8 +52,12 @@ class OpticalSystemPlotter:
                 updated_beam = main_window.save_properties_to_component(beam_item.data(Qt.UserRole))
                 if updated_beam is not None:
                     beam_item.setData(Qt.UserRole, updated_beam)
-            optical_system_sag = main_window.build_optical_system_from_setup_list(mode="sagittal")
-            optical_system_tan = main_window.build_optical_system_from_setup_list(mode="tangential")
+            # Kompilierte Systeme einmal pro Änderung bauen, Plot und Cursor teilen sie
+            try:
+                optical_system_sag = main_window.build_optical_system_from_setup_list(mode="sagittal")
+                optical_system_tan = main_window.build_optical_system_from_setup_list(mode="tangential")
+            except ValueError:
+                return
             # Hole Startparameter aus dem Beam (immer an Position 0)
             beam_item = main_window.setupList.item(0)
             beam = beam_item.data(Qt.UserRole)
@@ -84,6 +95,17 @@ class OpticalSystemPlotter:
         self.n = n
         self.optical_system_sag = optical_system_sag
         self.optical_system_tan = optical_system_tan
+
+        # Präfixprodukte und q an den Elementgrenzen einmal pro Änderung berechnen
+        self.profile_sag = None
+        self.profile_tan = None
+        try:
+            q_sag = self.beam.q_value(z_start_sag, waist_sag, wavelength, n)
+            q_tan = self.beam.q_value(z_start_tan, waist_tan, wavelength, n)
+            self.profile_sag = self.beam.profile(optical_system_sag, q_sag, wavelength, n)
+            self.profile_tan = self.beam.profile(optical_system_tan, q_tan, wavelength, n)
+        except Exception:
+            pass
         
         self.curve_sag = None
         self.curve_tan = None
@@ -94,38 +116,33 @@ class OpticalSystemPlotter:
         if not np.isfinite(z_min) or not np.isfinite(z_max) or z_min == z_max:
             # Fallback: Bereich aus optischem System bestimmen
             z_min = 0
-            z_max = sum([p[1][0] for p in optical_system_sag if hasattr(p[0], "__func__") and p[0].__func__ is self.matrices.free_space.__func__])
+            z_max = optical_system_sag.total_length
 
         self.update_plot_for_visible_range(z_min, z_max)
 
+        if self.first_plot_time is None:
+            self.first_plot_time = time.perf_counter()
+            if self.on_first_plot is not None:
+                self.on_first_plot()
+
     def update_plot_for_visible_range(self, *args, **kwargs):
         """Update plot for the currently visible range"""
         z_min, z_max = self.plotWidget.getViewBox().viewRange()[0]
         if not np.isfinite(z_min) or not np.isfinite(z_max) or z_min == z_max:
             z_min = 0
-            z_max = sum([p[1][0] for p in self.optical_system_sag
-                        if hasattr(p[0], "__func__") and p[0].__func__ is self.matrices.free_space.__func__])
+            z_max = self.optical_system_sag.total_length
         
         n_points = 2000
         self.z_visible = np.linspace(z_min, z_max, n_points)
 
-        # Hole gespeicherte Parameter
-        wavelength = self.wavelength
-        waist_sag = self.waist_sag
-        waist_tan = self.waist_tan
-        waist_pos_sag = self.waist_pos_sag
-        waist_pos_tan = self.waist_pos_tan
-        n = self.n
         optical_system_sag = self.optical_system_sag
-        optical_system_tan = self.optical_system_tan
         self.vb = self.plotWidget.getViewBox()
 
-        # q-Werte berechnen und propagieren
-        q_sag = self.beam.q_value(waist_pos_sag, waist_sag, wavelength, n)
-        q_tan = self.beam.q_value(waist_pos_tan, waist_tan, wavelength, n)
+        # Gecachte Strahlprofile an den sichtbaren Positionen auswerten
+        z_setup = optical_system_sag.total_length
         try:
-            self.z_data, self.w_sag_data, z_setup = self.beam.propagate_through_system(wavelength, q_sag, optical_system_sag, self.z_visible, n_points, n=n)
-            self.z_data, self.w_tan_data, z_setup = self.beam.propagate_through_system(wavelength, q_tan, optical_system_tan, self.z_visible, n_points, n=n)
+            self.z_data, self.w_sag_data = self.profile_sag.sample(self.z_visible)
+            self.z_data, self.w_tan_data = self.profile_tan.sample(self.z_visible)
             self.z_setup = z_setup
         except Exception:
             self.vb.setXRange(0, 1, padding=0.02)
@@ -167,14 +184,10 @@ class OpticalSystemPlotter:
         for vline in getattr(self, "vlines", []):
             self.plotWidget.removeItem(vline)
         self.vlines = []
-        z_element = 0
-        for idx, (element, param) in enumerate(optical_system_sag):
-            if hasattr(element, "__func__") and element.__func__ is self.matrices.free_space.__func__:
-                z_element += param[0]
-            else:
-                vline = pg.InfiniteLine(pos=z_element, angle=90, pen=pg.mkPen(width=2, color="#FF0000"))
-                self.plotWidget.addItem(vline)
-                self.vlines.append(vline)
+        for z_element in optical_system_sag.element_positions():
+            vline = pg.InfiniteLine(pos=z_element, angle=90, pen=pg.mkPen(width=2, color="#FF0000"))
+            self.plotWidget.addItem(vline)
+            self.vlines.append(vline)
 
     def scale_visible_setup(self):
         """Scale the visible setup elements to the current view"""
@@ -0,0 +1,82 @@
+"""
+Evaluations-to-target of the optimizer backends on the four resonator types.
+
+Every backend gets the same evaluation budget per run. The target of a
+resonator type is the best fitness any run reached plus TARGET_GAP, a run
+counts as success when its best fitness drops below the target.
+
+Run from the repository root:
+    python -m benchmarks.bench_backends
+"""
+from dataclasses import replace
+import numpy as np
+from src_resonator.settings import OptimizationSettings
+from src_resonator.swarm import build_optimizer
+
+JOB = {
+    "mirrors": "Library/Mirrors.json",
+    "target_sag": "21 µm",
+    "target_tan": "577 µm",
+    "wavelength": "514 nm",
+    "crystal_length": "10 mm",
+    "crystal_index": 1.675,
+    "bounds": {
+        "l1": ["40 mm", "100 mm"],
+        "l2": ["40 mm", "150 mm"],
+        "l3": ["50 mm", "150 mm"],
+        "theta": [0, 60],
+    },
+}
+RESONATOR_TYPES = ("BowTie", "FabryPerot", "Triangle", "Rectangle")
+# Populationsgrößen pro Backend, jeweils eine kleine und die übliche
+POPULATIONS = {
+    "Vectorized": (50, 300),
+    "CMA-ES": (12, 48),
+    "Differential evolution": (20, 60),
+}
+BUDGET = 30000
+SEEDS = range(10)
+TARGET_GAP = 0.01
+
+
+def histories(settings, population):
+    """Best fitness per evaluation count, one row per seed"""
+    settings = replace(settings, population_number=population)
+    generations = BUDGET // population
+    rows = []
+    for seed in SEEDS:
+        optimizer = build_optimizer(settings, np.random.default_rng(seed))
+        _, _, history, _ = optimizer.run(generations)
+        rows.append(history)
+    return np.array(rows)
+
+
+def evaluations_to_target(rows, population, target):
+    """Evaluations until each run reached the target, None for runs that did not"""
+    result = []
+    for history in rows:
+        reached = np.flatnonzero(history <= target)
+        result.append(int((reached[0] + 1) * population) if len(reached) else None)
+    return result
+
+
+def main():
+    print(f"{'type':<11} {'engine':<23} {'pop':>4} {'success':>8} {'median evals':>13} {'median best':>12}")
+    for resonator_type in RESONATOR_TYPES:
+        base = OptimizationSettings.from_job({**JOB, "resonator_type": resonator_type})
+        results = {}
+        for engine, populations in POPULATIONS.items():
+            for population in populations:
+                results[engine, population] = histories(replace(base, engine=engine), population)
+        target = min(rows[:, -1].min() for rows in results.values()) + TARGET_GAP
+
+        for (engine, population), rows in results.items():
+            evaluations = evaluations_to_target(rows, population, target)
+            done = [e for e in evaluations if e is not None]
+            median = f"{np.median(done):13.0f}" if done else f"{'-':>13}"
+            print(f"{resonator_type:<11} {engine:<23} {population:>4} {len(done):>4}/{len(evaluations):<3} "
+                  f"{median} {np.median(rows[:, -1]):12.4g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Expected running time to a target fitness with and without the stability
+screen (settings.stability_screening), vectorized PSO.
+
+The targets of a resonator type are the median and the best final fitness
+of the unscreened runs. The expected running time (ERT) is the wall time
+of all runs until they reached the target or ended, divided by the number
+of runs that reached it, i.e. the mean time to the target with restarts.
+All runs of one setting share a process and its stability screen, as
+the runs of a job do, timings of the fastest of REPEATS identical passes.
+
+Run from the repository root:
+    python -m benchmarks.bench_screening
+"""
+import time
+from dataclasses import replace
+import numpy as np
+from src_physics.jit_cache import warm_up
+from src_resonator.settings import OptimizationSettings
+from src_resonator.swarm import build_optimizer
+
+JOB = {
+    "mirrors": "Library/Mirrors.json",
+    "target_sag": "21 µm",
+    "target_tan": "577 µm",
+    "wavelength": "514 nm",
+    "crystal_length": "10 mm",
+    "crystal_index": 1.675,
+    "bounds": {
+        "l1": ["40 mm", "100 mm"],
+        "l2": ["40 mm", "150 mm"],
+        "l3": ["50 mm", "150 mm"],
+        "theta": [0, 60],
+    },
+}
+RESONATOR_TYPES = ("BowTie", "FabryPerot", "Triangle", "Rectangle")
+POPULATION = 300
+GENERATIONS = 150
+SEEDS = range(20)
+# Wiederholungen jedes Durchgangs über alle Seeds, gewertet wird der schnellste
+REPEATS = 3
+
+
+def timed_runs(settings):
+    """
+    One run per seed, starting with an empty stability screen.
+
+    Returns:
+        tuple: (best fitness per generation, seconds after each generation), one row per seed
+    """
+    OptimizationSettings.stability_screen.cache_clear()
+    histories, times = [], []
+    for seed in SEEDS:
+        row = []
+        t_start = time.perf_counter()
+        optimizer = build_optimizer(settings, np.random.default_rng(seed))
+        _, _, history, _ = optimizer.run(GENERATIONS, lambda gen, opt: row.append(time.perf_counter() - t_start))
+        histories.append(history)
+        times.append(row)
+    return np.array(histories), np.array(times)
+
+
+def expected_running_time(histories, times, target):
+    """Wall time of all runs until the target or their end per run that reached the target, inf without any"""
+    spent, successes = 0.0, 0
+    for history, row in zip(histories, times):
+        reached = np.flatnonzero(history <= target)
+        spent += row[reached[0]] if len(reached) else row[-1]
+        successes += len(reached) > 0
+    return spent / successes if successes else np.inf
+
+
+def main():
+    warm_up()
+    print(f"{'type':<11} {'screen':<6} {'s/run':>6} {'median best':>12} {'target':>8} {'ERT':>8}  {'target':>8} {'ERT':>8}")
+    for resonator_type in RESONATOR_TYPES:
+        base = replace(OptimizationSettings.from_job({**JOB, "resonator_type": resonator_type}),
+                       population_number=POPULATION)
+        results = {}
+        for screening in (False, True):
+            passes = [timed_runs(replace(base, stability_screening=screening)) for _ in range(REPEATS)]
+            results[screening] = min(passes, key=lambda run: run[1][:, -1].sum())
+        unscreened = results[False][0][:, -1]
+        targets = (np.median(unscreened), np.min(unscreened))
+        for screening, (histories, times) in results.items():
+            columns = "  ".join(f"{target:8.4g} {expected_running_time(histories, times, target):7.3f}s"
+                                for target in targets)
+            print(f"{resonator_type:<11} {'on' if screening else 'off':<6} {times[:, -1].mean():6.3f} "
+                  f"{np.median(histories[:, -1]):12.4g} {columns}")
+
+
+if __name__ == "__main__":
+    main()
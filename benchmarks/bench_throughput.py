@@ -0,0 +1,222 @@
+"""
+Throughput, time-to-target and peak memory of the resonator optimization.
+
+Covers the four resonator types with the shipped Library/Mirrors.json and
+synthetic mirror catalogs, the vectorized PSO at several population sizes
+and the scalar objective that Resonator.objective calls per DEAP particle.
+All random streams have fixed seeds. The results are written as JSON, a
+previous result file can be given as baseline to print the speedups.
+
+Run from the repository root:
+    python -m benchmarks.bench_throughput [-o FILE] [--baseline FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from dataclasses import replace
+from datetime import datetime, timezone
+import numba
+import numpy as np
+from src_physics.jit_cache import warm_up
+from src_resonator.settings import OptimizationSettings
+from src_resonator.swarm import build_optimizer
+
+JOB = {
+    "mirrors": "Library/Mirrors.json",
+    "target_sag": "21 µm",
+    "target_tan": "577 µm",
+    "wavelength": "514 nm",
+    "crystal_length": "10 mm",
+    "crystal_index": 1.675,
+    "bounds": {
+        "l1": ["40 mm", "100 mm"],
+        "l2": ["40 mm", "150 mm"],
+        "l3": ["50 mm", "150 mm"],
+        "theta": [0, 60],
+    },
+}
+RESONATOR_TYPES = ("BowTie", "FabryPerot", "Triangle", "Rectangle")
+# Anzahl Spiegel der synthetischen Kataloge, zusätzlich zu Library/Mirrors.json
+SYNTHETIC_CATALOGS = (1000, 5000)
+POPULATIONS = (50, 300, 1000)
+GENERATIONS = 100
+# Zielfitness für time-to-target, FabryPerot erreicht sie mit der Zieltaille nie (ca. 0.96)
+TARGET_FITNESS = 0.25
+SEED = 0
+# Wiederholungen jeder Messung mit gleichem Seed, gewertet wird die schnellste
+REPEATS = 3
+OPTIMIZER = {"engine": "Vectorized", "seed": SEED}
+# Partikel für die Messung der skalaren Zielfunktion
+SCALAR_EVALUATIONS = 2000
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "throughput.json")
+
+
+def synthetic_catalog(count, seed=SEED):
+    """
+    Mirror catalog in the format of load_mirror_curvatures: round mirrors
+    with log-uniform radii between 25 mm and 2 m or plane, cylindrical
+    mirrors with both orientations.
+
+    Returns:
+        tuple: count (r_sag, r_tan, is_round) tuples
+    """
+    rng = np.random.default_rng(seed)
+    catalog = []
+    while len(catalog) < count:
+        radius = 1e30 if rng.random() < 0.05 else float(np.exp(rng.uniform(np.log(0.025), np.log(2.0))))
+        if rng.random() < 0.8:
+            catalog.append((radius, radius, 1.0))
+        else:
+            catalog.extend(((1e30, radius, 0.0), (radius, 1e30, 0.0)))
+    return tuple(catalog[:count])
+
+
+def catalogs(base):
+    """Mirror catalogs by name, the shipped library first"""
+    result = {"Mirrors.json": base.mirror_curvatures}
+    for count in SYNTHETIC_CATALOGS:
+        result[f"synthetic-{count}"] = synthetic_catalog(count)
+    return result
+
+
+def scalar_throughput(settings):
+    """Evaluations per second of settings.objective, the per-particle path of the DEAP engine"""
+    lower, upper, discrete = settings.swarm_bounds()
+    rng = np.random.default_rng(SEED)
+    particles = rng.uniform(lower, upper, (SCALAR_EVALUATIONS, len(lower)))
+    particles = [list(p) for p in np.where(discrete, np.rint(particles), particles)]
+    settings.objective(particles[0])
+    seconds = []
+    for _ in range(REPEATS):
+        t_start = time.perf_counter()
+        for particle in particles:
+            settings.objective(particle)
+        seconds.append(time.perf_counter() - t_start)
+    return SCALAR_EVALUATIONS / min(seconds)
+
+
+def timed_run(settings):
+    """
+    One seeded run of the batched optimizer.
+
+    Returns:
+        tuple: (seconds, best fitness per generation, seconds after each generation)
+    """
+    times = []
+    t_start = time.perf_counter()
+    optimizer = build_optimizer(settings, np.random.default_rng(SEED))
+    _, _, history, _ = optimizer.run(GENERATIONS, lambda gen, opt: times.append(time.perf_counter() - t_start))
+    return time.perf_counter() - t_start, history, times
+
+
+def peak_memory(settings):
+    """Peak of the memory traced by tracemalloc during a run, in bytes"""
+    tracemalloc.start()
+    try:
+        build_optimizer(settings, np.random.default_rng(SEED)).run(GENERATIONS)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(settings):
+    """
+    Measurements of one (resonator type, catalog, population) combination,
+    timings of the fastest of REPEATS identical runs.
+    """
+    seconds, history, times = min((timed_run(settings) for _ in range(REPEATS)), key=lambda run: run[0])
+    reached = np.flatnonzero(history <= TARGET_FITNESS)
+    evaluations = len(history) * settings.population_number
+    return {
+        "generations": len(history),
+        "evaluations": evaluations,
+        "seconds": seconds,
+        "evaluations_per_second": evaluations / seconds,
+        "best_fitness": float(history[-1]),
+        "time_to_target": times[reached[0]] if len(reached) else None,
+        "evaluations_to_target": int((reached[0] + 1) * settings.population_number) if len(reached) else None,
+        "peak_memory_bytes": peak_memory(settings),
+    }
+
+
+def git_commit():
+    """Commit of the working tree, None outside a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark():
+    """
+    Runs all cases.
+
+    Returns:
+        dict: JSON-serializable result, see the module docstring
+    """
+    result = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "numba": numba.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "seed": SEED,
+        "generations": GENERATIONS,
+        "target_fitness": TARGET_FITNESS,
+        "jit_warm_up_seconds": warm_up(),
+        "objective": [],
+        "runs": [],
+    }
+    for resonator_type in RESONATOR_TYPES:
+        base = OptimizationSettings.from_job({**JOB, "resonator_type": resonator_type, "optimizer": OPTIMIZER})
+        for catalog, mirrors in catalogs(base).items():
+            settings = replace(base, mirror_curvatures=mirrors)
+            case = {"resonator_type": resonator_type, "catalog": catalog, "mirrors": len(mirrors)}
+            result["objective"].append({**case, "evaluations_per_second": scalar_throughput(settings)})
+            for population in POPULATIONS:
+                run = {**case, "population": population,
+                       **run_case(replace(settings, population_number=population))}
+                result["runs"].append(run)
+                print(f"{resonator_type:<11} {catalog:<15} {population:>5} {run['evaluations_per_second']:12.0f} evals/s "
+                      f"best {run['best_fitness']:10.4g}  peak {run['peak_memory_bytes'] / 2**20:7.1f} MiB")
+    return result
+
+
+def compare(result, baseline):
+    """Prints the throughput of result relative to a baseline result"""
+    key = lambda run: (run["resonator_type"], run["catalog"], run["population"])
+    previous = {key(run): run for run in baseline["runs"]}
+    print(f"\nrelative to {baseline['environment'].get('commit') or baseline['created']}:")
+    for run in result["runs"]:
+        if key(run) in previous:
+            speedup = run["evaluations_per_second"] / previous[key(run)]["evaluations_per_second"]
+            memory = run["peak_memory_bytes"] / previous[key(run)]["peak_memory_bytes"]
+            print(f"{run['resonator_type']:<11} {run['catalog']:<15} {run['population']:>5}  "
+                  f"throughput x{speedup:6.2f}  peak memory x{memory:6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="Result file (default: %(default)s)")
+    parser.add_argument("--baseline", help="Earlier result file to compare with")
+    args = parser.parse_args()
+
+    result = benchmark()
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(result, file, indent=4)
+    print(f"Results written to {args.output}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            compare(result, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
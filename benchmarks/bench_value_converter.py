@@ -0,0 +1,42 @@
+"""
+Benchmark of the SI quantity parser against pint.
+
+Run from the repository root:
+    python -m benchmarks.bench_value_converter
+"""
+import timeit
+from src_physics.value_converter import parse_quantity, unit_registry
+
+SAMPLES = ["1.2 µm", "514 nm", "0.1 m", "25 mm", "-3e-2 m", "10 deg", "5 mrad", "1.5"]
+
+
+def parse_with_pint(text):
+    return float(unit_registry().Quantity(text).to_base_units().magnitude)
+
+
+def parse_uncached(text):
+    return parse_quantity.__wrapped__(text)
+
+
+def time_per_call(function, number):
+    """Mean time per call in microseconds over all samples."""
+    seconds = timeit.timeit(lambda: [function(s) for s in SAMPLES], number=number)
+    return seconds / (number * len(SAMPLES)) * 1e6
+
+
+def main():
+    for s in SAMPLES:
+        assert parse_quantity(s) == parse_with_pint(s), s
+    parse_with_pint(SAMPLES[0])  # Registry einmalig aufbauen
+
+    results = {
+        "pint": time_per_call(parse_with_pint, 200),
+        "regex": time_per_call(parse_uncached, 20000),
+        "regex + LRU cache": time_per_call(parse_quantity, 20000),
+    }
+    for name, t in results.items():
+        print(f"{name:<20} {t:10.3f} µs/call   x{results['pint'] / t:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Headless resonator optimization without Qt.
+
+Reads a JSON or TOML job (see OptimizationSettings.from_job), runs the
+vectorized PSO (or --engine CMA-ES / "Differential evolution") and writes
+the result as JSON. --engine "Pareto front" adds the Pareto front of the
+job's objectives (see OptimizationSettings.objectives) to the result:
+
+    python graycad_optimize.py job.toml -o result.json --workers 8 --seed 1
+
+With --checkpoint the progress is saved to Projects/checkpoints (or the
+given file), an interrupted optimization continues with
+
+    python graycad_optimize.py --resume Projects/checkpoints/BowTie_20250101_120000.npz
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from dataclasses import replace
+from os import path
+
+from src_physics import jit_cache
+jit_cache.configure_cache()  # vor dem Import der numba-Kernel
+
+import numpy as np
+from src_resonator.settings import OptimizationSettings
+from src_resonator.swarm import BACKENDS, iter_runs
+from src_resonator.pareto import PARETO_ENGINE, iter_fronts, merge_fronts
+from src_resonator.enumeration import feasible_combinations, iter_combinations
+from src_resonator.checkpoint import Checkpoint
+from src_resonator.refine import refine
+from src_resonator import fitness
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    tomllib = None
+
+
+def load_job(file_path):
+    """Parses a job file, TOML for *.toml and JSON otherwise."""
+    if file_path.endswith(".toml"):
+        if tomllib is None:
+            raise RuntimeError("TOML jobs need Python 3.11 or newer, use a JSON job instead.")
+        with open(file_path, "rb") as f:
+            return tomllib.load(f)
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def describe(settings, position, value):
+    """Resonator parameters, mirrors, waists and stability of a particle."""
+    resonator = settings.resonator()
+    k = len(resonator.variables)
+    waist_sag, waist_tan, m_sag, m_tan = fitness.evaluate(
+        resonator, list(position), settings.mirror_curvatures,
+        settings.nc, settings.lc, settings.n_prop, settings.wavelength)
+    mirrors = []
+    for index in position[k:k + resonator.mirror_count]:
+        index = int(np.clip(index, 0, len(settings.mirror_curvatures) - 1))
+        r_sag, r_tan = settings.mirror_curvatures[index][:2]
+        mirrors.append({"index": index, "r_sag": r_sag, "r_tan": r_tan})
+    return {
+        "fitness": float(value),
+        "particle": [float(p) for p in position],
+        "variables": {name: float(p) for name, p in zip(resonator.variables, position)},
+        "mirrors": mirrors,
+        "waist_sag": float(waist_sag),
+        "waist_tan": float(waist_tan),
+        "stability_sag": float(m_sag),
+        "stability_tan": float(m_tan),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless GRay-CAD resonator optimization")
+    parser.add_argument("job", nargs="?", help="JSON or TOML job file (not needed with --resume)")
+    parser.add_argument("-o", "--output", help="Result file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Root seed of all random streams (default: seed of the job, else a new one)")
+    parser.add_argument("--engine", choices=list(BACKENDS) + [PARETO_ENGINE, "Mirror pairs"],
+                        help="Optimizer backend (default: engine of the job, else Vectorized PSO)")
+    parser.add_argument("--checkpoint", nargs="?", const="", default=None, metavar="FILE",
+                        help="Save checkpoints (default: new file in Projects/checkpoints)")
+    parser.add_argument("--resume", metavar="FILE", help="Continue an interrupted optimization from a checkpoint")
+    args = parser.parse_args(argv)
+
+    checkpoint = None
+    if args.resume:
+        # Einstellungen und Seed stammen aus dem Checkpoint
+        checkpoint = Checkpoint.load(args.resume)
+        settings = checkpoint.settings
+        source = path.abspath(args.resume)
+    elif args.job:
+        job = load_job(args.job)
+        settings = OptimizationSettings.from_job(job, base_dir=path.dirname(path.abspath(args.job)))
+        if args.seed is not None:
+            settings = replace(settings, seed=args.seed)
+        # Der Seed steht im Ergebnis, damit sich der Lauf wiederholen lässt
+        settings = settings.with_seed()
+        source = path.abspath(args.job)
+    else:
+        parser.error("a job file or --resume is required")
+    if args.engine is not None:
+        if args.resume:
+            parser.error("the engine of a checkpoint cannot be changed")
+        settings = replace(settings, engine=args.engine)
+    if settings.engine in ("Mirror pairs", PARETO_ENGINE) and (args.checkpoint is not None or args.resume):
+        parser.error(f"checkpoints are not supported for the {settings.engine} engine")
+    if args.checkpoint is not None and checkpoint is None:
+        checkpoint = Checkpoint.create(settings, settings.seed, args.checkpoint or None)
+        print(f"Checkpoint: {checkpoint.file_path}", file=sys.stderr)
+    workers = max(1, min(args.workers, settings.num_runs))
+
+    t_start = time.perf_counter()
+    runs = []
+    best = None
+    extra = {}
+    if settings.engine == "Mirror pairs":
+        # Alle Spiegelkombinationen mit kontinuierlicher Teilsuche
+        combinations, total = feasible_combinations(settings)
+        extra = {"combinations": total, "pruned": total - len(combinations)}
+        workers = max(1, min(args.workers, len(combinations)))
+        results = (({"mirrors": [int(m) for m in mirrors]}, result) for mirrors, result in
+                   iter_combinations(settings, combinations, workers, settings.seed))
+    elif settings.engine == PARETO_ENGINE:
+        # Pro Lauf zählt der Entwurf der Front mit dem kleinsten Taillenfehler
+        fronts = []
+
+        def front_results():
+            for run, (positions, values, history, reason) in iter_fronts(
+                    settings, settings.run_seeds(), workers):
+                fronts.append((positions, values))
+                if not len(values):
+                    yield {"run": run, "front_size": 0}, (None, fitness.PENALTY, history, reason)
+                    continue
+                index = np.argmin(values[:, 0])
+                yield {"run": run, "front_size": len(values)}, (positions[index], values[index, 0], history, reason)
+        results = front_results()
+    else:
+        # Bereits im Checkpoint abgeschlossene Läufe zuerst, sie zählen nicht zur Laufzeit
+        previous = sorted(checkpoint.results.items()) if checkpoint is not None else []
+        if checkpoint is not None:
+            workers = max(1, min(workers, len(checkpoint.pending())))
+        results = itertools.chain(
+            (({"run": run, "resumed": True}, result) for run, result in previous),
+            (({"run": run}, result) for run, result in
+             iter_runs(settings, settings.run_seeds(), workers, checkpoint=checkpoint)))
+
+    evaluations = 0
+    for entry, (position, value, history, reason) in results:
+        runs.append({**entry, "fitness": float(value), "stop_reason": reason, "generations": len(history),
+                     "history": [float(h) for h in history]})
+        if not entry.get("resumed"):
+            evaluations += len(history) * settings.population_number
+        if position is not None and (best is None or value < best[1]):
+            best = (position, value)
+        print(f"{entry}: fitness {value:.6g}, {reason} after {len(history)} generations", file=sys.stderr)
+    wall_time = time.perf_counter() - t_start
+
+    if best is None:
+        raise SystemExit("No mirror combination is stable within the bounds.")
+    if settings.engine == PARETO_ENGINE:
+        positions, values = merge_fronts([front for front in fronts if len(front[1])], settings.objective_columns())
+        extra["objectives"] = list(settings.objectives)
+        extra["front"] = [{**describe(settings, position, row[0]),
+                           "objectives": {name: float(v) for name, v in zip(fitness.OBJECTIVES, row)}}
+                          for position, row in zip(positions, values)]
+    if checkpoint is not None and not checkpoint.pending():
+        checkpoint.remove()
+    if settings.refinement:
+        # Bestes Ergebnis mit festen Spiegeln nachschärfen
+        t_refine = time.perf_counter()
+        position, value, iterations = refine(settings, best[0])
+        extra["refinement"] = {"fitness_before": float(best[1]), "iterations": iterations,
+                               "time": time.perf_counter() - t_refine}
+        if value < best[1]:
+            best = (position, value)
+    result = {
+        "job": source,
+        "resonator_type": settings.resonator_type,
+        "seed": settings.seed,
+        "workers": workers,
+        "engine": settings.engine,
+        **extra,
+        "best": describe(settings, *best),
+        "runs": sorted(runs, key=lambda r: r.get("run", r["fitness"])),
+        "timing": {
+            "wall_time": wall_time,
+            "evaluations": evaluations,
+            "evaluations_per_second": evaluations / wall_time,
+        },
+    }
+
+    text = json.dumps(result, indent=4, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
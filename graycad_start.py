@@ -1,9 +1,23 @@
+import time
+T_LAUNCH = time.perf_counter()
+
+import logging
+import os
+
+from src_physics import jit_cache
+jit_cache.configure_cache()  # vor dem Import der numba-Kernel
+
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QIcon
 from os import path
 from GUI.graycad_mainwindow import MainWindow
 from deap import base, creator
 
+logger = logging.getLogger(__name__)
+# Startzeiten nur auf Wunsch ausgeben: GRAYCAD_TIMING=1 python graycad_start.py
+if os.environ.get("GRAYCAD_TIMING"):
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
 class Start:
     def __init__(self):
 
@@ -14,15 +28,38 @@ class Start:
             creator.create("Particle", list, fitness=creator.FitnessMin, 
                          speed=list, smin=None, smax=None, best=None)
 
+        # Kernel im Hintergrund kompilieren bzw. aus dem Cache laden, während das Fenster aufgebaut wird
+        self.warm_up_time = None
+        self.first_plot_time = None
+        self.warm_up_thread = jit_cache.start_warm_up(self.report_warm_up)
+
         self.app = QApplication([])
         self.app.setWindowIcon(QIcon(path.abspath(path.join(path.dirname(__file__), 
                              "TaskbarIcon.png"))))
         self.window = MainWindow()
         self.window.show()
 
+        self.startup_time = time.perf_counter() - T_LAUNCH
+        logger.info("Startup: %.3f s", self.startup_time)
+
+        # Der erste Plot entsteht meist schon beim Aufbau des Fensters
+        plotter = self.window.optical_plotter
+        if plotter.first_plot_time is not None:
+            self.report_first_plot()
+        else:
+            plotter.on_first_plot = self.report_first_plot
+
+    def report_warm_up(self, duration):
+        self.warm_up_time = duration
+        logger.info("JIT warm-up: %.3f s", duration)
+
+    def report_first_plot(self):
+        self.first_plot_time = self.window.optical_plotter.first_plot_time - T_LAUNCH
+        logger.info("Time to first plot: %.3f s", self.first_plot_time)
+
     def run(self):
         self.app.exec()
 
 if __name__ == "__main__":
     app = Start()
-    app.run()
\ No newline at end of file
+    app.run()
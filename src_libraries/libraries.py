@@ -6,7 +6,8 @@ from os import path, listdir
 from PyQt5 import uic
 import json
 import os
-from src_physics.value_converter import ValueConverter
+from GUI.errorHandler import GuiValueConverter
+from src_physics.material import Material
 
 class Libraries(QObject):
     """
@@ -20,7 +21,7 @@ class Libraries(QObject):
         self.library_window = None
         self.ui_library = None
         self.components_data = []  # Store components data
-        self.value_converter = ValueConverter()
+        self.value_converter = GuiValueConverter()
 
     def open_library_window(self):
         """
@@ -586,8 +587,8 @@ class Libraries(QObject):
             # Dropdown für spezielle Felder
             elif key == "Lens material":
                 field = QtWidgets.QComboBox()
-                field.addItems(["NBK7", "Fused Silica"])
-                if value in ["NBK7", "Fused Silica"]:
+                field.addItems(Material.names())
+                if value in Material.names():
                     field.setCurrentText(value)
                 layout.addWidget(field, row, 1)
                 self._property_fields[key] = field
@@ -779,13 +780,9 @@ class Libraries(QObject):
             material = self._property_fields.get("Lens material", {}).currentText() if "Lens material" in self._property_fields else "NBK7"
             lambda_design = self.value_converter.convert_to_float(self._property_fields.get("Design wavelength", {}).text()) if "Design wavelength" in self._property_fields else 514e-9
             
-            # Material-Brechungsindizes (vereinfacht)
-            if material == "NBK7":
-                n_design = 1.5168
-                n = 1.5168  # Vereinfacht: gleiche Wellenlänge
-            else:  # Fused Silica
-                n_design = 1.4607
-                n = 1.4607
+            # Brechungsindex aus dem Materialkatalog (vereinfacht: gleiche Wellenlänge)
+            n_design = Material.get_n(material, lambda_design if lambda_design is not None else 514e-9)
+            n = n_design
                 
             is_plane = self._property_fields.get("Plan lens", {}).isChecked() if "Plan lens" in self._property_fields else False
             var_param = self._property_fields.get("Variable parameter", {}).currentText() if "Variable parameter" in self._property_fields else "Edit focal length"
@@ -6,7 +6,7 @@ from PyQt5.QtCore import QModelIndex, QObject
 from PyQt5.QtGui import QStandardItemModel, QStandardItem
 
 from src_resonator.resonators import Resonator
-from src_physics.value_converter import ValueConverter
+from GUI.errorHandler import GuiValueConverter
 import config
 
 class LibraryWindow(QMainWindow):
@@ -31,7 +31,7 @@ class ItemSelector(QObject):
         self.components_data = []  # Store components data
         
         self.res = Resonator()
-        self.vc = ValueConverter()  # Instance of ValueConverter
+        self.vc = GuiValueConverter()  # Instance of ValueConverter
         
     def open_library_window(self, parent=None):
         """
@@ -10,7 +10,7 @@ from src_resonator.problem import Problem
 from src_resonator.plot_setup import Plotter
 from src_resonator.resonator_types import *
 from src_modematcher.modematcher_calculator import ModematcherCalculator
-from src_physics.value_converter import ValueConverter
+from GUI.errorHandler import GuiValueConverter
 
 class ModematcherParameterWindow(QMainWindow):
     def __init__(self, parent=None):
@@ -41,7 +41,7 @@ class ModematcherParameters(QObject):
         self.libraries = None
         self.item_selector = None
         self.modematcher_calculation_window = None
-        self.vc = ValueConverter()
+        self.vc = GuiValueConverter()
 
     def open_modematcher_parameter_window(self):
         """
@@ -1,11 +1,9 @@
 import numpy as np
 from src_physics.matrices import Matrices
-from PyQt5.QtWidgets import QMessageBox
-import pyqtgraph as pg
+from src_physics.optical_system import OpticalSystem, FREE_SPACE
 from numba import njit
-import time
 
-@njit
+@njit(cache=True)
 def beam_radius_numba(q, wavelength, n):
     return np.sqrt(-wavelength / (np.pi * np.imag(1/q)))
 
@@ -25,10 +23,12 @@ class Beam():
 
         Returns:
         complex: q parameter of the beam.
+
+        Raises:
+        ValueError: If the beam radius is not greater than zero.
         """
         if beam_radius <= 0:
-            QMessageBox.critical(None, "Error", "Beam radius must be greater than zero.")
-            return None
+            raise ValueError("Beam radius must be greater than zero.")
         zr = (np.pi * beam_radius**2) / (wavelength)
         return - z + (1j * zr)
 
@@ -79,7 +79,7 @@ class Beam():
         return (A * q_in + B) / (C * q_in + D)
     
     @staticmethod
-    @njit
+    @njit(cache=True)
     def propagate_free_space(q_start, dz, n_steps, wavelength, n):
         q = q_start
         z_positions = np.empty(n_steps + 1, dtype=np.float64)
@@ -96,7 +96,70 @@ class Beam():
             w_values[i] = beam_radius_numba(q, wavelength, n)
         return q, z_total, z_positions, w_values
 
-    def propagate_through_system(self, wavelength, q_initial, elements, z_array, res, n=1):
+    @staticmethod
+    def propagate_free_space_analytic(q_start, z, wavelength, n):
+        """
+        Closed-form propagation through free space.
+
+        Parameters:
+        q_start (complex or array): q parameter at the start of the segment.
+        z (float or array): Distances from the start of the segment.
+        wavelength (float): Wavelength of the beam.
+        n (float or array): Refractive index of the medium.
+
+        Returns:
+        tuple: (q, w) evaluated at every z, with q(z) = q_start + z/n.
+        """
+        q = q_start + np.asarray(z, dtype=np.float64) / n
+        return q, np.sqrt(-wavelength / (np.pi * np.imag(1/q)))
+
+    def propagate_through_system(self, wavelength, q_initial, elements, z_array, res, n=1, mode="analytic"):
+        """
+        Propagate a beam through an optical system.
+
+        Parameters:
+        wavelength (float): Wavelength of the beam.
+        q_initial (complex): q parameter at z = 0.
+        elements (OpticalSystem): Compiled optical system, a legacy list of
+            (matrix_function, parameters) tuples is compiled on the fly.
+        z_array (array): Sample positions, their maximum defines the plotted range.
+        res (int): Number of samples, only used by the stepwise mode.
+        n (float): Refractive index behind the last element.
+        mode (str): "analytic" evaluates every free-space segment in closed form
+            at the sample positions, "stepwise" advances q in steps of dz.
+
+        Returns:
+        tuple: (z_positions, w_values, z_setup)
+        """
+        if mode == "analytic":
+            return self.propagate_through_system_analytic(wavelength, q_initial, elements, z_array, n)
+        return self.propagate_through_system_stepwise(wavelength, q_initial, elements, z_array, res, n)
+
+    def compile_system(self, elements):
+        """Returns elements as a compiled OpticalSystem."""
+        if isinstance(elements, OpticalSystem):
+            return elements
+        return OpticalSystem.from_matrix_functions(elements, self.matrices)
+
+    def profile(self, elements, q_initial, wavelength, n=1):
+        """
+        Returns a BeamProfile that caches the prefix products of the optical
+        system and the q value at every element boundary.
+        """
+        return BeamProfile(self.compile_system(elements), q_initial, wavelength, n)
+
+    def propagate_through_system_analytic(self, wavelength, q_initial, elements, z_array, n=1):
+        """
+        Samples w(z) at the positions in z_array (z >= 0) and at every element.
+        Each sample is computed in closed form from the q value at the start of
+        its free-space segment, so the cost only depends on the number of
+        samples and no rounding error builds up along the setup.
+        """
+        profile = self.profile(elements, q_initial, wavelength, n)
+        z_positions, w_values = profile.sample(z_array)
+        return z_positions, w_values, profile.total_length
+
+    def propagate_through_system_stepwise(self, wavelength, q_initial, elements, z_array, res, n=1):
         lambda_ = wavelength
         q = q_initial
         z_total = 0.0
@@ -104,27 +167,12 @@ class Beam():
         w_values = [self.beam_radius(q, lambda_, n)]
         steps = res
 
-        # Berechung der Länge des optischen Systems
-        z_total = 0.0
-        length_plot = 0.0
-        for element, param in elements:
-            if hasattr(element, "__func__") and element.__func__ is self.matrices.free_space.__func__:
-                length_plot += param[0]
+        system = self.compile_system(elements)
 
         # Vorwärts durch das optische System propagieren
-        for element, param in elements:
-            if hasattr(element, "__func__") and element.__func__ is self.matrices.free_space.__func__:
-                length = param[0]
-                n_medium = param[1]
-                try:
-                    length_val = float(length)
-                    n_val = float(n_medium)
-                    if length_val <= 0 or n_val <= 0:
-                        continue
-                except Exception:
-                    continue
+        for kind, length_val, n_val, ABCD in zip(system.kinds, system.length, system.n, system.abcd):
+            if kind == FREE_SPACE:
                 dz = np.min(np.diff(np.sort(np.linspace(np.min(z_array), np.max(z_array), res))))
-                length_plot = np.max(z_array) - np.min(z_array)
                 steps = int(np.ceil(length_val/dz)) -1
                 try:
                     q, z_inc, zs, ws = Beam.propagate_free_space(q, dz, steps, lambda_, n_val)
@@ -134,10 +182,6 @@ class Beam():
                 w_values = np.concatenate((w_values, ws[1:]))
                 z_total += length_val
             else:
-                if isinstance(param, tuple):
-                    ABCD = element(*param)
-                else:
-                    ABCD = element(param)
                 q = self.propagate_q(q, ABCD)
                 w_values = np.concatenate((w_values, [self.beam_radius(q, lambda_, n)]))
                 z_positions = np.concatenate((z_positions, [z_total]))
@@ -170,4 +214,82 @@ class Beam():
             except Exception:
                 return'''
 
-        return z_positions, w_values, z_setup
\ No newline at end of file
+        return z_positions, w_values, z_setup
+
+
+class BeamProfile:
+    """
+    Gaussian beam along a fixed optical system.
+
+    Keeps the cumulative ABCD products in front of every element and the q
+    value at every element boundary. A query at an arbitrary z is then a
+    searchsorted over the boundary positions plus one closed-form free-space
+    step, independent of the number of elements in front of z.
+    """
+
+    def __init__(self, system, q_initial, wavelength, n=1):
+        """
+        Args:
+            system (OpticalSystem): Compiled optical system.
+            q_initial (complex): q parameter at z = 0.
+            wavelength (float): Wavelength of the beam.
+            n (float): Refractive index in front of and behind the setup.
+        """
+        K = len(system)
+        self.system = system
+        self.wavelength = wavelength
+        self.n = float(n)
+        self.total_length = system.total_length
+
+        # prefix[k] = M_(k-1) ... M_0, prefix[K] ist die Systemmatrix
+        self.prefix = np.empty((K + 1, 2, 2), dtype=np.float64)
+        self.prefix[0] = np.eye(2)
+        for k in range(K):
+            np.matmul(system.abcd[k], self.prefix[k], out=self.prefix[k + 1])
+
+        A = self.prefix[:, 0, 0]
+        B = self.prefix[:, 0, 1]
+        C = self.prefix[:, 1, 0]
+        D = self.prefix[:, 1, 1]
+        self.q_boundary = (A * q_initial + B) / (C * q_initial + D)
+
+        # Segment k beginnt bei seg_start[k] mit q_boundary[k], das letzte liegt hinter dem Setup
+        self.seg_start = np.append(system.z, system.total_length)
+        self.seg_n = np.append(system.n, self.n)
+
+    def q(self, z):
+        """q parameter at the positions z (scalar or array)."""
+        z = np.asarray(z, dtype=np.float64)
+        idx = np.maximum(np.searchsorted(self.seg_start, z, side="right") - 1, 0)
+        n = np.where(z < 0, self.n, self.seg_n[idx])
+        return self.q_boundary[idx] + (z - self.seg_start[idx]) / n
+
+    def w(self, z):
+        """Beam radius at the positions z."""
+        return np.sqrt(-self.wavelength / (np.pi * np.imag(1 / self.q(z))))
+
+    def radius_of_curvature(self, z):
+        """Radius of curvature of the wavefront at the positions z (inf at a waist)."""
+        with np.errstate(divide="ignore"):
+            return 1 / np.real(1 / self.q(z))
+
+    def sample(self, z_array):
+        """
+        Samples the beam radius at the positions in z_array (z >= 0), at
+        z = 0 and at every element boundary in range.
+
+        Returns:
+            tuple: (z_positions, w_values) sorted by z.
+        """
+        z_array = np.asarray(z_array, dtype=np.float64)
+        z_end = max(np.max(z_array), 0.0)
+        samples = z_array[z_array >= 0]
+        boundaries = self.seg_start[self.seg_start <= z_end]
+
+        # Ein einziger, vorab allokierter Ausgabepuffer
+        z_positions = np.empty(1 + len(samples) + len(boundaries), dtype=np.float64)
+        z_positions[0] = 0.0
+        z_positions[1:1 + len(samples)] = samples
+        z_positions[1 + len(samples):] = boundaries
+        z_positions.sort()
+        return z_positions, self.w(z_positions)
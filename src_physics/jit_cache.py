@@ -0,0 +1,69 @@
+import os
+import threading
+import time
+from os import path
+
+# Persistentes Cache-Verzeichnis für die kompilierten numba-Kernel
+CACHE_DIR = path.join(path.expanduser("~"), ".cache", "GRay-CAD", "numba")
+
+
+def configure_cache(cache_dir=None):
+    """
+    Sets the directory numba stores compiled kernels in. Has to be called
+    before the modules with the kernels are imported, an already set
+    NUMBA_CACHE_DIR environment variable takes precedence.
+
+    Returns:
+        str: The cache directory in use
+    """
+    cache_dir = os.environ.setdefault("NUMBA_CACHE_DIR", cache_dir or CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # numba liest NUMBA_CACHE_DIR nur beim Import, ein bereits geladenes numba wird nachgeführt
+    import numba
+    numba.config.CACHE_DIR = cache_dir
+    return cache_dir
+
+
+def warm_up():
+    """
+    Compiles all numba kernels once or loads them from the cache.
+
+    Returns:
+        float: Duration in seconds
+    """
+    import numpy as np
+    from src_physics.beam import Beam
+    from src_resonator.resonator_types import BowTie, TOPOLOGIES
+    from src_resonator.topology import compile_topology
+    from src_resonator.stability import StabilityScreen
+    from src_resonator.refine import roundtrip_gradient
+
+    t_start = time.perf_counter()
+    Beam.propagate_free_space(1j, 1e-3, 1, 1e-6, 1.0)
+    for resonator_type in map(compile_topology, TOPOLOGIES.values()):
+        x = np.full((1, len(resonator_type.variables)), 0.1)
+        radii = np.ones((1, 2 * resonator_type.mirror_count))
+        resonator_type.roundtrip_batch(1.0, 0.0, 1.0, x, radii)
+        resonator_type.roundtrip(1.0, 0.0, 1.0, *x[0], *radii[0])
+        roundtrip_gradient(resonator_type, 1.0, 0.0, 1.0, x[0], radii[0])
+    StabilityScreen(compile_topology(BowTie), np.ones((1, 2)), 1.0, 0.0, 1.0, 0.05, 0.1,
+                    bounds=(np.zeros(3), np.ones(3))).confine(np.full((1, 5), 0.1), np.random.default_rng(0))
+    return time.perf_counter() - t_start
+
+
+def start_warm_up(callback=None):
+    """
+    Runs warm_up on a daemon thread, callback receives the duration.
+
+    Returns:
+        threading.Thread: The started thread
+    """
+    def run():
+        duration = warm_up()
+        if callback is not None:
+            callback(duration)
+
+    thread = threading.Thread(target=run, name="jit-warm-up", daemon=True)
+    thread.start()
+    return thread
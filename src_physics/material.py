@@ -1,30 +1,97 @@
+import json
 import numpy as np
-from PyQt5.QtWidgets import QMessageBox
+from functools import lru_cache
+from os import path
+
+# Materialkatalog mit Sellmeier- bzw. Cauchy-Koeffizienten (Wellenlänge in µm)
+CATALOG_PATH = path.abspath(path.join(path.dirname(path.dirname(__file__)), "Library", "Materials", "Materials.json"))
+
+
+def sellmeier(lambda_um, B, C):
+    """n² = 1 + Σ B λ² / (λ² - C), λ in µm and C in µm²"""
+    l2 = np.asarray(lambda_um, dtype=np.float64)[..., np.newaxis]**2
+    return np.sqrt(1 + np.sum((B * l2) / (l2 - C), axis=-1))
+
+
+def cauchy(lambda_um, A):
+    """n = A0 + A1 / λ² + A2 / λ⁴ + ..., λ in µm"""
+    l2 = np.asarray(lambda_um, dtype=np.float64)[..., np.newaxis]**2
+    return np.sum(A / l2**np.arange(len(A)), axis=-1)
+
 
 class Material:
 
     def __init__(self):
         pass
 
-    def get_n(*args):
-        material = args[0]  # args[0] ist die Instanz (self)
-        lambda_ = args[1]*1e6
-        # Initialisiere n mit Standardwert
-        n = 1.0  # Fallback: Luft
-        
-        if isinstance(material, str):
-            if material == "NBK7":
-                n = np.sqrt(((1.03961212*lambda_**2)/(lambda_**2-0.00600069867))
-                    +((0.231792344*lambda_**2)/(lambda_**2-0.0200179144))
-                    +((1.01046945*lambda_**2)/(lambda_**2-103.560653))+1)
-            elif material == "Fused Silica":  # Verwende elif statt if
-                n = np.sqrt(((0.6961663*lambda_**2)/(lambda_**2- 0.0684043**2))
-                    +((0.4079426*lambda_**2)/(lambda_**2- 0.1162414**2))
-                    +((0.8974794*lambda_**2)/(lambda_**2-9.896161**2))+1)
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def catalog(file_path=CATALOG_PATH):
+        """
+        Loads the material catalog once.
+
+        Returns:
+            dict: Material name -> (formula, coefficient arrays)
+        """
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        catalog = {}
+        for component in data.get("components", []):
+            props = component["properties"]
+            formula = props["Formula"]
+            if formula == "Sellmeier":
+                coefficients = (np.asarray(props["B"], dtype=np.float64), np.asarray(props["C"], dtype=np.float64))
+            elif formula == "Cauchy":
+                coefficients = (np.asarray(props["A"], dtype=np.float64),)
             else:
-                QMessageBox.critical(None, "Error", f"Material '{material}' not recognized.")
-        elif isinstance(material, (int, float)):
+                raise ValueError(f"Unknown dispersion formula '{formula}' for material '{component['name']}'.")
+            catalog[component["name"]] = (formula, coefficients)
+        return catalog
+
+    @staticmethod
+    def names():
+        """Names of all materials in the catalog"""
+        return list(Material.catalog())
+
+    @staticmethod
+    def get_n(material, wavelength):
+        """
+        Refractive index of a material at a wavelength (in meters).
+        Scalar wavelengths are memoized per (material, wavelength), arrays
+        are evaluated in one vectorized call.
+
+        Args:
+            material: Name of a catalog material or a number used directly as n
+            wavelength: Wavelength in meters (float or array)
+
+        Raises:
+            ValueError: If the material is not known.
+        """
+        if isinstance(material, (int, float)):
             # Falls material eine Zahl ist, verwende diese direkt als Brechungsindex
-            n = float(material)
-        
-        return n
\ No newline at end of file
+            return float(material) if np.ndim(wavelength) == 0 else np.full(np.shape(wavelength), float(material))
+        if np.ndim(wavelength) == 0:
+            return Material._get_n_cached(material, float(wavelength))
+        return Material.refractive_index(material, wavelength)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _get_n_cached(material, wavelength):
+        return float(Material.refractive_index(material, wavelength))
+
+    @staticmethod
+    def refractive_index(material, wavelength):
+        """
+        Refractive index for an array of wavelengths (in meters), not memoized.
+
+        Raises:
+            ValueError: If the material is not known.
+        """
+        try:
+            formula, coefficients = Material.catalog()[material]
+        except (KeyError, TypeError):
+            raise ValueError(f"Material '{material}' not recognized.") from None
+        lambda_um = np.asarray(wavelength, dtype=np.float64) * 1e6
+        if formula == "Sellmeier":
+            return sellmeier(lambda_um, *coefficients)
+        return cauchy(lambda_um, *coefficients)
@@ -37,3 +37,70 @@ class Matrices:
         A, B, C, D = args
         return np.array([[A, B], [C, D]])
 
+    # Batched variants: every parameter may be a scalar or an array, the
+    # parameters are broadcast against each other and the result is a stack
+    # of matrices with shape (..., 2, 2), e.g. (N, 2, 2) for N particles.
+
+    @staticmethod
+    def _stack(A, B, C, D):
+        """Stacks broadcastable A, B, C, D arrays into an array of shape (..., 2, 2)"""
+        A, B, C, D = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (A, B, C, D)))
+        out = np.empty(A.shape + (2, 2), dtype=np.float64)
+        out[..., 0, 0] = A
+        out[..., 0, 1] = B
+        out[..., 1, 0] = C
+        out[..., 1, 1] = D
+        return out
+
+    def free_space_batch(self, *args):
+        """Stacked ABCD matrices for propagation through free space with refractive index n"""
+        distance, n = args
+        distance = np.asarray(distance, dtype=np.float64)
+        return self._stack(1.0, distance / n, 0.0, 1.0)
+
+    def curved_mirror_tangential_batch(self, *args):
+        """Stacked ABCD matrices for mirrors in the tangential direction"""
+        radius_of_curvature, theta = args
+        radius_of_curvature = np.asarray(radius_of_curvature, dtype=np.float64)
+        return self._stack(1.0, 0.0, -2 / (radius_of_curvature * np.cos(theta)), 1.0)
+
+    def curved_mirror_sagittal_batch(self, *args):
+        """Stacked ABCD matrices for mirrors in the sagittal direction"""
+        radius_of_curvature, theta = args
+        radius_of_curvature = np.asarray(radius_of_curvature, dtype=np.float64)
+        return self._stack(1.0, 0.0, (-2 * np.cos(theta)) / radius_of_curvature, 1.0)
+
+    def lens_batch(self, *args):
+        """Stacked ABCD matrices for thin lenses"""
+        focal_length = np.asarray(args[0], dtype=np.float64)
+        return self._stack(1.0, 0.0, -1 / focal_length, 1.0)
+
+    def refraction_curved_interface_batch(self, *args):
+        """Stacked ABCD matrices for refraction at curved interfaces"""
+        radius_of_curvature, refractive_index_inital, refractive_index_final = args
+        refractive_index_final = np.asarray(refractive_index_final, dtype=np.float64)
+        C = (refractive_index_inital - refractive_index_final) / (refractive_index_final * radius_of_curvature)
+        return self._stack(1.0, 0.0, C, 1.0)
+
+    def ABCD_batch(self, *args):
+        """Stacked ABCD matrices from arrays of matrix elements"""
+        A, B, C, D = args
+        return self._stack(A, B, C, D)
+
+    def chain(self, matrices):
+        """
+        Product of ABCD matrices in propagation order.
+
+        Args:
+            matrices: Sequence of (..., 2, 2) arrays, or one array whose first
+                axis is the element order. The first element is the first one
+                passed by the beam.
+
+        Returns:
+            numpy.ndarray: M_k @ ... @ M_2 @ M_1 with shape (..., 2, 2), the
+            2x2 identity for an empty sequence
+        """
+        result = None
+        for m in matrices:
+            result = m if result is None else np.matmul(m, result)
+        return np.eye(2) if result is None else result
@@ -0,0 +1,127 @@
+import numpy as np
+from src_physics.matrices import Matrices
+
+# Element-kind codes of a compiled optical system
+FREE_SPACE = 0
+LENS = 1
+MIRROR_TANGENTIAL = 2
+MIRROR_SAGITTAL = 3
+CURVED_INTERFACE = 4
+ABCD = 5
+
+# Number of parameters per element kind (rows of OpticalSystem.params are padded with NaN)
+PARAMETER_COUNT = {
+    FREE_SPACE: 2,           # length, refractive index
+    LENS: 1,                 # focal length
+    MIRROR_TANGENTIAL: 2,    # radius of curvature, angle of incidence
+    MIRROR_SAGITTAL: 2,      # radius of curvature, angle of incidence
+    CURVED_INTERFACE: 3,     # radius of curvature, n initial, n final
+    ABCD: 4,                 # A, B, C, D
+}
+
+
+class OpticalSystem:
+    """
+    Compiled optical system for one plane (sagittal or tangential).
+
+    The elements are stored as contiguous NumPy arrays instead of a list of
+    (matrix_function, parameters) tuples, so propagation, plotting and the
+    cursor readout need no per-element Python dispatch. Instances only hold
+    NumPy arrays and are therefore picklable.
+
+    Attributes:
+        kinds (numpy.ndarray): Element-kind code per element, shape (K,)
+        params (numpy.ndarray): Element parameters, shape (K, 4), NaN padded
+        abcd (numpy.ndarray): Precomputed ABCD matrix per element, shape (K, 2, 2)
+        z (numpy.ndarray): z position at which each element starts, shape (K,)
+        length (numpy.ndarray): Length of each element (0 for thin elements)
+        n (numpy.ndarray): Refractive index of each free-space element (1 for thin elements)
+        total_length (float): Length of the whole setup
+        plane (str): "sagittal" or "tangential"
+    """
+
+    def __init__(self, elements=(), plane="sagittal"):
+        """
+        Args:
+            elements: Sequence of (kind, parameters) pairs using the kind codes
+                of this module. Free-space elements with a non-numeric or
+                non-positive length or refractive index are dropped.
+            plane (str): Plane the system was built for.
+
+        Raises:
+            ValueError: If a thin element has missing or non-numeric parameters.
+        """
+        kinds = []
+        rows = []
+        for kind, param in elements:
+            if not isinstance(param, (tuple, list)):
+                param = (param,)
+            try:
+                values = [float(p) for p in param[:PARAMETER_COUNT[kind]]]
+            except (TypeError, ValueError):
+                if kind == FREE_SPACE:
+                    continue
+                raise ValueError(f"Invalid parameters {param} for optical element of kind {kind}.")
+            if kind == FREE_SPACE and (values[0] <= 0 or values[1] <= 0):
+                continue
+            kinds.append(kind)
+            rows.append(values + [np.nan] * (4 - len(values)))
+
+        self.plane = plane
+        self.kinds = np.asarray(kinds, dtype=np.int8)
+        self.params = np.asarray(rows, dtype=np.float64).reshape(len(kinds), 4)
+
+        free = self.kinds == FREE_SPACE
+        self.length = np.where(free, self.params[:, 0], 0.0)
+        self.n = np.where(free, self.params[:, 1], 1.0)
+        self.z = np.concatenate(([0.0], np.cumsum(self.length)[:-1])) if len(kinds) else np.zeros(0)
+        self.total_length = float(np.sum(self.length))
+        self.abcd = self._compile_matrices()
+
+    @classmethod
+    def from_matrix_functions(cls, elements, matrices=None, plane="sagittal"):
+        """
+        Compiles a legacy list of (matrix_function, parameters) tuples,
+        e.g. [(matrices.free_space, (0.1, 1)), (matrices.lens, 0.05)].
+        """
+        matrices = matrices if matrices is not None else Matrices()
+        kind_of = {
+            matrices.free_space.__func__: FREE_SPACE,
+            matrices.lens.__func__: LENS,
+            matrices.curved_mirror_tangential.__func__: MIRROR_TANGENTIAL,
+            matrices.curved_mirror_sagittal.__func__: MIRROR_SAGITTAL,
+            matrices.refraction_curved_interface.__func__: CURVED_INTERFACE,
+            matrices.ABCD.__func__: ABCD,
+        }
+        return cls([(kind_of[getattr(element, "__func__", element)], param) for element, param in elements], plane)
+
+    def _compile_matrices(self):
+        """Builds the (K, 2, 2) ABCD matrices with one batched call per element kind."""
+        matrices = Matrices()
+        p = self.params
+        abcd = np.empty((len(self.kinds), 2, 2), dtype=np.float64)
+        builders = {
+            FREE_SPACE: lambda q: matrices.free_space_batch(q[:, 0], q[:, 1]),
+            LENS: lambda q: matrices.lens_batch(q[:, 0]),
+            MIRROR_TANGENTIAL: lambda q: matrices.curved_mirror_tangential_batch(q[:, 0], q[:, 1]),
+            MIRROR_SAGITTAL: lambda q: matrices.curved_mirror_sagittal_batch(q[:, 0], q[:, 1]),
+            CURVED_INTERFACE: lambda q: matrices.refraction_curved_interface_batch(q[:, 0], q[:, 1], q[:, 2]),
+            ABCD: lambda q: matrices.ABCD_batch(q[:, 0], q[:, 1], q[:, 2], q[:, 3]),
+        }
+        with np.errstate(divide="ignore"):
+            for kind, build in builders.items():
+                mask = self.kinds == kind
+                if np.any(mask):
+                    abcd[mask] = build(p[mask])
+        return abcd
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def element_positions(self):
+        """z positions of all thin (non free-space) elements"""
+        return self.z[self.kinds != FREE_SPACE]
+
+    def system_matrix(self):
+        """ABCD matrix of the whole setup"""
+        return Matrices().chain(self.abcd) if len(self.kinds) else np.eye(2)
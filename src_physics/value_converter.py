@@ -1,58 +1,147 @@
+from functools import lru_cache
 from pint import UnitRegistry
-from PyQt5.QtWidgets import QMessageBox
-from PyQt5.QtCore import QTimer
 import numpy as np
+import math
+import re
+
+# SI-Vorsätze und ihre Faktoren
+PREFIXES = {
+    "Y": 1e24, "Z": 1e21, "E": 1e18, "P": 1e15, "T": 1e12, "G": 1e9, "M": 1e6,
+    "k": 1e3, "h": 1e2, "da": 1e1, "": 1.0, "d": 1e-1, "c": 1e-2, "m": 1e-3,
+    "µ": 1e-6, "μ": 1e-6, "u": 1e-6, "n": 1e-9, "p": 1e-12, "f": 1e-15,
+    "a": 1e-18, "z": 1e-21, "y": 1e-24,
+}
+
+# Einheiten des schnellen Parsers (Längen, Wellenlängen, Winkel) mit Faktor zur SI-Basiseinheit
+UNITS = {"": 1.0, "meter": 1.0, "deg": math.pi / 180, "°": math.pi / 180}
+UNITS.update({prefix + "m": factor for prefix, factor in PREFIXES.items()})
+UNITS.update({prefix + "rad": factor for prefix, factor in PREFIXES.items()})
+
+# Zahl, optional gefolgt von Vorsatz und Einheit, z. B. "1.2 µm", "-3e-2mm", "10°"
+QUANTITY_PATTERN = re.compile(r"\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)\s*(°|[^\W\d_]*)\s*")
+
+# Vorsätze der technischen Notation (Exponent -> Zeichen), wie pint.to_compact
+ENGINEERING_PREFIXES = {
+    -30: "q", -27: "r", -24: "y", -21: "z", -18: "a", -15: "f", -12: "p", -9: "n",
+    -6: "µ", -3: "m", 0: "", 3: "k", 6: "M", 9: "G", 12: "T", 15: "P", 18: "E",
+    21: "Z", 24: "Y", 27: "R", 30: "Q",
+}
+
+
+@lru_cache(maxsize=None)
+def unit_registry():
+    """Shared pint registry, created on first use."""
+    ureg = UnitRegistry()
+    ureg.default_format = "~P"  # Kompakte SI-Darstellung
+    return ureg
+
+
+@lru_cache(maxsize=1024)
+def parse_quantity(text):
+    """
+    Converts a string like '1.2 µm' into a float in SI base units.
+    Lengths and angles are parsed with QUANTITY_PATTERN, pint is only
+    used for other input. Recent strings are kept in an LRU cache.
+
+    Raises:
+        ValueError: If the value cannot be parsed.
+    """
+    match = QUANTITY_PATTERN.fullmatch(text)
+    if match is not None:
+        factor = UNITS.get(match.group(2))
+        if factor is not None:
+            return float(match.group(1)) * factor
+    try:
+        quantity = unit_registry().Quantity(text).to_base_units()
+        return float(quantity.magnitude)
+    except Exception as e:
+        raise ValueError(f"Unknown or invalid value: {text}") from e
+
+
+@lru_cache(maxsize=1024)
+def format_engineering(value, unit="m", digits=2):
+    """
+    Formats a value in SI base units with the SI prefix of its exponent,
+    e.g. 1.2e-6 → '1.20 µm'. Gives the same output as pint's
+    f"{q.to_compact():.2f#~P}" without building a quantity.
+    """
+    value = float(value)
+    if value == 0 or not math.isfinite(value):
+        return f"{value:.{digits}f} {unit}"
+    power = min(max(math.floor(math.log10(abs(value)) / 3) * 3, -30), 30)
+    return f"{value / 10.0**power:.{digits}f} {ENGINEERING_PREFIXES[power]}{unit}"
+
+
+def format_engineering_array(values, unit="m", digits=2):
+    """
+    Vectorized format_engineering for whole arrays (tables, exports).
+
+    Returns:
+        numpy.ndarray: Array of strings with the shape of values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    regular = np.isfinite(values) & (values != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        power = np.where(regular, np.floor(np.log10(np.abs(values)) / 3) * 3, 0)
+    power = np.clip(power, -30, 30).astype(np.int64)
+    mantissa = np.where(regular, values / 10.0**power, values)
+    prefixes = np.array([ENGINEERING_PREFIXES[p] for p in range(-30, 31, 3)])
+    suffix = np.char.add(prefixes[(power + 30) // 3], unit)
+    return np.char.add(np.char.add(np.char.mod(f"%.{digits}f", mantissa), " "), suffix)
+
 
 class ValueConverter:
+    """
+    Converts between strings with units and floats in SI base units.
+    Has no Qt dependency: invalid input is reported through exceptions
+    (parse_float) or a None result (convert_to_float). GUI code can
+    override report_error to notify the user.
+    """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.ureg = UnitRegistry()
-        self.ureg.default_format = "~P"  # Kompakte SI-Darstellung
-        self._error_timer = QTimer()
-        self._error_timer.setSingleShot(True)
-        self._error_timer.timeout.connect(self._show_delayed_error)
-        self._pending_error = None
-        self._pending_parent = None
+        self.last_error = None
+
+    @property
+    def ureg(self):
+        return unit_registry()
+
+    def parse_float(self, value):
+        """
+        Konvertiert z. B. '1.2 µm' → 1.2e-6 (in Meter)
+
+        Raises:
+            ValueError: If the value cannot be parsed.
+        """
+        if isinstance(value, (int, float)):
+            return float(value)
+        return parse_quantity(str(value))
 
     def convert_to_float(self, value, parent=None):
         """
-        Konvertiert z. B. '1.2 µm' → 1.2e-6 (in Meter)
+        Konvertiert z. B. '1.2 µm' → 1.2e-6 (in Meter), None bei ungültiger Eingabe
         """
         try:
-            quantity = self.ureg.Quantity(value)
-            quantity = quantity.to_base_units()
-            return float(quantity.magnitude)
-        except Exception:
-            self._pending_error = value
-            self._pending_parent = parent
-            self._error_timer.start(1000)
+            return self.parse_float(value)
+        except ValueError:
+            self.report_error(value, parent)
             return None
 
     def convert_to_nearest_string(self, value, parent=None):
         """
-        Konvertiert z. B. 0.0000012 (Meter) → '1.2 µm'
+        Konvertiert z. B. 0.0000012 (Meter) → '1.20 µm'
         """
         try:
-            q = value * self.ureg.meter
-            q = q.to_compact()
-            return f"{q:.2f#~P}"  # Kompakte SI-Notation mit 3 signifikanten Stellen
-        except Exception:
-            self._pending_error = value
-            self._pending_parent = parent
-            self._error_timer.start(1000)
-            return f"{value:.3f}"
-
-    def _show_delayed_error(self):
-        if self._pending_error is not None:
-            QMessageBox.critical(
-                self._pending_parent,
-                "Error",
-                f"Unknown or invalid value: {self._pending_error}. Please enter a valid number with unit (e.g. '3.5 mm', '1.2 µm')."
-            )
-            self._pending_error = None
-            self._pending_parent = None
-
-    def _cancel_error(self):
-        self._error_timer.stop()
-        self._pending_error = None
-        self._pending_parent = None
+            return format_engineering(value)  # Kompakte SI-Notation mit 2 Nachkommastellen
+        except (TypeError, ValueError):
+            self.report_error(value, parent)
+            return str(value)
+
+    def convert_to_nearest_strings(self, values):
+        """
+        Konvertiert ein ganzes Array, z. B. [0.0000012, 0.1] (Meter) → ['1.20 µm', '100.00 mm']
+        """
+        return format_engineering_array(values)
+
+    def report_error(self, value, parent=None):
+        """Called for invalid input, the headless converter only remembers the value."""
+        self.last_error = value
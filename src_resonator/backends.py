@@ -0,0 +1,213 @@
+import numpy as np
+from src_resonator.population import PopulationOptimizer
+
+# Anfangsschrittweite von CMA-ES relativ zu den Grenzen
+CMA_SIGMA = 0.3
+# Neustart von CMA-ES, wenn die Verteilung kleiner als dieser Anteil der Grenzen ist
+CMA_RESTART_SIZE = 1e-10
+# Differentialgewicht (gleichverteilt pro Kandidat, "Dither") und Crossover-Rate der Differential Evolution
+DE_WEIGHT = (0.5, 1.0)
+DE_CROSSOVER = 0.9
+
+
+class CMAES(PopulationOptimizer):
+    """
+    Covariance matrix adaptation evolution strategy, (mu/mu_w, lambda)
+    with rank-one and rank-mu update as in Hansen's tutorial.
+
+    The free coordinates are scaled to [0, 1] by their bounds, a mirror
+    index i covers [i - 0.5, i + 0.5]. Candidates are drawn from the normal
+    distribution, clipped to the bounds, rounded for the discrete
+    coordinates and, with a stability screen, clamped into the stable l1
+    intervals. The distribution is updated from these repaired candidates,
+    their steps are limited in Mahalanobis length as for injected solutions
+    (Hansen 2011), the mean stays inside the bounds and the step size at
+    most covers them. Coordinates with lower == upper are held fixed.
+
+    A converged distribution (smaller than CMA_RESTART_SIZE or without any
+    fitness differences) restarts at a new random mean, which lets the
+    search leave the mirror pair it has settled on. The best so far is kept.
+    """
+
+    state_arrays = ("positions", "fitness", "global_best", "mean", "sigma", "C", "p_sigma", "p_c", "start")
+
+    def __init__(self, objective, lower, upper, discrete, population_number, rng=None, screen=None, sigma=CMA_SIGMA):
+        """
+        Args:
+            objective, lower, upper, discrete, population_number, rng, screen:
+                See PopulationOptimizer, population_number is lambda
+            sigma (float): Initial step size relative to the bounds
+        """
+        super().__init__(objective, lower, upper, discrete, max(2, population_number), rng, screen)
+        self.free = self.upper > self.lower
+        self.offset = self.lower - 0.5 * self.discrete
+        self.span = self.upper - self.lower + self.discrete
+        self.sigma0 = sigma
+
+        n = int(np.sum(self.free))
+        self.mu = self.population_number // 2
+        weights = np.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = weights / np.sum(weights)
+        self.mu_eff = 1 / np.sum(self.weights**2)
+        self.cc = (4 + self.mu_eff / n) / (n + 4 + 2 * self.mu_eff / n) if n else 0.0
+        self.cs = (self.mu_eff + 2) / (n + self.mu_eff + 5)
+        self.c1 = 2 / ((n + 1.3)**2 + self.mu_eff)
+        self.cmu = min(1 - self.c1, 2 * (self.mu_eff - 2 + 1 / self.mu_eff) / ((n + 2)**2 + self.mu_eff))
+        self.damps = 1 + 2 * max(0.0, np.sqrt((self.mu_eff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n**2)) if n else 1.0
+        self.initialize()
+
+    def initialize(self):
+        """New distribution around a uniform random mean."""
+        self.history = []
+        self.restart()
+        self.candidates()
+        self.fitness = np.full(self.population_number, np.inf)
+        self.global_best = self.positions[0].copy()
+        self.global_best_fitness = np.inf
+
+    def restart(self):
+        """Resets mean, step size, covariance and paths, start is the generation of the restart."""
+        n = int(np.sum(self.free))
+        self.mean = self.rng.random(n)
+        self.sigma = np.float64(self.sigma0)
+        self.C = np.eye(n)
+        self.p_sigma = np.zeros(n)
+        self.p_c = np.zeros(n)
+        self.start = np.float64(len(self.history))
+
+    def to_positions(self, u):
+        """Positions of scaled candidates, repaired to the bounds"""
+        positions = np.tile(self.lower, (len(u), 1))
+        positions[:, self.free] = self.offset[self.free] + u * self.span[self.free]
+        return self.repair(positions)
+
+    def to_unit(self, positions):
+        """Scaled free coordinates of positions"""
+        return (positions[:, self.free] - self.offset[self.free]) / self.span[self.free]
+
+    def candidates(self):
+        """Draws population_number samples of the distribution as repaired positions."""
+        eigenvalues, B = np.linalg.eigh(self.C)
+        z = self.rng.standard_normal((self.population_number, len(self.mean)))
+        u = np.clip(self.mean + self.sigma * (z * np.sqrt(np.maximum(eigenvalues, 0))) @ B.T, 0, 1)
+        self.positions = self.to_positions(u)
+        if self.screen is not None:
+            self.positions = self.screen.confine(self.positions, self.rng)
+
+    def evaluate(self):
+        """Evaluates the candidates and updates the global best."""
+        self.fitness = self.objective(self.positions)
+        self.update_best(self.positions, self.fitness)
+
+    def move(self):
+        """Updates mean, evolution paths, covariance and step size, then samples new candidates."""
+        n = len(self.mean)
+        if n:
+            order = np.argsort(self.fitness, kind="stable")[:self.mu]
+            eigenvalues, B = np.linalg.eigh(self.C)
+            inverse_root = (B / np.sqrt(np.maximum(eigenvalues, 1e-300))) @ B.T
+
+            # Reparierte Schritte auf die typische Länge einer Normalverteilung begrenzen
+            y = (self.to_unit(self.positions[order]) - self.mean) / self.sigma
+            length = np.linalg.norm(y @ inverse_root, axis=1)
+            limit = np.sqrt(n) + 2 * n / (n + 2)
+            y *= np.minimum(1, limit / np.maximum(length, 1e-300))[:, np.newaxis]
+            y_w = self.weights @ y
+            # Mittelwert in den Grenzen halten, sonst wachsen Pfade und Schrittweite an geklemmten Kandidaten
+            self.mean = np.clip(self.mean + self.sigma * y_w, 0, 1)
+
+            self.p_sigma = (1 - self.cs) * self.p_sigma + np.sqrt(self.cs * (2 - self.cs) * self.mu_eff) * (inverse_root @ y_w)
+            norm = np.linalg.norm(self.p_sigma)
+            generations = len(self.history) - self.start
+            h_sigma = norm / np.sqrt(1 - (1 - self.cs)**(2 * generations)) / self.chi_n < 1.4 + 2 / (n + 1)
+            self.p_c = (1 - self.cc) * self.p_c + h_sigma * np.sqrt(self.cc * (2 - self.cc) * self.mu_eff) * y_w
+
+            rank_one = np.outer(self.p_c, self.p_c) + (1 - h_sigma) * self.cc * (2 - self.cc) * self.C
+            rank_mu = (y * self.weights[:, np.newaxis]).T @ y
+            self.C = (1 - self.c1 - self.cmu) * self.C + self.c1 * rank_one + self.cmu * rank_mu
+            self.C = (self.C + self.C.T) / 2
+            self.sigma = min(self.sigma * np.exp((self.cs / self.damps) * (norm / self.chi_n - 1)), 1.0)
+            if self.sigma * np.sqrt(np.max(np.linalg.eigvalsh(self.C))) < CMA_RESTART_SIZE or np.ptp(self.fitness) == 0:
+                self.restart()
+        self.candidates()
+
+
+class DifferentialEvolution(PopulationOptimizer):
+    """
+    Differential evolution, rand/1/bin with a random weight per candidate.
+
+    Every member of the population gets a trial vector from three other
+    members, coordinates are crossed over with DE_CROSSOVER (at least one).
+    A trial replaces its parent if it is not worse. Trials outside the
+    bounds are set halfway between the parent and the bound, discrete
+    coordinates are rounded.
+    """
+
+    state_arrays = ("positions", "fitness", "population", "population_fitness", "global_best")
+
+    def __init__(self, objective, lower, upper, discrete, population_number, rng=None, screen=None,
+                 weight=DE_WEIGHT, crossover=DE_CROSSOVER):
+        """
+        Args:
+            objective, lower, upper, discrete, population_number, rng, screen:
+                See PopulationOptimizer
+            weight (tuple): Range of the differential weight F
+            crossover (float): Crossover rate CR
+        """
+        super().__init__(objective, lower, upper, discrete, max(4, population_number), rng, screen)
+        self.weight = weight
+        self.crossover = crossover
+        self.initialize()
+
+    def initialize(self):
+        """Uniform initial population, the first evaluation accepts all of it."""
+        shape = (self.population_number, self.dimension)
+        self.population = self.sample(shape)
+        if self.screen is not None:
+            self.population = self.screen.confine(self.population, self.rng, redraw=np.ones(self.population_number, dtype=bool))
+        self.population_fitness = np.full(self.population_number, np.inf)
+        self.positions = self.population.copy()
+        self.fitness = np.full(self.population_number, np.inf)
+        self.global_best = self.positions[0].copy()
+        self.global_best_fitness = np.inf
+        self.history = []
+
+    def evaluate(self):
+        """Evaluates the trials and keeps those that are not worse than their parents."""
+        self.fitness = self.objective(self.positions)
+        better = self.fitness <= self.population_fitness
+        self.population[better] = self.positions[better]
+        self.population_fitness[better] = self.fitness[better]
+        self.update_best(self.population, self.population_fitness)
+
+    def partners(self):
+        """(N, 3) indices of three distinct members per member, all different from it"""
+        count = self.population_number
+        own = np.arange(count)[:, np.newaxis]
+        indices = self.rng.integers(0, count, size=(count, 3))
+        while True:
+            # Kollidierende Zeilen neu ziehen, bei N >= 4 nur wenige Durchläufe
+            clash = np.any(indices == own, axis=1) | (indices[:, 0] == indices[:, 1]) \
+                | (indices[:, 0] == indices[:, 2]) | (indices[:, 1] == indices[:, 2])
+            if not np.any(clash):
+                return indices
+            indices[clash] = self.rng.integers(0, count, size=(int(np.sum(clash)), 3))
+
+    def move(self):
+        """Mutation, binomial crossover and bound repair of the trial vectors."""
+        shape = self.population.shape
+        r = self.partners()
+        weight = self.rng.uniform(*self.weight, size=(shape[0], 1))
+        mutant = self.population[r[:, 0]] + weight * (self.population[r[:, 1]] - self.population[r[:, 2]])
+        cross = self.rng.random(shape) < self.crossover
+        cross[np.arange(shape[0]), self.rng.integers(0, shape[1], size=shape[0])] = True
+        trial = np.where(cross, mutant, self.population)
+
+        # Außerhalb der Grenzen: halber Weg zwischen Elter und Grenze
+        trial = np.where(trial < self.lower, (self.lower + self.population) / 2, trial)
+        trial = np.where(trial > self.upper, (self.upper + self.population) / 2, trial)
+        trial = self.repair(trial)
+        if self.screen is not None:
+            trial = self.screen.confine(trial, self.rng)
+        self.positions = trial
@@ -0,0 +1,130 @@
+import os
+from dataclasses import replace
+from datetime import datetime
+from os import path
+import numpy as np
+from src_resonator.settings import OptimizationSettings
+
+# Standardordner für Checkpoints langer Optimierungen
+CHECKPOINT_DIR = path.abspath(path.join(path.dirname(path.dirname(__file__)), "Projects", "checkpoints"))
+
+
+def default_path(settings):
+    """New checkpoint file in CHECKPOINT_DIR, e.g. BowTie_20250101_120000.npz"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return path.join(CHECKPOINT_DIR, f"{settings.resonator_type}_{timestamp}.npz")
+
+
+def save_arrays(file_path, arrays):
+    """
+    Writes arrays to a compressed npz file. The file is written under a
+    temporary name and then renamed, so a crash never leaves a broken
+    checkpoint behind.
+    """
+    os.makedirs(path.dirname(path.abspath(file_path)), exist_ok=True)
+    temporary = file_path + ".tmp"
+    with open(temporary, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(temporary, file_path)
+
+
+def load_arrays(file_path):
+    """All arrays of an npz file as dict"""
+    with np.load(file_path) as data:
+        return {key: data[key] for key in data.files}
+
+
+class Checkpoint:
+    """
+    Progress of a multi-run optimization on disk.
+
+    The main file holds the settings, the root seed and the results of all
+    finished runs. Every unfinished run keeps the state of its swarm
+    (including the RNG state) in a file next to it, <name>.run<k>.npz,
+    written every settings.checkpoint_interval generations by the process
+    running it. Resuming skips the finished runs and continues the others
+    bit-identically.
+    """
+
+    def __init__(self, file_path, settings, entropy, results=None):
+        """
+        Args:
+            file_path (str): Main checkpoint file (.npz)
+            settings (OptimizationSettings): Settings of the optimization
+            entropy (int): Root seed, the runs use SeedSequence(entropy).spawn(num_runs)
+            results (dict): Run index -> (best position, fitness, history, stop reason)
+        """
+        self.file_path = file_path
+        self.settings = settings
+        self.entropy = int(entropy)
+        self.results = dict(results or {})
+
+    @classmethod
+    def create(cls, settings, entropy, file_path=None):
+        """New checkpoint, written immediately"""
+        checkpoint = cls(file_path or default_path(settings), settings, entropy)
+        checkpoint.save()
+        return checkpoint
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Reads a checkpoint written by save.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            KeyError: If the file is not a checkpoint.
+        """
+        data = load_arrays(file_path)
+        results = {}
+        histories = np.split(data["histories"], np.cumsum(data["history_lengths"])[:-1])
+        for run, position, value, history, reason in zip(
+                data["runs"], data["positions"], data["fitness"], histories, data["reasons"]):
+            results[int(run)] = (position, float(value), history, str(reason))
+        settings = OptimizationSettings.from_json(str(data["settings"]))
+        entropy = int(str(data["entropy"]))
+        if settings.seed is None:
+            # Checkpoints von vor OptimizationSettings.seed
+            settings = replace(settings, seed=entropy)
+        return cls(file_path, settings, entropy, results)
+
+    def seeds(self):
+        """SeedSequence of every run"""
+        return np.random.SeedSequence(self.entropy).spawn(self.settings.num_runs)
+
+    def pending(self):
+        """Indices of the runs that are not finished yet"""
+        return [run for run in range(self.settings.num_runs) if run not in self.results]
+
+    def run_path(self, run):
+        """Swarm state file of an unfinished run"""
+        return f"{path.splitext(self.file_path)[0]}.run{run}.npz"
+
+    def add(self, run, result):
+        """Stores the result of a finished run and drops its swarm state."""
+        self.results[run] = result
+        self.save()
+        if path.exists(self.run_path(run)):
+            os.remove(self.run_path(run))
+
+    def save(self):
+        """Writes the main file."""
+        runs = sorted(self.results)
+        dimension = len(self.settings.swarm_bounds()[0])
+        histories = [np.asarray(self.results[run][2], dtype=np.float64) for run in runs]
+        save_arrays(self.file_path, {
+            "settings": np.array(self.settings.to_json()),
+            "entropy": np.array(str(self.entropy)),
+            "runs": np.array(runs, dtype=np.int64),
+            "positions": np.array([self.results[run][0] for run in runs], dtype=np.float64).reshape(len(runs), dimension),
+            "fitness": np.array([self.results[run][1] for run in runs], dtype=np.float64),
+            "reasons": np.array([self.results[run][3] for run in runs], dtype=str),
+            "history_lengths": np.array([len(history) for history in histories], dtype=np.int64),
+            "histories": np.concatenate(histories) if histories else np.empty(0),
+        })
+
+    def remove(self):
+        """Deletes the main file and all swarm state files."""
+        for file_path in [self.file_path] + [self.run_path(run) for run in range(self.settings.num_runs)]:
+            if path.exists(file_path):
+                os.remove(file_path)
@@ -0,0 +1,103 @@
+import itertools
+import numpy as np
+from functools import partial
+from src_resonator.swarm import StoppingCriteria, abortable, build_optimizer, iter_tasks
+
+# Gitterpunkte pro kontinuierlicher Variable (außer l1) für das Aussortieren instabiler Spiegelkombinationen
+SCREEN_POINTS = 9
+# Höchstzahl an Gitterpunkten pro Block, begrenzt den Speicher bei großen Spiegelkatalogen
+SCREEN_CHUNK = 50000
+
+
+def mirror_combinations(settings):
+    """
+    All mirror index combinations of the resonator type. The mirrors have
+    different positions in the roundtrip, so (i, j) and (j, i) are distinct.
+
+    Returns:
+        numpy.ndarray: (P, mirror_count) array of mirror indices
+    """
+    count = len(settings.mirror_curvatures)
+    mirror_count = settings.resonator().mirror_count
+    return np.array(list(itertools.product(range(count), repeat=mirror_count)), dtype=np.float64)
+
+
+def screen(settings, combinations, points=SCREEN_POINTS):
+    """
+    Marks the mirror combinations that have a stable l1 interval at least
+    at one point of a regular grid over the other continuous bounds. l1
+    itself is not sampled, its stable intervals are computed analytically
+    (see stability.StabilityScreen). The grid is evaluated in batched
+    blocks of at most SCREEN_CHUNK points.
+
+    Returns:
+        numpy.ndarray: Boolean mask over the combinations
+    """
+    lower, upper, discrete = settings.swarm_bounds()
+    stability = settings.stability_screen()
+    if stability is None:
+        return np.ones(len(combinations), dtype=bool)
+    others = [i for i in np.flatnonzero(~discrete) if i != stability.index]
+    axes = [np.linspace(lower[i], upper[i], points) for i in others]
+    grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, len(axes)) if axes else np.empty((1, 0))
+
+    feasible = np.zeros(len(combinations), dtype=bool)
+    step = max(1, SCREEN_CHUNK // len(grid))
+    for first in range(0, len(combinations), step):
+        block = combinations[first:first + step]
+        positions = np.empty((len(block), len(grid), len(lower)))
+        positions[:, :, stability.index] = lower[stability.index]
+        positions[:, :, others] = grid
+        positions[:, :, discrete] = block[:, np.newaxis, :]
+        _, _, stable = stability.intervals(positions.reshape(-1, len(lower)))
+        feasible[first:first + step] = np.any(stable.reshape(len(block), -1), axis=1)
+    return feasible
+
+
+def optimize_combination(settings, task, deadline=None):
+    """
+    Continuous PSO over lengths and angles for fixed mirrors, used as
+    process pool worker.
+
+    Args:
+        settings (OptimizationSettings): Picklable problem description
+        task: (mirror indices, seed)
+        deadline (float): time.time() value of the wall-clock budget, see StoppingCriteria
+
+    Returns:
+        tuple: (best position, its fitness, best fitness per generation, stop reason)
+    """
+    mirrors, seed = task
+    optimizer = build_optimizer(settings, np.random.default_rng(seed), mirrors)
+    return optimizer.run(settings.generation_number, abortable(),
+                         StoppingCriteria.from_settings(settings, deadline))
+
+
+def feasible_combinations(settings):
+    """
+    All mirror combinations with a stable l1 interval somewhere on the
+    screening grid.
+
+    Returns:
+        tuple: (feasible combinations, total number of combinations)
+    """
+    combinations = mirror_combinations(settings)
+    return combinations[screen(settings, combinations)], len(combinations)
+
+
+def iter_combinations(settings, combinations, workers=1, seed=None, should_stop=None):
+    """
+    Runs a continuous sub-search for every mirror combination, distributed
+    over a process pool with more than one worker. population_number and
+    generation_number of the settings apply to every sub-search, the time
+    limit to all of them together.
+
+    Yields:
+        tuple: (mirror indices, (best position, fitness, history, stop reason)) as soon
+        as a sub-search is done
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(combinations))
+    tasks = list(zip(combinations, seeds))
+    function = partial(optimize_combination, settings, deadline=settings.deadline())
+    for index, result in iter_tasks(function, tasks, workers, should_stop):
+        yield combinations[index], result
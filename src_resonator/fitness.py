@@ -0,0 +1,176 @@
+import numpy as np
+
+# Fitness value of unstable resonators
+PENALTY = 1e6
+# Zielgrößen der Pareto-Optimierung, Spalten von objectives_batch
+OBJECTIVES = ("waist", "length", "astigmatism", "angle")
+
+
+def mirror_radii(mirror_indices, mirror_curvatures):
+    """
+    Looks up the radii of curvature for the mirror indices of a particle.
+    Indices are rounded towards int and clipped to the mirror table.
+
+    Args:
+        mirror_indices: Mirror indices of the particle
+        mirror_curvatures: Sequence of (r_sag, r_tan, is_round) tuples
+
+    Returns:
+        tuple: (r1_sag, r1_tan, r2_sag, r2_tan, ...) for all mirrors
+    """
+    radii = []
+    for index in mirror_indices:
+        index = int(np.clip(index, 0, len(mirror_curvatures) - 1))
+        r_sag, r_tan = mirror_curvatures[index][:2]
+        radii.extend((r_sag, r_tan))
+    return tuple(radii)
+
+
+def waist(A, B, D, wavelength):
+    """
+    Waist radius and stability value m = |(A + D) / 2| of a roundtrip.
+
+    Returns:
+        tuple: (waist, m), the waist is PENALTY for unstable roundtrips
+    """
+    m = np.abs((A + D) / 2)
+    b = np.abs(B)
+    if 1 - m**2 <= 0:
+        return PENALTY, m  # Bestrafe instabile Resonatoren
+    return np.sqrt(((b * wavelength) / (np.pi)) * (np.sqrt(np.abs(1 / (1 - m**2))))), m
+
+
+def evaluate(resonator_type, particle, mirror_curvatures, nc, lc, n_prop, wavelength):
+    """
+    Waists and stability values of the resonator described by a particle.
+
+    Args:
+        resonator_type: CompiledTopology of the resonator type
+        particle: Continuous coordinates (resonator_type.variables) followed
+            by the mirror indices
+        mirror_curvatures: Sequence of (r_sag, r_tan, is_round) tuples
+        nc, lc, n_prop, wavelength: Crystal index and length, refractive
+            index of the propagation medium and wavelength
+
+    Returns:
+        tuple: (waist_sag, waist_tan, m_sag, m_tan)
+    """
+    k = len(resonator_type.variables)
+    radii = mirror_radii(particle[k:k + resonator_type.mirror_count], mirror_curvatures)
+    A_sag, B_sag, C_sag, D_sag, A_tan, B_tan, C_tan, D_tan = resonator_type.roundtrip(
+        nc, lc, n_prop, *particle[:k], *radii)
+    waist_sag, m_sag = waist(A_sag, B_sag, D_sag, wavelength)
+    waist_tan, m_tan = waist(A_tan, B_tan, D_tan, wavelength)
+    return waist_sag, waist_tan, m_sag, m_tan
+
+
+def objective(resonator_type, particle, mirror_curvatures, nc, lc, n_prop, wavelength, target_sag, target_tan):
+    """
+    Fitness function of the resonator optimization.
+
+    Returns:
+        tuple: Single-element tuple containing the fitness value
+    """
+    waist_sag, waist_tan, m_sag, m_tan = evaluate(
+        resonator_type, particle, mirror_curvatures, nc, lc, n_prop, wavelength)
+
+    # Check for unstable resonators
+    if abs(m_sag) > 1 or abs(m_tan) > 1:
+        return PENALTY,
+
+    fitness_value, = resonator_type.set_fitness(waist_sag, waist_tan, target_sag, target_tan)
+    return (fitness_value,)
+
+
+def mirror_table(mirror_curvatures):
+    """(M, 2) array with the sagittal and tangential radius of every mirror"""
+    return np.asarray([curvature[:2] for curvature in mirror_curvatures], dtype=np.float64)
+
+
+def mirror_radii_batch(mirror_indices, table):
+    """
+    Vectorized mirror_radii for a whole population.
+
+    Args:
+        mirror_indices: (N, mirror_count) array of mirror indices
+        table: (M, 2) array from mirror_table
+
+    Returns:
+        numpy.ndarray: (N, 2 * mirror_count) array, r1_sag, r1_tan, r2_sag, r2_tan, ...
+    """
+    index = np.clip(mirror_indices, 0, len(table) - 1).astype(np.int64)
+    return table[index].reshape(index.shape[0], -1)
+
+
+def waist_batch(A, B, D, wavelength):
+    """Vectorized waist, unstable roundtrips get the waist PENALTY."""
+    m = np.abs((A + D) / 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        waist = np.sqrt(((np.abs(B) * wavelength) / (np.pi)) * (np.sqrt(np.abs(1 / (1 - m**2)))))
+    return np.where(1 - m**2 <= 0, PENALTY, waist), m
+
+
+def weighted_fitness(waist_sag, waist_tan, target_sag, target_tan):
+    """Vectorized set_fitness of the resonator types, the smaller waist counts double."""
+    d_sag = ((waist_sag - target_sag) / target_sag)**2
+    d_tan = ((waist_tan - target_tan) / target_tan)**2
+    return np.sqrt(np.where(waist_sag < waist_tan, 2 * d_sag, d_sag) + np.where(waist_sag > waist_tan, 2 * d_tan, d_tan))
+
+
+def objective_batch(resonator_type, positions, table, nc, lc, n_prop, wavelength, target_sag, target_tan):
+    """
+    Fitness of a whole population with one batched roundtrip call.
+
+    Args:
+        positions: (N, dimension) array, continuous coordinates followed by the mirror indices
+        table: (M, 2) array from mirror_table
+
+    Returns:
+        numpy.ndarray: (N,) fitness values, PENALTY for unstable resonators
+    """
+    waist_sag, waist_tan, m_sag, m_tan = evaluate_batch(resonator_type, positions, table, nc, lc, n_prop, wavelength)
+    fitness_value = weighted_fitness(waist_sag, waist_tan, target_sag, target_tan)
+    unstable = (m_sag > 1) | (m_tan > 1) | ~np.isfinite(fitness_value)
+    return np.where(unstable, PENALTY, fitness_value)
+
+
+def evaluate_batch(resonator_type, positions, table, nc, lc, n_prop, wavelength):
+    """
+    Vectorized evaluate.
+
+    Returns:
+        tuple: (waist_sag, waist_tan, m_sag, m_tan) as (N,) arrays
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    k = len(resonator_type.variables)
+    radii = mirror_radii_batch(positions[:, k:k + resonator_type.mirror_count], table)
+    roundtrip = resonator_type.roundtrip_batch(nc, lc, n_prop, positions[:, :k], radii)
+    waist_sag, m_sag = waist_batch(roundtrip[:, 0], roundtrip[:, 1], roundtrip[:, 3], wavelength)
+    waist_tan, m_tan = waist_batch(roundtrip[:, 4], roundtrip[:, 5], roundtrip[:, 7], wavelength)
+    return waist_sag, waist_tan, m_sag, m_tan
+
+
+def objectives_batch(resonator_type, positions, table, nc, lc, n_prop, wavelength, target_sag, target_tan):
+    """
+    All Pareto objectives of a whole population, to be minimized.
+
+    Columns (see OBJECTIVES): waist error as in objective_batch, geometric
+    roundtrip length including the crystal, astigmatism of the mode as
+    |ln(waist_sag / waist_tan)| and the angle of incidence on the folding
+    mirrors.
+
+    Returns:
+        numpy.ndarray: (N, 4) values, PENALTY in every column for unstable resonators
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    k = len(resonator_type.variables)
+    waist_sag, waist_tan, m_sag, m_tan = evaluate_batch(resonator_type, positions, table, nc, lc, n_prop, wavelength)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.stack((
+            weighted_fitness(waist_sag, waist_tan, target_sag, target_tan),
+            resonator_type.roundtrip_length(lc, positions[:, :k]),
+            np.abs(np.log(waist_sag / waist_tan)),
+            resonator_type.fold_angle(positions[:, :k]),
+        ), axis=1)
+    unstable = (m_sag > 1) | (m_tan > 1) | ~np.all(np.isfinite(values), axis=1)
+    return np.where(unstable[:, np.newaxis], PENALTY, values)
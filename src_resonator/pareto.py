@@ -0,0 +1,241 @@
+import numpy as np
+from functools import partial
+from src_resonator.fitness import PENALTY
+from src_resonator.population import PopulationOptimizer
+from src_resonator.swarm import StoppingCriteria, abortable, iter_tasks
+
+# Wert von OptimizationSettings.engine für die Mehrziel-Optimierung
+PARETO_ENGINE = "Pareto front"
+# Kreuzungswahrscheinlichkeit und Verteilungsindizes von SBX und polynomieller Mutation
+CROSSOVER_PROBABILITY = 0.9
+ETA_CROSSOVER = 15.0
+ETA_MUTATION = 20.0
+
+
+def non_dominated_ranks(values):
+    """
+    Fast non-dominated sorting with a dominance matrix, all objectives are
+    minimized. Memory grows with the square of the number of rows.
+
+    Args:
+        values: (N, M) objective values
+
+    Returns:
+        numpy.ndarray: (N,) front index per row, 0 is the Pareto front
+    """
+    values = np.asarray(values, dtype=np.float64)
+    # dominates[i, j]: i ist in keinem Ziel schlechter und in mindestens einem besser als j
+    dominates = np.all(values[:, np.newaxis] <= values[np.newaxis], axis=2) \
+        & np.any(values[:, np.newaxis] < values[np.newaxis], axis=2)
+    count = np.sum(dominates, axis=0)
+    ranks = np.full(len(values), -1)
+    rank = 0
+    current = np.flatnonzero(count == 0)
+    while len(current):
+        ranks[current] = rank
+        count[current] = -1
+        count -= np.sum(dominates[current], axis=0)
+        current = np.flatnonzero(count == 0)
+        rank += 1
+    return ranks
+
+
+def crowding_distance(values, ranks):
+    """
+    Crowding distance within each front, the extreme members of a front
+    get infinity.
+
+    Returns:
+        numpy.ndarray: (N,) distances
+    """
+    values = np.asarray(values, dtype=np.float64)
+    distance = np.zeros(len(values))
+    for rank in np.unique(ranks):
+        members = np.flatnonzero(ranks == rank)
+        for column in values[members].T:
+            order = np.argsort(column, kind="stable")
+            span = column[order[-1]] - column[order[0]]
+            distance[members[order[[0, -1]]]] = np.inf
+            if len(members) > 2 and span > 0:
+                distance[members[order[1:-1]]] += (column[order[2:]] - column[order[:-2]]) / span
+    return distance
+
+
+def pareto_mask(values):
+    """Boolean mask of the non-dominated rows"""
+    return non_dominated_ranks(values) == 0
+
+
+class NSGA2(PopulationOptimizer):
+    """
+    Multi-objective genetic algorithm in the style of NSGA-II.
+
+    Parents and offspring are ranked together by non-dominated sorting and
+    crowding distance, the best population_number survive. Offspring come
+    from binary tournaments, simulated binary crossover and polynomial
+    mutation, repaired to the bounds like the other backends. The first
+    objective column is the scalar fitness that drives history, global
+    best and the stopping criteria, the columns used for ranking can be
+    chosen.
+    """
+
+    state_arrays = ("positions", "fitness", "values", "population", "population_values", "rank", "crowding",
+                    "global_best")
+
+    def __init__(self, objectives, lower, upper, discrete, population_number, rng=None, screen=None, columns=None):
+        """
+        Args:
+            objectives: Function mapping an (N, dimension) array to (N, M) objective values
+            lower, upper, discrete, rng, screen: See PopulationOptimizer
+            population_number (int): Population size, rounded up to an even number
+            columns: Indices of the objective columns used for ranking, default all
+        """
+        super().__init__(objectives, lower, upper, discrete, population_number + population_number % 2, rng, screen)
+        self.columns = columns
+        self.initialize()
+
+    @classmethod
+    def from_settings(cls, settings, lower, upper, discrete, rng=None, screen=None):
+        """NSGA2 over the objectives selected in an OptimizationSettings snapshot"""
+        return cls(settings.objectives_batch(), lower, upper, discrete, settings.population_number,
+                   rng=rng, screen=screen, columns=settings.objective_columns())
+
+    def initialize(self):
+        """Uniform initial population, evaluated as the first offspring."""
+        shape = (self.population_number, self.dimension)
+        self.positions = self.sample(shape)
+        if self.screen is not None:
+            self.positions = self.screen.confine(self.positions, self.rng, redraw=np.ones(self.population_number, dtype=bool))
+        self.fitness = np.full(self.population_number, np.inf)
+        self.values = np.empty((self.population_number, 0))
+        self.population = self.positions.copy()
+        self.population_values = self.values.copy()
+        self.rank = np.zeros(self.population_number)
+        self.crowding = np.zeros(self.population_number)
+        self.global_best = self.positions[0].copy()
+        self.global_best_fitness = np.inf
+        self.history = []
+
+    def ranked(self, values):
+        """Objective columns used for ranking"""
+        return values if self.columns is None else values[:, list(self.columns)]
+
+    def evaluate(self):
+        """Evaluates the offspring and selects the next population from parents and offspring."""
+        self.values = self.objective(self.positions)
+        self.fitness = self.values[:, 0]
+        if self.history:
+            candidates = np.concatenate((self.population, self.positions))
+            values = np.concatenate((self.population_values, self.values))
+        else:
+            candidates, values = self.positions, self.values
+        rank = non_dominated_ranks(self.ranked(values))
+        crowding = crowding_distance(self.ranked(values), rank)
+        survivors = np.lexsort((-crowding, rank))[:self.population_number]
+        self.population = candidates[survivors]
+        self.population_values = values[survivors]
+        self.rank = rank[survivors].astype(np.float64)
+        self.crowding = crowding[survivors]
+        self.update_best(self.positions, self.fitness)
+
+    def move(self):
+        """Tournament selection, SBX crossover and polynomial mutation of the offspring."""
+        count, dimension = self.population.shape
+        a, b = self.rng.integers(0, count, size=(2, count))
+        better = (self.rank[a] < self.rank[b]) | ((self.rank[a] == self.rank[b]) & (self.crowding[a] > self.crowding[b]))
+        parents = self.population[np.where(better, a, b)]
+        first, second = parents[0::2], parents[1::2]
+
+        # Simulated binary crossover, pro Koordinate mit Wahrscheinlichkeit 1/2
+        u = self.rng.random(first.shape)
+        beta = np.where(u <= 0.5, (2 * u)**(1 / (ETA_CROSSOVER + 1)), (1 / (2 * (1 - u)))**(1 / (ETA_CROSSOVER + 1)))
+        cross = (self.rng.random(first.shape) < 0.5) & (self.rng.random((len(first), 1)) < CROSSOVER_PROBABILITY)
+        beta = np.where(cross, beta, 1.0)
+        children = np.concatenate((
+            0.5 * ((1 + beta) * first + (1 - beta) * second),
+            0.5 * ((1 - beta) * first + (1 + beta) * second),
+        ))
+
+        # Polynomielle Mutation, im Mittel eine Koordinate pro Kind
+        r = self.rng.random(children.shape)
+        delta = np.where(r < 0.5, (2 * r)**(1 / (ETA_MUTATION + 1)) - 1, 1 - (2 * (1 - r))**(1 / (ETA_MUTATION + 1)))
+        mutate = self.rng.random(children.shape) < 1 / dimension
+        children = np.where(mutate, children + delta * (self.upper - self.lower), children)
+        # Spiegelindizes haben keine Nachbarschaft, mutierte Indizes werden neu gezogen
+        children = np.where(mutate & self.discrete, self.sample(children.shape), children)
+
+        children = self.repair(children)
+        if self.screen is not None:
+            children = self.screen.confine(children, self.rng)
+        self.positions = children
+
+    def front(self):
+        """
+        Stable members of the current Pareto front, duplicates removed.
+
+        Returns:
+            tuple: (positions, objective values) of the front
+        """
+        members = (self.rank == 0) & (self.population_values[:, 0] < PENALTY)
+        positions, index = np.unique(self.population[members], axis=0, return_index=True)
+        return positions, self.population_values[members][index]
+
+
+def optimize_front(settings, seed=None, deadline=None, callback=None):
+    """
+    One NSGA-II run, used as process pool worker.
+
+    Args:
+        settings (OptimizationSettings): Picklable problem description
+        seed: Seed or numpy.random.SeedSequence of the run
+        deadline (float): time.time() value of the wall-clock budget, see StoppingCriteria
+        callback: Optional per-generation callback, see PopulationOptimizer.run
+
+    Returns:
+        tuple: (front positions, front objective values, best waist error per
+        generation, stop reason)
+    """
+    lower, upper, discrete = settings.swarm_bounds()
+    optimizer = NSGA2.from_settings(settings, lower, upper, discrete, np.random.default_rng(seed),
+                                    settings.stability_screen() if settings.stability_screening else None)
+    _, _, history, reason = optimizer.run(settings.generation_number, abortable(callback),
+                                          StoppingCriteria.from_settings(settings, deadline))
+    positions, values = optimizer.front()
+    return positions, values, history, reason
+
+
+def iter_fronts(settings, seeds, workers=1, should_stop=None, callback=None):
+    """
+    Runs one optimize_front per seed and yields (run index, result) as soon
+    as a run is done, see iter_tasks.
+
+    Args:
+        callback: Per-generation callback of the runs, only with a single worker
+    """
+    deadline = settings.deadline()
+    if workers <= 1 and callback is not None:
+        function = lambda seed: optimize_front(settings, seed, deadline, callback)
+    else:
+        function = partial(optimize_front, settings, deadline=deadline)
+    yield from iter_tasks(function, seeds, workers, should_stop)
+
+
+def merge_fronts(fronts, columns=None):
+    """
+    Pareto front of the union of several fronts.
+
+    Args:
+        fronts: Iterable of (positions, values)
+        columns: Objective columns used for the dominance, default all
+
+    Returns:
+        tuple: (positions, values) sorted by the first objective
+    """
+    fronts = list(fronts)
+    positions = np.concatenate([p for p, _ in fronts])
+    values = np.concatenate([v for _, v in fronts])
+    keep = pareto_mask(values if columns is None else values[:, list(columns)])
+    positions, index = np.unique(positions[keep], axis=0, return_index=True)
+    values = values[keep][index]
+    order = np.argsort(values[:, 0], kind="stable")
+    return positions[order], values[order]
@@ -0,0 +1,171 @@
+import abc
+import json
+import numpy as np
+
+# Gründe, aus denen ein Lauf endet
+STOP_GENERATIONS = "generations"
+STOP_TARGET = "target"
+STOP_PLATEAU = "plateau"
+STOP_DIAMETER = "diameter"
+STOP_TIME = "time limit"
+STOP_ABORTED = "aborted"
+
+
+def swarm_diameter(positions, center, lower, upper):
+    """
+    Size of a swarm as the median over the particles of their largest
+    distance to center, per coordinate relative to the bounds. The median
+    ignores the particles the mutation has just scattered.
+
+    Args:
+        positions: (N, dimension) array
+        center: Reference position, usually the global best
+        lower, upper: Bounds per coordinate, coordinates with lower == upper are skipped
+    """
+    span = np.asarray(upper, dtype=np.float64) - np.asarray(lower, dtype=np.float64)
+    free = span > 0
+    if not np.any(free):
+        return 0.0
+    distance = np.abs(np.asarray(positions)[:, free] - np.asarray(center)[free]) / span[free]
+    return float(np.median(np.max(distance, axis=1)))
+
+
+class PopulationOptimizer(abc.ABC):
+    """
+    Common interface of the batched optimizer backends.
+
+    A backend keeps its population as a (population, dimension) array in
+    positions. evaluate() scores all of them with one call of the batched
+    objective and updates the best so far, move() proposes the next
+    population. Everything the backend needs to continue a run is listed in
+    state_arrays, so get_state/set_state and the checkpoints work for every
+    backend. Discrete coordinates (mirror indices) are integers within the
+    inclusive bounds, the optional stability screen keeps l1 inside the
+    stable intervals.
+    """
+
+    # Attribute, die zusammen mit history, global_best_fitness und dem RNG den Zustand bilden
+    state_arrays = ("positions", "fitness", "global_best")
+
+    def __init__(self, objective, lower, upper, discrete, population_number, rng=None, screen=None):
+        """
+        Args:
+            objective: Function mapping an (N, dimension) array to (N,) fitness values
+            lower, upper: Bounds per coordinate (inclusive for discrete coordinates)
+            discrete: Boolean mask of the integer coordinates
+            population_number (int): Number of candidates per generation
+            rng (numpy.random.Generator): Random number generator
+            screen (StabilityScreen): Optional, keeps l1 inside the stable
+                intervals when sampling and moving
+        """
+        self.objective = objective
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.float64)
+        self.discrete = np.asarray(discrete, dtype=bool)
+        self.population_number = int(population_number)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.screen = screen
+        self.dimension = len(self.lower)
+
+    @classmethod
+    def from_settings(cls, settings, lower, upper, discrete, rng=None, screen=None):
+        """Backend with the coefficients of an OptimizationSettings snapshot"""
+        return cls(settings.objective_batch(), lower, upper, discrete, settings.population_number, rng=rng, screen=screen)
+
+    def sample(self, shape):
+        """Uniform positions inside the bounds, integers for discrete coordinates"""
+        positions = self.rng.uniform(self.lower, self.upper, size=shape)
+        integers = self.rng.integers(self.lower.astype(np.int64), self.upper.astype(np.int64) + 1, size=shape)
+        return np.where(self.discrete, integers, positions)
+
+    def repair(self, positions):
+        """Rounds the discrete coordinates and clips everything to the bounds."""
+        positions = np.where(self.discrete, np.rint(positions), positions)
+        return np.clip(positions, self.lower, self.upper)
+
+    @abc.abstractmethod
+    def initialize(self):
+        """Creates a new population, called by the constructor of the backend."""
+
+    @abc.abstractmethod
+    def evaluate(self):
+        """Evaluates positions and updates the best so far and history."""
+
+    @abc.abstractmethod
+    def move(self):
+        """Proposes the next positions."""
+
+    def update_best(self, positions, fitness):
+        """Takes the best of positions as global best if it improves, appends to history."""
+        best = np.argmin(fitness)
+        if fitness[best] < self.global_best_fitness:
+            self.global_best = positions[best].copy()
+            self.global_best_fitness = fitness[best]
+        self.history.append(self.global_best_fitness)
+
+    def get_state(self):
+        """
+        Everything needed to continue the run bit-identically, see set_state.
+
+        Returns:
+            dict: Arrays of state_arrays, history, global best fitness and the
+            RNG state as JSON text
+        """
+        state = {name: np.array(getattr(self, name), dtype=np.float64) for name in self.state_arrays}
+        state["global_best_fitness"] = np.float64(self.global_best_fitness)
+        state["history"] = np.asarray(self.history, dtype=np.float64)
+        state["rng_state"] = json.dumps(self.rng.bit_generator.state)
+        return state
+
+    def set_state(self, state):
+        """Restores a state from get_state (also loaded from an npz file)."""
+        for name in self.state_arrays:
+            setattr(self, name, np.array(state[name], dtype=np.float64))
+        self.global_best_fitness = float(state["global_best_fitness"])
+        self.history = list(np.asarray(state["history"], dtype=np.float64))
+        self.population_number = len(self.positions)
+        self.rng.bit_generator.state = json.loads(str(state["rng_state"]))
+
+    def step(self):
+        """One generation: evaluate, then move the population."""
+        self.evaluate()
+        self.move()
+
+    def diameter(self):
+        """swarm_diameter of the continuous coordinates around the global best"""
+        c = ~self.discrete
+        return swarm_diameter(self.positions[:, c], self.global_best[c], self.lower[c], self.upper[c])
+
+    def run(self, generation_count, callback=None, stopping=None, checkpoint=None):
+        """
+        Runs up to generation_count generations, a restored state
+        (set_state) continues after its last generation.
+
+        Args:
+            callback: Called with the generation index and the optimizer after
+                every generation, returning True aborts the run.
+            stopping (StoppingCriteria): Optional early stopping
+            checkpoint: Optional function called with the optimizer after
+                every completed generation, e.g. to save get_state()
+
+        Returns:
+            tuple: (global best position, its fitness, best fitness per
+            generation, STOP_* reason)
+        """
+        self.stop_reason = STOP_GENERATIONS
+        for gen in range(len(self.history), generation_count):
+            self.evaluate()
+            reason = None
+            if stopping is not None:
+                reason = stopping.reason(self.history, self.diameter() if stopping.diameter_tolerance > 0 else None)
+            if reason is None:
+                # Nach der Bewegung ist der Zustand vollständig, ein Abbruch kann dort fortgesetzt werden
+                self.move()
+                if checkpoint is not None:
+                    checkpoint(self)
+                if callback is not None and callback(gen, self):
+                    reason = STOP_ABORTED
+            if reason is not None:
+                self.stop_reason = reason
+                break
+        return self.global_best.copy(), self.global_best_fitness, np.asarray(self.history), self.stop_reason
@@ -1,10 +1,7 @@
-from src_resonator.resonator_types import *
-from src_physics.matrices import Matrices
 import numpy as np
 
 class Problem:
     def __init__(self, resonator_type=object):
-        self.matrices = Matrices()
         self.type = resonator_type
         
     def problem_dimension(self, *args, **kwargs):
@@ -13,36 +10,22 @@ class Problem:
         """
         return self.type.set_problem_dimension(*args, **kwargs)
 
-    def roundtrip_tangential(self, *args, **kwargs):
+    def roundtrip(self, *args, **kwargs):
         """
-        Calls the tangential roundtrip calculation on the resonator type.
+        Calls the compiled roundtrip kernel of the resonator type (see topology.CompiledTopology).
+        Returns (A, B, C, D) sagittal followed by (A, B, C, D) tangential.
         """
-        self.type.set_roundtrip_tangential(*args, **kwargs) # Set the parameters for the calculation
+        return self.type.roundtrip(*args, **kwargs)
 
-        result = None
-        for m in self.type.set_roundtrip_tangential(*args, **kwargs):
-            result = np.matmul(m, result) if result is not None else m
-        return result
-
-    def roundtrip_sagittal(self, *args, **kwargs):
+    def roundtrip_batch(self, *args, **kwargs):
         """
-        Calls the sagittal roundtrip calculation on the resonator type.
+        Calls the batched roundtrip kernel of the resonator type.
+        Returns an (N, 8) array with one roundtrip per particle.
         """
-        self.type.set_roundtrip_sagittal(*args, **kwargs)
-
-        result = None
-        for m in self.type.set_roundtrip_sagittal(*args, **kwargs):
-            result = np.matmul(m, result) if result is not None else m
-        return result
+        return self.type.roundtrip_batch(*args, **kwargs)
 
     def fitness(self, *args, **kwargs):
         """
         Calls the fitness calculation on the resonator type.
         """
         return self.type.set_fitness(*args, **kwargs)
-    
-    def optimization_parameters(self, *args, **kwargs):
-        """
-        Calls the parameters of the resonator type.
-        """
-        return self, type.parameters(*args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,192 @@
+import numpy as np
+from numba import njit
+from src_resonator import fitness
+from src_resonator.topology import FREE_SPACE_ELEMENT
+
+# Armijo-Konstante der Liniensuche
+_ARMIJO = 1e-4
+# Kleinste Schrittweite der Liniensuche, darunter gilt der Punkt als Minimum
+_MIN_STEP = 1e-20
+
+
+@njit(cache=True)
+def _chain(kinds, values, gradients, out, dout):
+    """
+    Multiplies the roundtrip elements in order (each one from the left) for
+    both planes and propagates the gradients by the product rule.
+
+    Args:
+        kinds: (E,) FREE_SPACE_ELEMENT or THIN_ELEMENT
+        values: (2, E) reduced length or mirror c per plane
+        gradients: (2, E, k) gradients of values
+        out: (2, 4) result (A, B, C, D) per plane
+        dout: (2, k, 4) result gradients
+    """
+    planes, count, k = gradients.shape
+    for p in range(planes):
+        out[p, 0], out[p, 1], out[p, 2], out[p, 3] = 1.0, 0.0, 0.0, 1.0
+        dout[p, :, :] = 0.0
+        for e in range(count):
+            v = values[p, e]
+            if kinds[e] == FREE_SPACE_ELEMENT:
+                # [[1, d], [0, 1]] @ M: A += d C, B += d D
+                for j in range(k):
+                    dv = gradients[p, e, j]
+                    dout[p, j, 0] += v * dout[p, j, 2] + dv * out[p, 2]
+                    dout[p, j, 1] += v * dout[p, j, 3] + dv * out[p, 3]
+                out[p, 0] += v * out[p, 2]
+                out[p, 1] += v * out[p, 3]
+            else:
+                # [[1, 0], [c, 1]] @ M: C += c A, D += c B
+                for j in range(k):
+                    dv = gradients[p, e, j]
+                    dout[p, j, 2] += v * dout[p, j, 0] + dv * out[p, 0]
+                    dout[p, j, 3] += v * dout[p, j, 1] + dv * out[p, 1]
+                out[p, 2] += v * out[p, 0]
+                out[p, 3] += v * out[p, 1]
+    return out
+
+
+def roundtrip_gradient(resonator, nc, lc, n0, x, radii):
+    """
+    Roundtrip and its analytic derivatives with respect to the continuous
+    coordinates, built from resonator.elements.
+
+    Args:
+        resonator: CompiledTopology of the resonator type
+        x: Continuous coordinates (resonator.variables)
+        radii: r1_sag, r1_tan, r2_sag, r2_tan, ...
+
+    Returns:
+        tuple: (roundtrip, jacobian), (8,) array in the order of the
+        roundtrip kernels and its (8, k) derivatives
+    """
+    elements = resonator.elements(nc, lc, n0, x, radii)
+    kinds = np.array([kind for kind, _, _ in elements], dtype=np.int64)
+    values = np.array([value for _, value, _ in elements], dtype=np.float64).T.copy()
+    gradients = np.array([gradient for _, _, gradient in elements], dtype=np.float64).transpose(1, 0, 2).copy()
+    out = np.empty((2, 4))
+    dout = np.empty((2, len(x), 4))
+    _chain(kinds, values, gradients, out, dout)
+    return out.reshape(8), dout.transpose(0, 2, 1).reshape(8, len(x))
+
+
+def waist_gradient(A, B, D, dA, dB, dD, wavelength):
+    """
+    Waist of a stable roundtrip (see fitness.waist) and its gradient.
+
+    w^2 = |B| lambda / pi / sqrt(1 - m^2) with m = (A + D) / 2, so
+    d(w^2) = lambda / pi * (sign(B) dB + |B| m dm / (1 - m^2)) / sqrt(1 - m^2).
+
+    Returns:
+        tuple: (waist, gradient), (inf, None) if the roundtrip is unstable
+    """
+    m = (A + D) / 2
+    if 1 - m**2 <= 0:
+        return np.inf, None
+    root = np.sqrt(1 - m**2)
+    w2 = np.abs(B) * wavelength / (np.pi * root)
+    dw2 = wavelength / (np.pi * root) * (np.sign(B) * dB + np.abs(B) * m * ((dA + dD) / 2) / (1 - m**2))
+    w = np.sqrt(w2)
+    return w, dw2 / (2 * w)
+
+
+def squared_fitness(resonator, x, radii, settings):
+    """
+    Square of the fitness (fitness.weighted_fitness) and its gradient. The
+    square is smooth at a perfect match, where the fitness itself has a kink.
+
+    Returns:
+        tuple: (value, gradient), (inf, None) for unstable resonators
+    """
+    roundtrip, jacobian = roundtrip_gradient(resonator, settings.nc, settings.lc, settings.n_prop, x, radii)
+    w_sag, dw_sag = waist_gradient(*roundtrip[[0, 1, 3]], *jacobian[[0, 1, 3]], settings.wavelength)
+    w_tan, dw_tan = waist_gradient(*roundtrip[[4, 5, 7]], *jacobian[[4, 5, 7]], settings.wavelength)
+    if dw_sag is None or dw_tan is None:
+        return np.inf, None
+    # Die kleinere Taille zählt doppelt, wie in weighted_fitness
+    weight_sag = 2.0 if w_sag < w_tan else 1.0
+    weight_tan = 2.0 if w_sag > w_tan else 1.0
+    e_sag = (w_sag - settings.target_sag) / settings.target_sag
+    e_tan = (w_tan - settings.target_tan) / settings.target_tan
+    value = weight_sag * e_sag**2 + weight_tan * e_tan**2
+    gradient = 2 * (weight_sag * e_sag * dw_sag / settings.target_sag + weight_tan * e_tan * dw_tan / settings.target_tan)
+    return value, gradient
+
+
+def refine(settings, position, max_iterations=200):
+    """
+    Polishes a particle with the mirrors held fixed: bounded BFGS on the
+    squared fitness with the analytic gradient.
+
+    The continuous coordinates are scaled to [0, 1] by their bounds.
+    Coordinates at a bound whose gradient points outwards are held (active
+    set), the others take a quasi-Newton step, projected onto the bounds
+    and shortened until the Armijo condition holds. The iteration ends
+    when no step improves the fitness any more, i.e. at machine precision.
+
+    Args:
+        settings (OptimizationSettings): Problem description
+        position: Particle, continuous coordinates followed by the mirror indices
+        max_iterations (int): Maximum number of quasi-Newton steps
+
+    Returns:
+        tuple: (refined position, its fitness, number of iterations), the
+        input unchanged if it is unstable
+    """
+    resonator = settings.resonator()
+    position = np.array(position, dtype=np.float64)
+    k = len(resonator.variables)
+    lower, upper, _ = settings.swarm_bounds()
+    lower, upper = lower[:k], upper[:k]
+    span = np.where(upper > lower, upper - lower, 1.0)
+    fixed = upper <= lower
+    radii = fitness.mirror_radii(position[k:k + resonator.mirror_count], settings.mirror_curvatures)
+
+    def evaluate(u):
+        value, gradient = squared_fitness(resonator, lower + u * span, radii, settings)
+        if gradient is None or not np.isfinite(value):
+            return np.inf, None
+        return value, np.where(fixed, 0.0, gradient * span)
+
+    u = np.clip((position[:k] - lower) / span, 0, 1)
+    value, gradient = evaluate(u)
+    if gradient is None:
+        return position, settings.objective(list(position))[0], 0
+
+    H = np.eye(k)
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        # Aktive Grenzen: Koordinaten, die der Gradient aus den Grenzen drücken würde
+        free = ~(fixed | ((u <= 0) & (gradient > 0)) | ((u >= 1) & (gradient < 0)))
+        if not np.any(free):
+            break
+        direction = np.zeros(k)
+        direction[free] = -H[np.ix_(free, free)] @ gradient[free]
+        if gradient @ direction >= 0:
+            # Keine Abstiegsrichtung mehr, zurück zum Gradientenschritt
+            H = np.eye(k)
+            direction = np.where(free, -gradient, 0.0)
+
+        step = 1.0
+        while step > _MIN_STEP:
+            u_new = np.clip(u + step * direction, 0, 1)
+            value_new, gradient_new = evaluate(u_new)
+            if value_new <= value + _ARMIJO * (gradient @ (u_new - u)) and value_new < value:
+                break
+            step /= 2
+        else:
+            break
+
+        s = u_new - u
+        y = gradient_new - gradient
+        sy = s @ y
+        if sy > 1e-12 * np.linalg.norm(s) * np.linalg.norm(y):
+            # BFGS-Update der inversen Hesse-Matrix
+            rho = 1 / sy
+            V = np.eye(k) - rho * np.outer(s, y)
+            H = V @ H @ V.T + rho * np.outer(s, s)
+        u, value, gradient = u_new, value_new, gradient_new
+
+    position[:k] = lower + u * span
+    return position, settings.objective(list(position))[0], iteration
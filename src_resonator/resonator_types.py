@@ -1,285 +1,78 @@
-import numpy as np
-from src_physics.matrices import Matrices
-
-class BowTie:
-
-    def __init__(self):
-        self.matrices = Matrices()
-        
-    def set_problem_dimension(self):
-        self.dimension = 5
-        return self.dimension
-
-    def set_roundtrip_direction(self):
-         self.l1 = self.l1
-         self.lc = self.lc
-         self.l3 = self.l3
-         self.theta = self.theta
-         self.l2 = ((2 * self.l1) + self.lc + self.l3) / (2 * np.cos(2*self.theta))
-         """Sets the direction of the roundtrip, only needed for plotting"""
-         vars = self.lc/2, self.l1, self.l2, self.l3, self.l2, self.l1, self.lc/2
-         return vars
-    
-    def set_roundtrip_tangential(self, nc, lc, n0, l1, l3, r1_tan, r2_tan, theta):
-            """Calculate the roundtrip matrix for the tangential plane"""
-            l2 = ((2 * l1) + lc + l3) / (2 * np.cos(2*theta))
-            
-            m1= self.matrices.free_space(lc / 2, nc)
-            m2= self.matrices.free_space(l1, n0)
-            m3= self.matrices.curved_mirror_tangential(r1_tan, theta)
-            m4= self.matrices.free_space(l2, n0)
-            m5= self.matrices.curved_mirror_tangential(r2_tan, theta)
-            m6= self.matrices.free_space(l3, n0)
-            m7= self.matrices.curved_mirror_tangential(r2_tan, theta)
-            m8= self.matrices.free_space(l2, n0)
-            m9= self.matrices.curved_mirror_tangential(r1_tan, theta)
-            m10= self.matrices.free_space(l1, n0)
-            m11= self.matrices.free_space(lc / 2, nc)
-
-            return m1, m2, m3, m4, m5, m6, m7, m8, m9, m10, m11
-
-    def set_roundtrip_sagittal(self, nc, lc, n0, l1, l3, r1_sag, r2_sag, theta):
-        """Calculate the roundtrip matrix for the sagittal plane"""
-        l2 = ((2 * l1) + lc + l3) / (2 * np.cos(2*theta))
-        
-        m1= self.matrices.free_space(lc / 2, nc)
-        m2= self.matrices.free_space(l1, n0)
-        m3= self.matrices.curved_mirror_sagittal(r1_sag, theta)
-        m4= self.matrices.free_space(l2, n0)
-        m5= self.matrices.curved_mirror_sagittal(r2_sag, theta)
-        m6= self.matrices.free_space(l3, n0)
-        m7= self.matrices.curved_mirror_sagittal(r2_sag, theta)
-        m8= self.matrices.free_space(l2, n0)
-        m9= self.matrices.curved_mirror_sagittal(r1_sag, theta)
-        m10= self.matrices.free_space(l1, n0)
-        m11= self.matrices.free_space(lc / 2, nc)
-
-        return m1, m2, m3, m4, m5, m6, m7, m8, m9, m10, m11        
-
-    def set_fitness(self, waist_sag, waist_tan, target_sag, target_tan):
-            """Calculate the fitness value for the Bowtie resonator"""
-            if waist_sag < waist_tan:
-                fitness_value = np.sqrt(
-                    2*((waist_sag - target_sag) / target_sag)**2 +  # Double weight for smaller waist
-                    ((waist_tan - target_tan) / target_tan)**2
-                )
-                return fitness_value,
-            if waist_sag > waist_tan:
-                fitness_value = np.sqrt(
-                    ((waist_sag - target_sag) / target_sag)**2 +
-                    2*((waist_tan - target_tan) / target_tan)**2    # Double weight for smaller waist
-                )
-                return fitness_value,
-
-            if waist_sag == waist_tan:
-                fitness_value = np.sqrt(
-                    ((waist_sag - target_sag) / target_sag)**2 +
-                    ((waist_tan - target_tan) / target_tan)**2
-                )
-                return fitness_value,
-
-class FabryPerot:
-     
-    def __init__(self):
-        self.matrices = Matrices()
-
-    def set_problem_dimension(self):
-        self.dimension = 2
-        return self.dimension
-
-    def set_roundtrip_direction(self):
-         self.l1 = self.l1
-         self.lc = self.lc
-         """Sets the direction of the roundtrip, only needed for plotting"""
-         return self.lc/2, self.l1, self.l1, self.lc, self.l1, self.l1, self.lc/2
-    
-    def set_roundtrip_tangential(self, nc, lc, n0, l1, r1_tan):
-        """Calculate the roundtrip matrix for the tangential plane"""
-
-        m1 = self.matrices.free_space(lc / 2, nc)
-        m2 = self.matrices.free_space(l1, n0)
-        m3 = self.matrices.curved_mirror_sagittal(r1_tan, 0)
-        m4 = self.matrices.free_space(l1, n0)
-        m5 = self.matrices.free_space(lc / 2, nc)
-
-        return m1, m2, m3, m4, m5
-
-    def set_roundtrip_sagittal(self, nc, lc, n0, l1, r1_sag):
-        """Calculate the roundtrip matrix for the sagittal plane"""
-        
-        m1 = self.matrices.free_space(lc / 2, nc)
-        m2 = self.matrices.free_space(l1, n0)
-        m3 = self.matrices.curved_mirror_sagittal(r1_sag, 0)
-        m4 = self.matrices.free_space(l1, n0)
-        m5 = self.matrices.free_space(lc / 2, nc)
-
-        return m1, m2, m3, m4, m5
-
-    def set_fitness(self, waist_sag, waist_tan, target_sag, target_tan):
-            """Calculate the fitness value for the Bowtie resonator"""
-            if waist_sag < waist_tan:
-                fitness_value = np.sqrt(
-                    2*((waist_sag - target_sag) / target_sag)**2 +  # Double weight for smaller waist
-                    ((waist_tan - target_tan) / target_tan)**2
-                )
-                return fitness_value,
-            if waist_sag > waist_tan:
-                fitness_value = np.sqrt(
-                    ((waist_sag - target_sag) / target_sag)**2 +
-                    2*((waist_tan - target_tan) / target_tan)**2    # Double weight for smaller waist
-                )
-                return fitness_value,
-
-            if waist_sag == waist_tan:
-                fitness_value = np.sqrt(
-                    ((waist_sag - target_sag) / target_sag)**2 +
-                    ((waist_tan - target_tan) / target_tan)**2
-                )
-                return fitness_value,
-            
-class Triangle:
-    
-    def __init__(self):
-        self.matrices = Matrices()
-
-    def set_problem_dimension(self):
-        self.dimension = 4
-        return self.dimension
-
-    def set_roundtrip_direction(self):
-         self.l1 = self.l1
-         self.lc = self.lc
-         self.l2 = self.l2
-         """Sets the direction of the roundtrip, only needed for plotting"""
-         return self.lc/2, self.l1, self.l2, self.l2, self.l1, self.lc/2
-    
-    def set_roundtrip_tangential(self, nc, lc, n0, l1, r1_tan, r2_tan, theta):
-        """Calculate the roundtrip matrix for the tangential plane"""
-        phi = (np.pi/2 - 2*theta)
-        l2 = (l1 + lc / 2)/np.cos(2 * theta)
-
-        m1 = self.matrices.free_space(lc / 2, nc)
-        m2 = self.matrices.free_space(l1, n0)
-        m3 = self.matrices.curved_mirror_tangential(r1_tan, theta)
-        m4 = self.matrices.free_space(l2, n0)
-        m5 = self.matrices.curved_mirror_tangential(r2_tan, phi)
-        m6 = self.matrices.free_space(l2, n0)
-        m7 = self.matrices.curved_mirror_tangential(r1_tan, theta)
-        m8 = self.matrices.free_space(l1, n0)
-        m9 = self.matrices.free_space(lc / 2, nc)
-
-        return m1, m2, m3, m4, m5, m6, m7, m8, m9
-
-    def set_roundtrip_sagittal(self, nc, lc, n0, l1, r1_sag, r2_sag, theta):
-        """Calculate the roundtrip matrix for the sagittal plane"""
-        phi = (np.pi/2 - 2*theta)
-        l2 = (l1 + lc / 2)/np.cos(2 * theta)
-
-        m1 = self.matrices.free_space(lc / 2, nc)
-        m2 = self.matrices.free_space(l1, n0)
-        m3 = self.matrices.curved_mirror_sagittal(r1_sag, theta)
-        m4 = self.matrices.free_space(l2, n0)
-        m5 = self.matrices.curved_mirror_sagittal(r2_sag, phi)
-        m6 = self.matrices.free_space(l2, n0)
-        m7 = self.matrices.curved_mirror_sagittal(r1_sag, theta)
-        m8 = self.matrices.free_space(l1, n0)
-        m9 = self.matrices.free_space(lc / 2, nc)
-        
-        return m1, m2, m3, m4, m5, m6, m7, m8, m9
-
-    def set_fitness(self, waist_sag, waist_tan, target_sag, target_tan):
-            """Calculate the fitness value for the Bowtie resonator"""
-            if waist_sag < waist_tan:
-                fitness_value = np.sqrt(
-                    2*((waist_sag - target_sag) / target_sag)**2 +  # Double weight for smaller waist
-                    ((waist_tan - target_tan) / target_tan)**2
-                )
-                return fitness_value,
-            if waist_sag > waist_tan:
-                fitness_value = np.sqrt(
-                    ((waist_sag - target_sag) / target_sag)**2 +
-                    2*((waist_tan - target_tan) / target_tan)**2    # Double weight for smaller waist
-                )
-                return fitness_value,
-
-            if waist_sag == waist_tan:
-                fitness_value = np.sqrt(
-                    ((waist_sag - target_sag) / target_sag)**2 +
-                    ((waist_tan - target_tan) / target_tan)**2
-                )
-                return fitness_value,
-            
-class Rectangle:
-    
-    def __init__(self):
-        self.matrices = Matrices()
-
-    def set_problem_dimension(self):
-        self.dimension = 4
-        return self.dimension
-
-    def set_roundtrip_direction(self):
-         self.l1 = self.l1
-         self.lc = self.lc
-         self.l2 = self.l2
-         self.l3 = (2 * self.l1) + self.lc
-         """Sets the direction of the roundtrip, only needed for plotting"""
-         return self.lc/2, self.l1, self.l2, self.l3, self.l2, self.l1, self.lc/2
-    
-    def set_roundtrip_tangential(self, nc, lc, n0, l1, l2, r1_tan, r2_tan):
-            """Calculate the roundtrip matrix for the tangential plane"""
-            l3 = (2 * l1) + lc
-            
-            m1= self.matrices.free_space(lc / 2, nc)
-            m2= self.matrices.free_space(l1, n0)
-            m3= self.matrices.curved_mirror_tangential(r1_tan, np.pi/4)
-            m4= self.matrices.free_space(l2, n0)
-            m5= self.matrices.curved_mirror_tangential(r2_tan, np.pi/4)
-            m6= self.matrices.free_space(l3, n0)
-            m7= self.matrices.curved_mirror_tangential(r2_tan, np.pi/4)
-            m8= self.matrices.free_space(l2, n0)
-            m9= self.matrices.curved_mirror_tangential(r1_tan, np.pi/4)
-            m10= self.matrices.free_space(l1, n0)
-            m11= self.matrices.free_space(lc / 2, nc)
-
-            return m1, m2, m3, m4, m5, m6, m7, m8, m9, m10, m11
-
-    def set_roundtrip_sagittal(self, nc, lc, n0, l1, l2, r1_sag, r2_sag):
-        """Calculate the roundtrip matrix for the sagittal plane"""
-        l3 = (2 * l1) + lc
-                   
-        m1= self.matrices.free_space(lc / 2, nc)
-        m2= self.matrices.free_space(l1, n0)
-        m3= self.matrices.curved_mirror_sagittal(r1_sag, np.pi/4)
-        m4= self.matrices.free_space(l2, n0)
-        m5= self.matrices.curved_mirror_sagittal(r2_sag, np.pi/4)
-        m6= self.matrices.free_space(l3, n0)
-        m7= self.matrices.curved_mirror_sagittal(r2_sag, np.pi/4)
-        m8= self.matrices.free_space(l2, n0)
-        m9= self.matrices.curved_mirror_sagittal(r1_sag, np.pi/4)
-        m10= self.matrices.free_space(l1, n0)
-        m11= self.matrices.free_space(lc / 2, nc)
-
-        return m1, m2, m3, m4, m5, m6, m7, m8, m9, m10, m11     
-
-    def set_fitness(self, waist_sag, waist_tan, target_sag, target_tan):
-            """Calculate the fitness value for the Bowtie resonator"""
-            if waist_sag < waist_tan:
-                fitness_value = np.sqrt(
-                    2*((waist_sag - target_sag) / target_sag)**2 +  # Double weight for smaller waist
-                    ((waist_tan - target_tan) / target_tan)**2
-                )
-                return fitness_value,
-            if waist_sag > waist_tan:
-                fitness_value = np.sqrt(
-                    ((waist_sag - target_sag) / target_sag)**2 +
-                    2*((waist_tan - target_tan) / target_tan)**2    # Double weight for smaller waist
-                )
-                return fitness_value,
-
-            if waist_sag == waist_tan:
-                fitness_value = np.sqrt(
-                    ((waist_sag - target_sag) / target_sag)**2 +
-                    ((waist_tan - target_tan) / target_tan)**2
-                )
-                return fitness_value,
\ No newline at end of file
+from src_resonator.topology import Topology, FREE_SPACE_ELEMENT, THIN_ELEMENT
+
+# Resonator topologies
+#
+# Each topology lists its roundtrip from the crystal center, see Topology.
+# compile_topology turns it into the batched roundtrip kernel, the particle
+# layout (variables followed by mirror_count mirror indices) and the
+# gradients of the refinement. A new layout only needs a new entry here.
+
+BowTie = Topology(
+    name="BowTie",
+    variables=("l1", "l3", "theta"),
+    mirror_count=2,
+    constraints=(("l2", "((2 * l1) + lc + l3) / (2 * cos(2*theta))"),),
+    elements=(
+        ("crystal", "lc / 2"), ("space", "l1"), ("mirror", 0, "theta"), ("space", "l2"),
+        ("mirror", 1, "theta"), ("space", "l3"), ("mirror", 1, "theta"), ("space", "l2"),
+        ("mirror", 0, "theta"), ("space", "l1"), ("crystal", "lc / 2"),
+    ),
+    angles=("theta",),
+    fold_angle="theta",
+    picture="bowtie_layout.png",
+)
+
+FabryPerot = Topology(
+    name="FabryPerot",
+    variables=("l1",),
+    mirror_count=1,
+    # Planer Endspiegel auf der anderen Seite des Kristalls
+    elements=(("crystal", "lc / 2"), ("space", "l1"), ("mirror", 0, "0"), ("space", "l1"), ("crystal", "lc / 2")),
+    picture="fabryperot_layout.png",
+    picture_height=50,
+)
+
+Triangle = Topology(
+    name="Triangle",
+    variables=("l1", "theta"),
+    mirror_count=2,
+    constraints=(("l2", "(l1 + (lc / 2)) / cos(2 * theta)"), ("phi", "pi/2 - 2*theta")),
+    elements=(
+        ("crystal", "lc / 2"), ("space", "l1"), ("mirror", 0, "theta"), ("space", "l2"),
+        ("mirror", 1, "phi"), ("space", "l2"), ("mirror", 0, "theta"), ("space", "l1"), ("crystal", "lc / 2"),
+    ),
+    angles=("theta",),
+    fold_angle="theta",
+    picture="triangle_layout.png",
+)
+
+Rectangle = Topology(
+    name="Rectangle",
+    variables=("l1", "l2"),
+    mirror_count=2,
+    constraints=(("l3", "(2 * l1) + lc"), ("theta", "pi/4")),
+    elements=(
+        ("crystal", "lc / 2"), ("space", "l1"), ("mirror", 0, "theta"), ("space", "l2"),
+        ("mirror", 1, "theta"), ("space", "l3"), ("mirror", 1, "theta"), ("space", "l2"),
+        ("mirror", 0, "theta"), ("space", "l1"), ("crystal", "lc / 2"),
+    ),
+    fold_angle="theta",
+    picture="rectangle_layout.png",
+)
+
+# Lineare Z-Faltung: Kristall mittig zwischen den gefalteten Spiegeln, plane Endspiegel hinter l1 und l3
+ZFold = Topology(
+    name="ZFold",
+    variables=("l1", "l2", "l3", "theta"),
+    mirror_count=2,
+    elements=(
+        ("crystal", "lc / 2"), ("space", "l2"), ("mirror", 0, "theta"), ("space", "l1"),
+        ("space", "l1"), ("mirror", 0, "theta"), ("space", "l2"), ("crystal", "lc"),
+        ("space", "l2"), ("mirror", 1, "theta"), ("space", "l3"),
+        ("space", "l3"), ("mirror", 1, "theta"), ("space", "l2"), ("crystal", "lc / 2"),
+    ),
+    angles=("theta",),
+    fold_angle="theta",
+)
+
+TOPOLOGIES = {topology.name: topology for topology in (BowTie, FabryPerot, Triangle, Rectangle, ZFold)}
@@ -1,15 +1,36 @@
 import json
+import os
 import numpy as np
+import pyqtgraph as pg
 import config
 from deap import base, creator, tools
 from os import path
-from PyQt5.QtWidgets import QMainWindow, QMessageBox
+from PyQt5.QtWidgets import QMainWindow, QMessageBox, QFileDialog
 from PyQt5 import uic
 from PyQt5.QtCore import QThread, pyqtSignal, QObject
 from PyQt5.QtGui import QPixmap
 from src_resonator.problem import Problem
-from src_resonator.resonator_types import *
-from src_physics.value_converter import ValueConverter
+from src_resonator import fitness
+from src_resonator.swarm import StoppingCriteria, STOP_GENERATIONS, STOP_ABORTED, BACKENDS, iter_runs, swarm_diameter
+from src_resonator.pareto import PARETO_ENGINE, iter_fronts, merge_fronts, pareto_mask
+from src_resonator.enumeration import feasible_combinations, iter_combinations
+from src_resonator.settings import OptimizationSettings, RESONATOR_TYPES, load_mirror_curvatures
+from src_resonator.checkpoint import Checkpoint, CHECKPOINT_DIR
+from src_resonator.telemetry import Telemetry
+from src_resonator.refine import refine
+from src_resonator.resonator_types import TOPOLOGIES
+from src_resonator.topology import compile_topology
+from GUI.errorHandler import GuiValueConverter
+from src_physics.optical_system import OpticalSystem, FREE_SPACE, LENS
+
+# Achsenbeschriftung, Einheit und Umrechnung der Pareto-Ziele (Winkel wie im Fenster als voller Winkel in Grad)
+OBJECTIVE_AXES = {
+    "waist": ("Waist error", "", lambda value: value),
+    "length": ("Roundtrip length", "m", lambda value: value),
+    "astigmatism": ("Astigmatism |ln(w_sag / w_tan)|", "", lambda value: value),
+    "angle": ("Fold angle", "°", lambda value: np.rad2deg(2 * value)),
+}
+
 
 class Resonator(QObject):
     """
@@ -24,7 +45,7 @@ class Resonator(QObject):
         self.resonator_type = None 
         self.ui_resonator = None
         self.mirror_curvatures = []
-        self.vc = ValueConverter()
+        self.vc = GuiValueConverter()
 
         # Attributes to store optimization results
         self.l1 = None
@@ -53,8 +74,10 @@ class Resonator(QObject):
             self.resonator_window
         )
         
-        # Set default value for comboBox_problem_class
-        self.ui_resonator.comboBox_problem_class.setCurrentText("BowTie")  # oder einen anderen Standardwert
+        # Resonatortypen aus den Topologie-Beschreibungen, BowTie als Standardwert
+        self.ui_resonator.comboBox_problem_class.clear()
+        self.ui_resonator.comboBox_problem_class.addItems(list(TOPOLOGIES))
+        self.ui_resonator.comboBox_problem_class.setCurrentText("BowTie")
         
         # Configure and show the window
         self.resonator_window.setWindowTitle("Resonator Configuration")
@@ -68,6 +91,8 @@ class Resonator(QObject):
             self.evaluate_resonator)
         self.ui_resonator.button_abort_resonator.clicked.connect(
             self.stop_optimization)
+        self.ui_resonator.button_resume_resonator.clicked.connect(
+            self.resume_optimization)
 
         self.ui_resonator.comboBox_problem_class.currentTextChanged.connect(
             self.config_ui)
@@ -75,6 +100,9 @@ class Resonator(QObject):
         self.ui_resonator.button_back.clicked.connect(self.handle_back_button)
         
         self.ui_resonator.pushButton_generate_setup.clicked.connect(self.emit_setup)
+
+        self.setup_convergence_plot()
+        self.setup_pareto_plot()
         
         # Call config_ui explicitly after setting up the UI
         self.config_ui()
@@ -82,13 +110,44 @@ class Resonator(QObject):
         # Show the window after configuration
         self.resonator_window.show()
 
+    def setup_convergence_plot(self):
+        """Prepares the live convergence plot, best fitness per generation on a log scale."""
+        plot = self.ui_resonator.plot_convergence
+        plot.setBackground('w')
+        plot.showGrid(x=True, y=True)
+        plot.setLogMode(y=True)
+        plot.setLabel('left', 'Best fitness', color='#333333')
+        plot.setLabel('bottom', 'Generation', color='#333333')
+        axis_pen = pg.mkPen(color='#333333')
+        plot.getAxis('left').setTextPen(axis_pen)
+        plot.getAxis('bottom').setTextPen(axis_pen)
+        self.convergence_curves = {}
+
+    def setup_pareto_plot(self):
+        """Prepares the Pareto front viewer, the axes are chosen from fitness.OBJECTIVES."""
+        plot = self.ui_resonator.plot_pareto
+        plot.setBackground('w')
+        plot.showGrid(x=True, y=True)
+        axis_pen = pg.mkPen(color='#333333')
+        plot.getAxis('left').setTextPen(axis_pen)
+        plot.getAxis('bottom').setTextPen(axis_pen)
+        for combo, default in ((self.ui_resonator.comboBox_pareto_x, "length"),
+                               (self.ui_resonator.comboBox_pareto_y, "waist")):
+            combo.addItems([OBJECTIVE_AXES[name][0] for name in fitness.OBJECTIVES])
+            combo.setCurrentIndex(fitness.OBJECTIVES.index(default))
+            combo.currentIndexChanged.connect(self.show_front)
+        self.front = None
+        self.front_scatter = pg.ScatterPlotItem()
+        self.front_scatter.sigClicked.connect(self.select_design)
+        plot.addItem(self.front_scatter)
+
     def emit_setup(self):
         # Erzeuge das optische System (als Beispiel, passe ggf. an)
-        optical_system = [
-            (self.parent().matrices.free_space, (0.1, 1)),
-            (self.parent().matrices.lens, 0.01),
-            (self.parent().matrices.free_space, (0.3, 1))
-        ]
+        optical_system = OpticalSystem([
+            (FREE_SPACE, (0.1, 1)),
+            (LENS, 0.01),
+            (FREE_SPACE, (0.3, 1))
+        ])
         self.setup_generated.emit(optical_system)
 
     def close_resonator_window(self):
@@ -126,86 +185,21 @@ class Resonator(QObject):
         Args:
             filepath (str): Path to the JSON file containing mirror definitions
         """
-        # Überprüfen, ob die Datei existiert
-        if not path.exists(filepath):
-            raise FileNotFoundError(f"Die Datei '{filepath}' wurde nicht gefunden.")
-
-        # Laden der JSON-Daten
-        with open(filepath, 'r') as file:
-            data = json.load(file)
-
-        # Extrahieren der Spiegel-Daten
-        self.mirror_curvatures = []
-        for component in data.get("components", []):
-            if component.get("type") == "MIRROR":
-                properties = component.get("properties", {})
-                curvature_tangential = properties.get("Radius of curvature tangential", 0.0)
-                curvature_sagittal = properties.get("Radius of curvature sagittal", 0.0)
-                is_round = properties.get("IS_ROUND", False)
-                
-                # Normale Variante speichern
-                self.mirror_curvatures.append((curvature_sagittal, curvature_tangential, is_round))
-                
-                # Für nicht-runde Spiegel zusätzlich die getauschte Variante speichern
-                if not is_round:
-                    self.mirror_curvatures.append((curvature_tangential, curvature_sagittal, is_round))
-                    
-        # Debugging-Ausgabe
-        if not self.mirror_curvatures:
-            raise ValueError("Die Liste 'mirror_curvatures' ist leer.")
+        self.mirror_curvatures = load_mirror_curvatures(filepath)
         
     def config_ui(self):
         self.selected_class_name = self.ui_resonator.comboBox_problem_class.currentText()
+        topology = TOPOLOGIES.get(self.selected_class_name)
+        if topology is None:
+            return
         base_path = path.abspath(path.join(path.dirname(__file__), "..", "assets"))
-        if self.selected_class_name == "BowTie":
-            self.ui_resonator.edit_lower_bound_l1.setDisabled(False)
-            self.ui_resonator.edit_upper_bound_l1.setDisabled(False)
-            self.ui_resonator.edit_lower_bound_l2.setDisabled(True)
-            self.ui_resonator.edit_upper_bound_l2.setDisabled(True)
-            self.ui_resonator.edit_lower_bound_l3.setDisabled(False)
-            self.ui_resonator.edit_upper_bound_l3.setDisabled(False)
-            self.ui_resonator.edit_lower_bound_theta.setDisabled(False)
-            self.ui_resonator.edit_upper_bound_theta.setDisabled(False)
-            graphic_path = path.join(base_path, "bowtie_layout.png")
-            graphic = QPixmap(graphic_path)
-            self.ui_resonator.layout_resonator_picture.setMaximumSize(500, 200)
-        elif self.selected_class_name == "FabryPerot":
-            self.ui_resonator.edit_lower_bound_l1.setDisabled(False)
-            self.ui_resonator.edit_upper_bound_l1.setDisabled(False)
-            self.ui_resonator.edit_lower_bound_l2.setDisabled(True)
-            self.ui_resonator.edit_upper_bound_l2.setDisabled(True)
-            self.ui_resonator.edit_lower_bound_l3.setDisabled(True)
-            self.ui_resonator.edit_upper_bound_l3.setDisabled(True)
-            self.ui_resonator.edit_lower_bound_theta.setDisabled(True)
-            self.ui_resonator.edit_upper_bound_theta.setDisabled(True)
-            graphic_path = path.join(base_path, "fabryperot_layout.png")
-            graphic = QPixmap(graphic_path)
-            self.ui_resonator.layout_resonator_picture.setMaximumSize(500, 50)
-        elif self.selected_class_name == "Rectangle":
-            self.ui_resonator.edit_lower_bound_l1.setDisabled(False)
-            self.ui_resonator.edit_upper_bound_l1.setDisabled(False)
-            self.ui_resonator.edit_lower_bound_l2.setDisabled(False)
-            self.ui_resonator.edit_upper_bound_l2.setDisabled(False)
-            self.ui_resonator.edit_lower_bound_l3.setDisabled(True)
-            self.ui_resonator.edit_upper_bound_l3.setDisabled(True)
-            self.ui_resonator.edit_lower_bound_theta.setDisabled(True)
-            self.ui_resonator.edit_upper_bound_theta.setDisabled(True)
-            graphic_path = path.join(base_path, "rectangle_layout.png")
-            graphic = QPixmap(graphic_path)
-            self.ui_resonator.layout_resonator_picture.setMaximumSize(500, 200)
-        elif self.selected_class_name == "Triangle":
-            self.ui_resonator.edit_lower_bound_l1.setDisabled(False)
-            self.ui_resonator.edit_upper_bound_l1.setDisabled(False)
-            self.ui_resonator.edit_lower_bound_l2.setDisabled(True)
-            self.ui_resonator.edit_upper_bound_l2.setDisabled(True)
-            self.ui_resonator.edit_lower_bound_l3.setDisabled(True)
-            self.ui_resonator.edit_upper_bound_l3.setDisabled(True)
-            self.ui_resonator.edit_lower_bound_theta.setDisabled(False)
-            self.ui_resonator.edit_upper_bound_theta.setDisabled(False)
-            graphic_path = path.join(base_path, "triangle_layout.png")
-            graphic = QPixmap(graphic_path)
-            self.ui_resonator.layout_resonator_picture.setMaximumSize(500, 200)
-            
+        # Nur die Grenzen der Variablen der Topologie sind editierbar
+        for name in ("l1", "l2", "l3", "theta"):
+            getattr(self.ui_resonator, f"edit_lower_bound_{name}").setDisabled(name not in topology.variables)
+            getattr(self.ui_resonator, f"edit_upper_bound_{name}").setDisabled(name not in topology.variables)
+        graphic = QPixmap(path.join(base_path, topology.picture)) if topology.picture else QPixmap()
+        self.ui_resonator.layout_resonator_picture.setMaximumSize(500, topology.picture_height)
+
         self.ui_resonator.layout_resonator_picture.setPixmap(graphic)
         config.set_temp_resonator_type(self.selected_class_name)
 
@@ -249,6 +243,47 @@ class Resonator(QObject):
     
         return l1_min, l1_max, l2_min, l2_max, l3_min, l3_max, theta_min, theta_max
     
+    def get_settings(self):
+        """
+        Reads all optimization inputs from the UI once.
+
+        Returns:
+            OptimizationSettings: Immutable snapshot for the optimization thread
+
+        Raises:
+            ValueError: If an input cannot be converted.
+        """
+        target_sag, target_tan, nc, lc, n_prop, wavelength = self.get_input()
+        l1_min, l1_max, l2_min, l2_max, l3_min, l3_max, theta_min, theta_max = self.getbounds()
+        num_runs, population_number, generation_number, phi1, phi2, smin, smax, mutation_probability = self.get_optimization_parameters()
+        plateau_generations, diameter_tolerance, target_fitness, time_limit = self.get_stopping_parameters()
+        bounds = (("l1", l1_min, l1_max), ("l2", l2_min, l2_max), ("l3", l3_min, l3_max), ("theta", theta_min, theta_max))
+
+        variables = RESONATOR_TYPES[self.selected_class_name].variables
+        required = [target_sag, target_tan, lc, wavelength] + [b for name, *limits in bounds if name in variables for b in limits]
+        if any(value is None or not np.isfinite(value) for value in required):
+            raise ValueError("Invalid target waist, crystal, wavelength or bound value.")
+        # Leeres Feld: neuer Seed, der nach dem Lauf in der Statusleiste steht
+        seed = self.ui_resonator.edit_seed.text().strip()
+        if seed and (not seed.isdigit()):
+            raise ValueError("The seed must be a non-negative integer.")
+
+        return OptimizationSettings(
+            resonator_type=self.selected_class_name,
+            bounds=bounds,
+            mirror_curvatures=tuple(self.mirror_curvatures),
+            target_sag=target_sag, target_tan=target_tan, nc=nc, lc=lc, n_prop=n_prop, wavelength=wavelength,
+            num_runs=num_runs, population_number=population_number, generation_number=generation_number,
+            phi1=phi1, phi2=phi2, smin=smin, smax=smax, mutation_probability=mutation_probability,
+            engine=self.ui_resonator.comboBox_engine.currentText(),
+            stability_screening=self.ui_resonator.checkBox_stability_screening.isChecked(),
+            plateau_generations=plateau_generations, diameter_tolerance=diameter_tolerance,
+            target_fitness=target_fitness, time_limit=time_limit,
+            checkpoint_interval=int(float(self.ui_resonator.edit_checkpoint_interval.text())),
+            refinement=self.ui_resonator.checkBox_refinement.isChecked(),
+            seed=int(seed) if seed else None,
+        ).with_seed()
+
     def get_optimization_parameters(self):
         """
         Retrieves optimization parameters from the UI.
@@ -266,6 +301,19 @@ class Resonator(QObject):
         mutation_probability = float(self.ui_resonator.edit_mutation_probability.text())
         return num_runs, population_number, generation_number, phi1, phi2, smin, smax, mutation_probability
 
+    def get_stopping_parameters(self):
+        """
+        Retrieves the early stopping criteria from the UI, 0 switches a criterion off.
+
+        Returns:
+            tuple: (plateau_generations, diameter_tolerance, target_fitness, time_limit)
+        """
+        plateau_generations = int(float(self.ui_resonator.edit_plateau_generations.text()))
+        diameter_tolerance = float(self.ui_resonator.edit_diameter_tolerance.text())
+        target_fitness = float(self.ui_resonator.edit_target_fitness.text())
+        time_limit = float(self.ui_resonator.edit_time_limit.text())
+        return plateau_generations, diameter_tolerance, target_fitness, time_limit
+
     def evaluate_resonator(self):
         """
         Starts the optimization process with multiple runs.
@@ -292,17 +340,9 @@ class Resonator(QObject):
             return
         
         self.selected_class_name = self.ui_resonator.comboBox_problem_class.currentText()
-        if self.selected_class_name == "BowTie":
-            self.resonator_type = BowTie()
-        elif self.selected_class_name == "FabryPerot":
-            self.resonator_type = FabryPerot()
-        elif self.selected_class_name == "Rectangle":
-            self.resonator_type = Rectangle()
-        elif self.selected_class_name == "Triangle":
-            self.resonator_type = Triangle()
-        else:
-            self.resonator_type = None
-        if self.selected_class_name is None:
+        topology = TOPOLOGIES.get(self.selected_class_name)
+        self.resonator_type = compile_topology(topology) if topology is not None else None
+        if self.resonator_type is None:
             QMessageBox.critical(
                 self.resonator_window,
                 "Error",
@@ -328,28 +368,80 @@ class Resonator(QObject):
 
         config.TEMP_FILE_PATH_LIB = self.temp_file_path
 
-        # Get optimization parameters
-        num_runs, population_number, generation_number, phi1, phi2, smin, smax, mutation_probability = self.get_optimization_parameters()
+        # Alle Eingaben einmalig lesen, der Optimierer greift danach nicht mehr auf Qt zu
+        try:
+            self.settings = self.get_settings()
+        except ValueError as e:
+            QMessageBox.critical(self.resonator_window, "Error", str(e))
+            return
+        settings = self.settings
+
+        total_generations = settings.num_runs * settings.generation_number
+        if settings.engine == "Mirror pairs":
+            # Alle Spiegelkombinationen, die irgendwo in den Grenzen stabil sein können
+            combinations, _ = feasible_combinations(settings)
+            if not len(combinations):
+                QMessageBox.critical(self.resonator_window, "Error", "No mirror combination is stable within the bounds.")
+                return
+            self.optimization_thread = MirrorEnumerationThread(settings, combinations)
+            total_generations = len(combinations)
+        elif settings.engine == PARETO_ENGINE:
+            # NSGA-II über alle gewählten Ziele, die Front wird im Reiter "Pareto front" angezeigt
+            self.optimization_thread = ParetoOptimizationThread(settings)
+            self.optimization_thread.front_finished.connect(self.front_finished)
+        elif settings.engine in BACKENDS:
+            # Ganze Population als NumPy-Arrays (PSO, CMA-ES oder DE), eine Bewertung pro Generation, mit Checkpoints
+            try:
+                checkpoint = Checkpoint.create(settings, settings.seed)
+            except OSError as e:
+                QMessageBox.critical(self.resonator_window, "Error", f"Could not write the checkpoint: {e}")
+                return
+            self.optimization_thread = SwarmOptimizationThread(settings, checkpoint=checkpoint)
+        else:
+            # DEAP setup for PSO with optimization parameters
+            self.size = self.problem.problem_dimension()
 
-        # DEAP setup for PSO with optimization parameters
-        self.size = self.problem.problem_dimension()
-        
-        toolbox = base.Toolbox()
-        toolbox.register("particle", self.generate, size=self.size, smin=smin, smax=smax)
-        toolbox.register("population", tools.initRepeat, list, toolbox.particle)
-        toolbox.register("update", self.update_particle, phi1=phi1, phi2=phi2, mutation_probability=mutation_probability)
-        toolbox.register("evaluate", self.objective)
-
-        # Create population with population_number
-        population = toolbox.population(n=population_number)
-
-        # Initialize optimization thread with multiple runs
-        self.optimization_thread = OptimizationThread(
-            self, population, toolbox, generation_number, num_runs
-        )
+            toolbox = base.Toolbox()
+            toolbox.register("particle", self.generate, size=self.size, smin=settings.smin, smax=settings.smax)
+            toolbox.register("population", tools.initRepeat, list, toolbox.particle)
+            toolbox.register("update", self.update_particle, phi1=settings.phi1, phi2=settings.phi2, mutation_probability=settings.mutation_probability)
+            toolbox.register("evaluate", self.objective)
+
+            # Create population with population_number
+            population = toolbox.population(n=settings.population_number)
 
+            # Initialize optimization thread with multiple runs
+            self.optimization_thread = OptimizationThread(population, toolbox, settings)
+
+        self.start_optimization(total_generations)
+
+    def resume_optimization(self):
+        """
+        Continues an interrupted Vectorized optimization from a checkpoint
+        file. The settings are taken from the checkpoint, not from the UI.
+        """
+        file_path, _ = QFileDialog.getOpenFileName(
+            self.resonator_window, "Resume optimization", CHECKPOINT_DIR, "Checkpoints (*.npz)")
+        if not file_path:
+            return
+        try:
+            checkpoint = Checkpoint.load(file_path)
+        except (OSError, KeyError, ValueError) as e:
+            QMessageBox.critical(self.resonator_window, "Error", f"Could not read the checkpoint: {e}")
+            return
+
+        self.settings = settings = checkpoint.settings
+        self.problem = Problem(settings.resonator())
+        self.lc = settings.lc
+        self.mirror_curvatures = list(settings.mirror_curvatures)
+        self.optimization_thread = SwarmOptimizationThread(settings, checkpoint=checkpoint)
+        self.start_optimization(settings.num_runs * settings.generation_number)
+        self.ui_resonator.statusbar.showMessage(
+            f"Resuming {settings.resonator_type}: {len(checkpoint.results)} of {settings.num_runs} runs done")
+
+    def start_optimization(self, total_generations):
+        """Connects the progress bar and result signals of self.optimization_thread and starts it."""
         # Setup progress bar
-        total_generations = num_runs * generation_number
         self.ui_resonator.progressBar_build_resonator.setMaximum(total_generations)
         self.ui_resonator.progressBar_build_resonator.setValue(0)
 
@@ -358,9 +450,82 @@ class Resonator(QObject):
         self.optimization_thread.progress.connect(
             self.ui_resonator.progressBar_build_resonator.setValue
         )
+        self.optimization_thread.run_finished.connect(self.run_finished)
+        self.optimization_thread.telemetry.connect(self.show_telemetry)
         self.optimization_thread.finished.connect(self.optimization_finished)
+        self.ui_resonator.plot_convergence.clear()
+        self.ui_resonator.plot_convergence.setLabel(
+            'bottom', 'Mirror combination' if self.settings.engine == "Mirror pairs" else 'Generation', color='#333333')
+        self.convergence_curves = {}
+        # Die Front gehört zu den alten Einstellungen
+        self.front = None
+        self.front_scatter.clear()
         self.optimization_thread.start()
 
+    def show_telemetry(self, snapshot):
+        """
+        Updates the convergence curve of the run and the live status, see
+        Telemetry.update. The mirror enumeration sends a single curve over
+        the finished combinations.
+        """
+        run = snapshot["run"]
+        history = snapshot["history"]
+        if run not in self.convergence_curves:
+            # Eine Kurve pro Lauf, Farben wie in pyqtgraph üblich über den Index
+            self.convergence_curves[run] = self.ui_resonator.plot_convergence.plot(
+                pen=pg.mkPen(pg.intColor(run, hues=max(9, self.settings.num_runs)), width=1.5))
+        self.convergence_curves[run].setData(np.arange(1, len(history) + 1), np.maximum(history, 1e-12))
+        m_sag, m_tan = snapshot["stability"]
+        step = "combination" if self.settings.engine == "Mirror pairs" else "generation"
+        self.ui_resonator.statusbar.showMessage(
+            f"Run {run + 1}, {step} {snapshot['generation']}: fitness {snapshot['best_fitness']:.3g}, "
+            f"stability {m_sag:.3f} / {m_tan:.3f}, {snapshot['evaluations_per_second']:.0f} evaluations/s")
+
+    def front_finished(self, front):
+        """Keeps the merged front of all runs and shows it in the Pareto tab."""
+        self.front = front
+        self.ui_resonator.tabWidget_plots.setCurrentWidget(self.ui_resonator.tab_pareto)
+        self.show_front()
+
+    def show_front(self, *args):
+        """
+        Scatter plot of the front over the two selected objectives, designs
+        that are also non-dominated in this projection are highlighted.
+        """
+        if self.front is None:
+            return
+        _, values = self.front
+        x = self.ui_resonator.comboBox_pareto_x.currentIndex()
+        y = self.ui_resonator.comboBox_pareto_y.currentIndex()
+        projected = pareto_mask(values[:, [x, y]])
+        brushes = [pg.mkBrush('#d62728') if visible else pg.mkBrush(120, 120, 120, 120) for visible in projected]
+        self.front_scatter.setData(
+            x=OBJECTIVE_AXES[fitness.OBJECTIVES[x]][2](values[:, x]),
+            y=OBJECTIVE_AXES[fitness.OBJECTIVES[y]][2](values[:, y]),
+            data=np.arange(len(values)), brush=brushes, size=np.where(projected, 9, 6), pen=None)
+        for axis, column in (('bottom', x), ('left', y)):
+            label, units = OBJECTIVE_AXES[fitness.OBJECTIVES[column]][:2]
+            self.ui_resonator.plot_pareto.setLabel(axis, label, units=units or None, color='#333333')
+
+    def select_design(self, scatter, points, *args):
+        """Shows the clicked design of the front like the result of an optimization."""
+        if self.front is None or not len(points):
+            return
+        index = int(points[0].data())
+        positions, values = self.front
+        particle = creator.Particle(positions[index])
+        particle.fitness.values = (values[index, 0],)
+        self.optimization_finished(particle)
+        summary = ", ".join(f"{OBJECTIVE_AXES[name][0].lower()} {OBJECTIVE_AXES[name][2](value):.4g}"
+                            for name, value in zip(fitness.OBJECTIVES, values[index]))
+        self.ui_resonator.statusbar.showMessage(f"Design {index + 1} of {len(values)}: {summary}")
+
+    def run_finished(self, run, best_fitness, report=""):
+        """Shows the best fitness so far and why the run stopped while the remaining runs are still going."""
+        self.ui_resonator.label_fitness.setText(f"={best_fitness:.3f}")
+        if report:
+            self.ui_resonator.statusbar.showMessage(f"Run {run + 1}: {report}")
+
     def optimization_finished(self, best):
         # Entpacken der gespeicherten Input-Werte aus dem Thread
         thread = self.optimization_thread
@@ -369,45 +534,26 @@ class Resonator(QObject):
         n_prop = thread.n_prop
         wavelength = thread.wavelength
 
-        # Entpacken der Werte aus dem besten Partikel
-        if self.selected_class_name == "BowTie":
-            self.l1, self.l3, self.theta, mirror1, mirror2 = best
-            self.l2 = ((2 * self.l1) + lc + self.l3) / (2 * np.cos(2*self.theta))
-        elif self.selected_class_name == "FabryPerot":
-            self.l1, mirror1 = best
-            self.l2, self.l3, self.theta, mirror2 = 0, 0, 0, 0
-        elif self.selected_class_name == "Rectangle":
-            self.l1, self.l2, mirror1, mirror2 = best
-            self.l3, self.theta = self.lc + (2 * self.l1), np.pi / 4
-        elif self.selected_class_name == "Triangle":
-            self.l1, self.theta, mirror1, mirror2 = best
-            self.l2 = (self.l1 + (lc / 2))/np.cos(2 * self.theta)
-            self.l3 = 0
+        # Entpacken der Werte aus dem besten Partikel, abgeleitete Größen aus den Nebenbedingungen
+        resonator = self.problem.type
+        k = len(resonator.variables)
+        quantities = resonator.quantities(lc, best[:k])
+        self.l1, self.l2, self.l3 = (quantities.get(name, 0.0) for name in ("l1", "l2", "l3"))
+        self.theta = float(resonator.fold_angle(np.array([best[:k]]))[0])
 
         # Berechnung der Krümmungswerte basierend auf den Indizes
-        mirror1 = int(np.clip(mirror1, 0, len(self.mirror_curvatures) - 1))
-        mirror2 = int(np.clip(mirror2, 0, len(self.mirror_curvatures) - 1))
-        self.r1_sag, self.r1_tan = self.mirror_curvatures[mirror1][:2]
-        self.r2_sag, self.r2_tan = self.mirror_curvatures[mirror2][:2]
+        radii = fitness.mirror_radii(best[k:k + resonator.mirror_count], self.settings.mirror_curvatures)
+        self.r1_sag, self.r1_tan = radii[:2]
+        self.r2_sag, self.r2_tan = radii[2:4] if resonator.mirror_count > 1 else (0.0, 0.0)
 
         # Berechnung der Waist-Größen mit den gespeicherten Werten
-        if self.selected_class_name == "BowTie":
-            roundtrip_matrix_sag = self.problem.roundtrip_sagittal(nc, lc, n_prop, self.l1, self.l3, self.r1_sag, self.r2_sag, self.theta)
-            roundtrip_matrix_tan = self.problem.roundtrip_tangential(nc, lc, n_prop, self.l1, self.l3, self.r1_tan, self.r2_tan, self.theta)
-        if self.selected_class_name == "FabryPerot":
-            roundtrip_matrix_sag = self.problem.roundtrip_sagittal(nc, lc, n_prop, self.l1, self.r1_sag)
-            roundtrip_matrix_tan = self.problem.roundtrip_tangential(nc, lc, n_prop, self.l1, self.r1_tan)
-        if self.selected_class_name == "Rectangle":
-            roundtrip_matrix_sag = self.problem.roundtrip_sagittal(nc, lc, n_prop, self.l1, self.l2, self.r1_sag, self.r2_sag)
-            roundtrip_matrix_tan = self.problem.roundtrip_tangential(nc, lc, n_prop, self.l1, self.l2, self.r1_tan, self.r2_tan)
-        if self.selected_class_name == "Triangle":
-            roundtrip_matrix_sag = self.problem.roundtrip_sagittal(nc, lc, n_prop, self.l1, self.r1_sag, self.r2_sag, self.theta)
-            roundtrip_matrix_tan = self.problem.roundtrip_tangential(nc, lc, n_prop, self.l1, self.r1_tan, self.r2_tan, self.theta)
-
-        m_sag = np.abs((roundtrip_matrix_sag[0, 0] + roundtrip_matrix_sag[1, 1])/2)
-        m_tan = np.abs((roundtrip_matrix_tan[0, 0] + roundtrip_matrix_tan[1, 1])/2)
-        b_sag = np.abs(roundtrip_matrix_sag[0, 1])
-        b_tan = np.abs(roundtrip_matrix_tan[0, 1])
+        roundtrip = self.problem.roundtrip(nc, lc, n_prop, *best[:k], *radii)
+        A_sag, B_sag, C_sag, D_sag, A_tan, B_tan, C_tan, D_tan = roundtrip
+
+        m_sag = np.abs((A_sag + D_sag)/2)
+        m_tan = np.abs((A_tan + D_tan)/2)
+        b_sag = np.abs(B_sag)
+        b_tan = np.abs(B_tan)
         self.waist_sag = np.sqrt(((b_sag * wavelength) / (np.pi)) * (np.sqrt(np.abs(1 / (1 - m_sag**2)))))
         self.waist_tan = np.sqrt(((b_tan * wavelength) / (np.pi)) * (np.sqrt(np.abs(1 / (1 - m_tan**2)))))
 
@@ -417,40 +563,22 @@ class Resonator(QObject):
         r2_tan = "\u221e" if self.r2_tan >= 1e+15 else self.r2_tan'''
 
         # Ausgabe der Ergebnisse
-        if self.selected_class_name == "BowTie":
-            config.set_temp_resonator_setup(self.waist_sag, self.waist_tan, self.l1, self.l2, self.l3, self.theta, self.r1_sag, self.r1_tan, self.r2_sag, self.r2_tan)
-            self.l2 = ((2*self.l1)+lc+self.l3)/(2*np.cos(2*self.theta))
-            self.ui_resonator.label_length1.setText(f"={self.vc.convert_to_nearest_string(self.l1, self.resonator_window)}")
-            self.ui_resonator.label_length2.setText(f"={self.vc.convert_to_nearest_string(self.l2, self.resonator_window)}")
-            self.ui_resonator.label_length3.setText(f"={self.vc.convert_to_nearest_string(self.l3, self.resonator_window)}")
-            self.ui_resonator.label_theta.setText(f"={np.rad2deg(2*self.theta):.3f} °")
+        config.set_temp_resonator_setup(self.waist_sag, self.waist_tan, self.l1, self.l2, self.l3, self.theta, self.r1_sag, self.r1_tan, self.r2_sag, self.r2_tan)
+        for label, name in ((self.ui_resonator.label_length1, "l1"), (self.ui_resonator.label_length2, "l2"),
+                            (self.ui_resonator.label_length3, "l3")):
+            label.setText(f"={self.vc.convert_to_nearest_string(quantities[name], self.resonator_window)}"
+                          if name in quantities else "=NAN")
+        self.ui_resonator.label_theta.setText(f"={np.rad2deg(2*self.theta):.3f} °")
+        if resonator.mirror_count > 1:
             self.ui_resonator.label_mirror2.setText(f"={self.vc.convert_to_nearest_string(self.r2_sag, self.resonator_window)} / {self.vc.convert_to_nearest_string(self.r2_tan, self.resonator_window)}")
-        elif self.selected_class_name == "FabryPerot":
-            config.set_temp_resonator_setup(self.waist_sag, self.waist_tan, self.l1, self.r1_sag, self.r1_tan)
-            self.ui_resonator.label_length1.setText(f"={self.vc.convert_to_nearest_string(self.l1, self.resonator_window)}")
-            self.ui_resonator.label_length2.setText(f"={self.vc.convert_to_nearest_string(self.l2, self.resonator_window)}")
-            self.ui_resonator.label_length3.setText(f"=NAN")
-            self.ui_resonator.label_theta.setText(f"=0.0 °")
+        else:
             self.ui_resonator.label_mirror2.setText(f"=NAN / NAN")
-        elif self.selected_class_name == "Rectangle":
-            config.set_temp_resonator_setup(self.waist_sag, self.waist_tan, self.l1, self.l2, self.r1_sag, self.r1_tan, self.r2_sag, self.r2_tan)
-            self.ui_resonator.label_length1.setText(f"={self.vc.convert_to_nearest_string(self.l1, self.resonator_window)}")
-            self.ui_resonator.label_length2.setText(f"={self.vc.convert_to_nearest_string(self.l2, self.resonator_window)}")
-            self.ui_resonator.label_length3.setText(f"={self.vc.convert_to_nearest_string(self.lc + (2 * self.l1), self.resonator_window)}")
-            self.ui_resonator.label_theta.setText(f"={np.rad2deg(2*self.theta):.3f} °")
-            self.ui_resonator.label_mirror2.setText(f"={self.vc.convert_to_nearest_string(self.r2_sag, self.resonator_window)} / {self.vc.convert_to_nearest_string(self.r2_tan, self.resonator_window)}")
-        elif self.selected_class_name == "Triangle":
-            config.set_temp_resonator_setup(self.waist_sag, self.waist_tan, self.l1, self.l2, self.theta, self.r1_sag, self.r1_tan, self.r2_sag, self.r2_tan)
-            self.l2 = (self.l1 + (lc / 2))/np.cos(2 * self.theta)
-            self.ui_resonator.label_length1.setText(f"={self.vc.convert_to_nearest_string(self.l1, self.resonator_window)}")
-            self.ui_resonator.label_length2.setText(f"={self.vc.convert_to_nearest_string(self.l2, self.resonator_window)}")
-            self.ui_resonator.label_length3.setText(f"=NAN")
-            self.ui_resonator.label_theta.setText(f"={np.rad2deg(2*self.theta):.3f} °")
-            self.ui_resonator.label_mirror2.setText(f"={self.vc.convert_to_nearest_string(self.r2_sag, self.resonator_window)} / {self.vc.convert_to_nearest_string(self.r2_tan, self.resonator_window)}")
         self.ui_resonator.label_mirror1.setText(f"={self.vc.convert_to_nearest_string(self.r1_sag, self.resonator_window)} / {self.vc.convert_to_nearest_string(self.r1_tan, self.resonator_window)}")
         self.ui_resonator.label_waist.setText(f"={self.vc.convert_to_nearest_string(self.waist_sag, self.resonator_window)} / {self.vc.convert_to_nearest_string(self.waist_tan, self.resonator_window)}")
         self.ui_resonator.label_fitness.setText(f"={best.fitness.values[0]:.3f}")
         self.ui_resonator.label_stability.setText(f"={m_sag:.3f} / {m_tan:.3f}")
+        self.ui_resonator.statusbar.showMessage(
+            ", ".join(filter(None, (thread.refinement_report, f"seed {self.settings.seed}"))))
         self.ui_resonator.button_evaluate_resonator.setEnabled(True)
         return best
 
@@ -464,73 +592,19 @@ class Resonator(QObject):
         Calculates resonator parameters and returns fitness value.
         
         Args:
-            individual: Particle containing [l1, l3, theta, mirror1, mirror2]
+            individual: Particle containing the continuous coordinates of the
+                resonator type followed by the mirror indices
         
         Returns:
             tuple: Single-element tuple containing the fitness value
         """
-        if self.selected_class_name == "BowTie":
-            # Extract individual parameters
-            l1, l3, theta, mirror1, mirror2 = individual
-        elif self.selected_class_name == "FabryPerot":
-            l1, mirror1 = individual
-            l3, theta, mirror2 = 0, 0, 0
-        elif self.selected_class_name == "Rectangle":
-            l1, l2, mirror1, mirror2 = individual
-            l3, theta = 0, np.pi / 4
-        elif self.selected_class_name == "Triangle":
-            l1, theta, mirror1, mirror2 = individual
-            l3 = 0
-
-        # Get mirror curvatures
-        mirror1 = int(np.clip(mirror1, 0, len(self.mirror_curvatures) - 1))
-        mirror2 = int(np.clip(mirror2, 0, len(self.mirror_curvatures) - 1))
-        r1_sag, r1_tan = self.mirror_curvatures[mirror1][:2]
-        r2_sag, r2_tan = self.mirror_curvatures[mirror2][:2]
-
-        # Calculate roundtrip matrices
-        if self.selected_class_name == "BowTie":
-            roundtrip_matrix_sag = self.problem.roundtrip_sagittal(self.nc, self.lc, self.n_prop, l1, l3, r1_sag, r2_sag, theta)
-            roundtrip_matrix_tan = self.problem.roundtrip_tangential(self.nc, self.lc, self.n_prop, l1, l3, r1_tan, r2_tan, theta)
-        elif self.selected_class_name == "FabryPerot":
-            roundtrip_matrix_sag = self.problem.roundtrip_sagittal(self.nc, self.lc, self.n_prop, l1, r1_sag)
-            roundtrip_matrix_tan = self.problem.roundtrip_tangential(self.nc, self.lc, self.n_prop, l1, r1_tan)
-        elif self.selected_class_name == "Rectangle":
-            roundtrip_matrix_sag = self.problem.roundtrip_sagittal(self.nc, self.lc, self.n_prop, l1, l2, r1_sag, r2_sag)
-            roundtrip_matrix_tan = self.problem.roundtrip_tangential(self.nc, self.lc, self.n_prop, l1, l2, r1_tan, r2_tan)
-        elif self.selected_class_name == "Triangle":
-            roundtrip_matrix_sag = self.problem.roundtrip_sagittal(self.nc, self.lc, self.n_prop, l1, r1_sag, r2_sag, theta)
-            roundtrip_matrix_tan = self.problem.roundtrip_tangential(self.nc, self.lc, self.n_prop, l1, r1_tan, r2_tan, theta)
-
-        # Extract matrix elements for stability calculation
-        m_sag = np.abs((roundtrip_matrix_sag[0, 0] + roundtrip_matrix_sag[1, 1]) / 2)
-        m_tan = np.abs((roundtrip_matrix_tan[0, 0] + roundtrip_matrix_tan[1, 1]) / 2)
-
-        # Calculate beam parameters
-        b_sag = np.abs(roundtrip_matrix_sag[0, 1])
-        b_tan = np.abs(roundtrip_matrix_tan[0, 1])
-
-        # Berechnung der Waist-Größen mit Sicherheitsprüfung
-        if 1 - m_sag**2 <= 0:
-            waist_sag = 1e6  # Bestrafe instabile Resonatoren
-        else:
-            waist_sag = np.sqrt(((b_sag * self.wavelength) / (np.pi)) * (np.sqrt(np.abs(1 / (1 - m_sag**2)))))
-
-        if 1 - m_tan**2 <= 0:
-            waist_tan = 1e6  # Bestrafe instabile Resonatoren
-        else:
-            waist_tan = np.sqrt(((b_tan * self.wavelength) / (np.pi)) * (np.sqrt(np.abs(1 / (1 - m_tan**2)))))
+        return self.settings.objective(individual)
 
-        # Check for unstable resonators
-        if abs(m_sag) > 1 or abs(m_tan) > 1:
-            return 1e6,
+    def variable_bounds(self):
+        """(min, max) of the continuous particle coordinates, taken from the captured settings"""
+        return [self.settings.bound(name) for name in RESONATOR_TYPES[self.settings.resonator_type].variables]
 
-        # Calculate fitness value using the Problem class
-        fitness_value, = self.problem.fitness(waist_sag, waist_tan, self.target_sag, self.target_tan)
-
-        return (fitness_value,)
-
-    def generate(self, size, smin, smax):
+    def generate(self, size, smin, smax, rng=None):
         """
         Generates a new particle for PSO.
 
@@ -538,49 +612,28 @@ class Resonator(QObject):
             size (int): Number of parameters per particle
             smin (float): Minimum velocity value
             smax (float): Maximum velocity value
+            rng (numpy.random.Generator): Random stream of the run, a new
+                unseeded one if None
 
         Returns:
             Particle: New particle with random initial position and velocity
         """
-        # Grenzen für l1, l3 und theta aus der UI
-        l1_min, l1_max, l2_min, l2_max, l3_min, l3_max, theta_min, theta_max = self.getbounds()
+        rng = rng if rng is not None else np.random.default_rng()
+        # Grenzen aus den einmalig gelesenen Einstellungen
+        bounds = self.variable_bounds()
 
         # Initialisiere Partikelpositionen und Geschwindigkeiten
-        if self.selected_class_name == "BowTie":
-            particle = creator.Particle([
-                np.random.uniform(l1_min, l1_max) if i == 0 else
-                np.random.uniform(l3_min, l3_max) if i == 1 else
-                np.random.uniform(theta_min, theta_max) if i == 2 else
-                np.random.randint(0, len(self.mirror_curvatures))
-                for i in range(size)
-            ])
-        elif self.selected_class_name == "FabryPerot":
-            particle = creator.Particle([
-                np.random.uniform(l1_min, l1_max) if i == 0 else
-                np.random.randint(0, len(self.mirror_curvatures))
-                for i in range(size)
-            ])
-        elif self.selected_class_name == "Rectangle":
-            particle = creator.Particle([
-                np.random.uniform(l1_min, l1_max) if i == 0 else
-                np.random.uniform(l2_min, l2_max) if i == 1 else
-                np.random.randint(0, len(self.mirror_curvatures))
-                for i in range(size)
-            ])
-        elif self.selected_class_name == "Triangle":
-            particle = creator.Particle([
-                np.random.uniform(l1_min, l1_max) if i == 0 else
-                np.random.uniform(theta_min, theta_max) if i == 1 else
-                np.random.randint(0, len(self.mirror_curvatures))
-                for i in range(size)
-            ])
-            
-        particle.speed = [np.random.uniform(smin, smax) for _ in range(size)]
+        particle = creator.Particle([
+            rng.uniform(*bounds[i]) if i < len(bounds) else
+            int(rng.integers(len(self.settings.mirror_curvatures)))
+            for i in range(size)
+        ])
+        particle.speed = [rng.uniform(smin, smax) for _ in range(size)]
         particle.smin = smin
         particle.smax = smax
         return particle
 
-    def update_particle(self, part, best, phi1, phi2, mutation_probability):
+    def update_particle(self, part, best, phi1, phi2, mutation_probability, rng=None):
         """
         Updates particle position and velocity with optional mutation.
         
@@ -590,9 +643,12 @@ class Resonator(QObject):
             phi1: Personal best weight
             phi2: Global best weight
             mutation_probability: Probability of mutation
+            rng (numpy.random.Generator): Random stream of the run, a new
+                unseeded one if None
         """
-        u1 = np.random.uniform(0, phi1, len(part))
-        u2 = np.random.uniform(0, phi2, len(part))
+        rng = rng if rng is not None else np.random.default_rng()
+        u1 = rng.uniform(0, phi1, len(part))
+        u2 = rng.uniform(0, phi2, len(part))
         v_u1 = [u * (b - p) for u, b, p in zip(u1, part.best, part)]
         v_u2 = [u * (b - p) for u, b, p in zip(u2, best, part)]
         part.speed = [v + vu1 + vu2 for v, vu1, vu2 in zip(part.speed, v_u1, v_u2)]
@@ -605,103 +661,88 @@ class Resonator(QObject):
                 part.speed[i] = part.smax
 
         # Positionsgrenzen einhalten
-        l1_min, l1_max, l2_min, l2_max, l3_min, l3_max, theta_min, theta_max = self.getbounds()
-        if self.selected_class_name == "BowTie":
-            part[:] = [
-                np.clip(p + v, l1_min, l1_max) if i == 0 else
-                np.clip(p + v, l3_min, l3_max) if i == 1 else
-                np.clip(p + v, theta_min, theta_max) if i == 2 else
-                int(np.clip(round(p + v), 0, len(self.mirror_curvatures) - 1))
-                for i, (p, v) in enumerate(zip(part, part.speed))
-            ]
-        elif self.selected_class_name == "FabryPerot":
-            part[:] = [
-                np.clip(p + v, l1_min, l1_max) if i == 0 else
-                int(np.clip(round(p + v), 0, len(self.mirror_curvatures) - 1))
-                for i, (p, v) in enumerate(zip(part, part.speed))
-            ]
-        elif self.selected_class_name == "Rectangle":
-            part[:] = [
-                np.clip(p + v, l1_min, l1_max) if i == 0 else
-                np.clip(p + v, l2_min, l2_max) if i == 1 else
-                int(np.clip(round(p + v), 0, len(self.mirror_curvatures) - 1))
-                for i, (p, v) in enumerate(zip(part, part.speed))
-            ]
-        elif self.selected_class_name == "Triangle":
-            part[:] = [
-                np.clip(p + v, l1_min, l1_max) if i == 0 else
-                np.clip(p + v, theta_min, theta_max) if i == 1 else
-                int(np.clip(round(p + v), 0, len(self.mirror_curvatures) - 1))
-                for i, (p, v) in enumerate(zip(part, part.speed))
-            ]
+        bounds = self.variable_bounds()
+        part[:] = [
+            np.clip(p + v, *bounds[i]) if i < len(bounds) else
+            int(np.clip(round(p + v), 0, len(self.settings.mirror_curvatures) - 1))
+            for i, (p, v) in enumerate(zip(part, part.speed))
+        ]
 
         # Mutation: Zufällige Änderung mit einer kleinen Wahrscheinlichkeit
         for i in range(len(part)):
-            if np.random.rand() < mutation_probability:
-                if self.selected_class_name == "BowTie":
-                    if i == 0:  # l1
-                        part[i] = np.random.uniform(l1_min, l1_max)
-                    elif i == 1:  # l3
-                        part[i] = np.random.uniform(l3_min, l3_max)
-                    elif i == 2:  # theta
-                        part[i] = np.random.uniform(theta_min, theta_max)
-                    else:  # mirror indices
-                        part[i] = np.random.randint(0, len(self.mirror_curvatures))
-                elif self.selected_class_name == "FabryPerot":
-                    if i == 0:  # l1
-                        part[i] = np.random.uniform(l1_min, l1_max)
-                    else:  # mirror index
-                        part[i] = np.random.randint(0, len(self.mirror_curvatures))
-                elif self.selected_class_name == "Rectangle":
-                    if i == 0:  # l1
-                        part[i] = np.random.uniform(l1_min, l1_max)
-                    elif i == 1:  # l2
-                        part[i] = np.random.uniform(l2_min, l2_max)
-                    else:  # mirror index
-                        part[i] = np.random.randint(0, len(self.mirror_curvatures))
-                elif self.selected_class_name == "Triangle":
-                    if i == 0:
-                        part[i] = np.random.uniform(l1_min, l1_max)
-                    elif i == 1:
-                        part[i] = np.random.uniform(theta_min, theta_max)
-                    else:  # mirror index
-                        part[i] = np.random.randint(0, len(self.mirror_curvatures))
+            if rng.random() < mutation_probability:
+                if i < len(bounds):  # kontinuierliche Variable
+                    part[i] = rng.uniform(*bounds[i])
+                else:  # mirror indices
+                    part[i] = int(rng.integers(len(self.settings.mirror_curvatures)))
+
+
+def refine_best(settings, best):
+    """
+    Gradient refinement of the best particle of an optimization with the
+    mirrors held fixed, if enabled in the settings (see refine.refine).
+
+    Returns:
+        tuple: (particle, report for the status bar, empty if not refined)
+    """
+    if best is None or not settings.refinement:
+        return best, ""
+    position, value, iterations = refine(settings, best)
+    if not value < best.fitness.values[0]:
+        return best, ""
+    refined = creator.Particle(position)
+    refined.fitness.values = (value,)
+    return refined, f"Refined fitness {best.fitness.values[0]:.3g} -> {value:.3g} in {iterations} iterations"
 
 
 class OptimizationThread(QThread):
     progress = pyqtSignal(int)  # Signal für den Fortschritt
     finished = pyqtSignal(object)  # Signal für das beste Ergebnis
+    run_finished = pyqtSignal(int, float, str)  # Lauf-Nummer, bisher beste Fitness und Abbruchgrund
+    telemetry = pyqtSignal(object)  # Gedrosselte Live-Daten, siehe Telemetry.update
 
-    def __init__(self, resonator, population, toolbox, generation_count, num_runs):
+    def __init__(self, population, toolbox, settings):
         super().__init__()
-        self.resonator = resonator
         self.population = population
         self.toolbox = toolbox
-        self.generation_count = generation_count
-        self.num_runs = num_runs  # Anzahl der Läufe
+        self.settings = settings
+        self.generation_count = settings.generation_number
+        self.num_runs = settings.num_runs  # Anzahl der Läufe
         self.abort_flag = False
         self.best_overall = None  # Bestes Ergebnis über alle Läufe hinweg
+        self.stop_reasons = []
+        self.refinement_report = ""
 
         # Speichern der Input-Werte
-        inputs = self.resonator.get_input()
-        self.target_sag, self.target_tan, self.nc, self.lc, self.n_prop, self.wavelength = inputs
+        self.target_sag, self.target_tan = settings.target_sag, settings.target_tan
+        self.nc, self.lc, self.n_prop, self.wavelength = settings.nc, settings.lc, settings.n_prop, settings.wavelength
 
     def run(self):
         current_progress = 0
+        live = Telemetry(self.settings)
+        stopping = StoppingCriteria.from_settings(self.settings, self.settings.deadline())
+        lower, upper, discrete = self.settings.swarm_bounds()
+        continuous = ~discrete
+        seeds = self.settings.run_seeds()
 
         for run in range(self.num_runs):
             if self.abort_flag:
                 break
 
-            # Initialisiere die Population für den aktuellen Lauf
+            # Initialisiere die Population für den aktuellen Lauf aus seinem eigenen Zufallsstrom
+            rng = np.random.default_rng(seeds[run])
+            self.population = [self.toolbox.particle(rng=rng) for _ in self.population]
             for part in self.population:
                 part.fitness.values = (float('inf'),)  # Setze die Fitness auf einen hohen Wert
                 part.best = None
 
             best = None  # Bestes Ergebnis für den aktuellen Lauf
+            history = []
+            reason = STOP_GENERATIONS
 
             for gen in range(self.generation_count):
                 if self.abort_flag:
+                    reason = STOP_ABORTED
                     break
 
                 for part in self.population:
@@ -713,19 +754,220 @@ class OptimizationThread(QThread):
                         best = creator.Particle(part)
                         best.fitness.values = part.fitness.values
 
+                # Fortschritt melden, gedrosselt statt in jeder Generation
+                current_progress += 1
+                history.append(best.fitness.values[0])
+                snapshot = live.update(run, gen + 1, len(self.population), best, best.fitness.values[0], history)
+                if snapshot is not None:
+                    self.progress.emit(current_progress)
+                    self.telemetry.emit(snapshot)
+
+                # Abbruchkriterien prüfen
+                diameter = swarm_diameter(np.array(self.population)[:, continuous], np.array(best)[continuous],
+                                          lower[continuous], upper[continuous]) \
+                    if stopping.diameter_tolerance > 0 else None
+                stop = stopping.reason(history, diameter)
+                if stop is not None:
+                    reason = stop
+                    break
+
                 for part in self.population:
-                    self.toolbox.update(part, best)
+                    self.toolbox.update(part, best, rng=rng)
 
-                # Fortschritt melden
-                current_progress += 1
-                self.progress.emit(current_progress)
+            # Vorzeitig beendete Läufe zählen voll
+            current_progress = (run + 1) * self.generation_count
+            self.progress.emit(current_progress)
+            if best is None:
+                break
+            self.telemetry.emit(live.update(run, len(history), 0, best, best.fitness.values[0], history, force=True))
 
             # Vergleiche das beste Ergebnis des aktuellen Laufs mit dem besten Gesamt-Ergebnis
             if not self.best_overall or best.fitness.values[0] < self.best_overall.fitness.values[0]:
                 self.best_overall = best
+            self.stop_reasons.append(reason)
+            self.run_finished.emit(run, self.best_overall.fitness.values[0],
+                                   f"{reason} after {len(history)} generations, fitness {best.fitness.values[0]:.3g}")
 
-        # Signal mit dem besten Ergebnis aller Läufe senden
+        # Signal mit dem (nachgeschärften) besten Ergebnis aller Läufe senden
+        self.best_overall, self.refinement_report = refine_best(self.settings, self.best_overall)
         self.finished.emit(self.best_overall)
 
     def stop(self):
-        self.abort_flag = True
\ No newline at end of file
+        self.abort_flag = True
+
+class SwarmOptimizationThread(QThread):
+    """
+    Runs the vectorized SwarmOptimizer, emits the same signals as OptimizationThread.
+    Independent runs are distributed over a process pool when more than one
+    core is available, run_finished reports every run as soon as it is done.
+    """
+    progress = pyqtSignal(int)  # Signal für den Fortschritt
+    finished = pyqtSignal(object)  # Signal für das beste Ergebnis
+    run_finished = pyqtSignal(int, float, str)  # Lauf-Nummer, bisher beste Fitness und Abbruchgrund
+    telemetry = pyqtSignal(object)  # Gedrosselte Live-Daten, siehe Telemetry.update
+
+    def __init__(self, settings, workers=None, checkpoint=None):
+        super().__init__()
+        self.settings = settings
+        self.generation_count = settings.generation_number
+        self.num_runs = settings.num_runs
+        self.workers = min(self.num_runs, workers or os.cpu_count() or 1)
+        self.checkpoint = checkpoint
+        self.abort_flag = False
+        self.best_overall = None
+        self.histories = []
+        self.stop_reasons = []
+        self.refinement_report = ""
+
+        # Speichern der Input-Werte
+        self.target_sag, self.target_tan = settings.target_sag, settings.target_tan
+        self.nc, self.lc, self.n_prop, self.wavelength = settings.nc, settings.lc, settings.n_prop, settings.wavelength
+
+    def run(self):
+        self.current_progress = 0
+        self.completed_runs = 0
+        self.best_fitness = np.inf
+        self.live_telemetry = Telemetry(self.settings)
+        checkpoint = self.checkpoint
+        if checkpoint is not None:
+            # Bereits abgeschlossene Läufe eines fortgesetzten Checkpoints übernehmen
+            for run, result in sorted(checkpoint.results.items()):
+                self.finish_run(run, result)
+
+        # Ein Worker: Fortschritt und Live-Daten pro Generation (gedrosselt), sonst pro Lauf
+        sequential = self.workers <= 1
+        callback = self.report if sequential else None
+        pending = checkpoint.pending() if checkpoint is not None else list(range(self.num_runs))
+        self.current_run = pending[0] if pending else 0
+        seeds = self.settings.run_seeds()
+        for run, result in iter_runs(self.settings, seeds, self.workers, lambda: self.abort_flag, checkpoint, callback):
+            # Die Bewertungen sequentieller Läufe hat report schon gezählt
+            self.finish_run(run, result, 0 if sequential else len(result[2]) * self.settings.population_number)
+            pending.remove(run)
+            self.current_run = pending[0] if pending else run
+
+        # Vollständig abgeschlossene Optimierungen brauchen keinen Checkpoint mehr
+        if checkpoint is not None and not checkpoint.pending():
+            checkpoint.remove()
+
+        # Signal mit dem (nachgeschärften) besten Ergebnis aller Läufe senden
+        self.best_overall, self.refinement_report = refine_best(self.settings, self.best_overall)
+        self.finished.emit(self.best_overall)
+
+    def report(self, gen, optimizer):
+        """Per-generation callback of SwarmOptimizer.run, emits progress and telemetry at most at TELEMETRY_RATE."""
+        self.current_progress += 1
+        snapshot = self.live_telemetry.update(self.current_run, gen + 1, optimizer.population_number,
+                                              optimizer.global_best, optimizer.global_best_fitness, optimizer.history)
+        if snapshot is not None:
+            self.progress.emit(self.current_progress)
+            self.telemetry.emit(snapshot)
+        return self.abort_flag
+
+    def finish_run(self, run, result, evaluations=0):
+        # Vorzeitig beendete Läufe zählen voll
+        self.completed_runs += 1
+        self.current_progress = self.completed_runs * self.generation_count
+        self.progress.emit(self.current_progress)
+        position, value, history, _ = result
+        self.telemetry.emit(self.live_telemetry.update(run, len(history), evaluations, position, value, history, force=True))
+        self.merge(run, result)
+
+    def merge(self, run, result):
+        """Merges the result of one run into the overall best."""
+        position, value, history, reason = result
+        self.histories.append(history)
+        self.stop_reasons.append(reason)
+
+        # Vergleiche das beste Ergebnis des Laufs mit dem besten Gesamt-Ergebnis
+        if value < self.best_fitness:
+            self.best_fitness = value
+            self.best_overall = creator.Particle(position)
+            self.best_overall.fitness.values = (value,)
+        self.run_finished.emit(run, float(self.best_fitness), f"{reason} after {len(history)} generations, fitness {value:.3g}")
+
+    def stop(self):
+        self.abort_flag = True
+
+
+class MirrorEnumerationThread(SwarmOptimizationThread):
+    """
+    Runs a continuous sub-search for every feasible mirror combination,
+    progress and run_finished are reported per combination.
+    """
+
+    def __init__(self, settings, combinations, workers=None):
+        super().__init__(settings, workers)
+        self.combinations = combinations
+        self.workers = max(1, min(len(combinations), workers or os.cpu_count() or 1))
+
+    def run(self):
+        self.current_progress = 0
+        self.best_fitness = np.inf
+        live = Telemetry(self.settings)
+        best_so_far = []  # Konvergenzkurve über die abgeschlossenen Kombinationen
+        best_position = None
+        results = iter_combinations(self.settings, self.combinations, self.workers, self.settings.seed,
+                                    should_stop=lambda: self.abort_flag)
+        for run, (mirrors, result) in enumerate(results):
+            self.current_progress += 1
+            position, value, history, _ = result
+            # NaN würde die Konvergenzkurve und den Vergleich unbrauchbar machen
+            value = value if np.isfinite(value) else np.inf
+            best_so_far.append(min(value, best_so_far[-1]) if best_so_far else value)
+            if value <= best_so_far[-1]:
+                best_position = position
+            snapshot = live.update(0, self.current_progress, len(history) * self.settings.population_number,
+                                   best_position, best_so_far[-1], best_so_far,
+                                   force=self.current_progress == len(self.combinations))
+            if snapshot is not None:
+                self.progress.emit(self.current_progress)
+                self.telemetry.emit(snapshot)
+            self.merge(run, result)
+        self.progress.emit(self.current_progress)
+
+        # Signal mit dem (nachgeschärften) besten Ergebnis aller Kombinationen senden
+        self.best_overall, self.refinement_report = refine_best(self.settings, self.best_overall)
+        self.finished.emit(self.best_overall)
+
+
+class ParetoOptimizationThread(SwarmOptimizationThread):
+    """
+    Runs NSGA-II (see pareto.NSGA2) and merges the fronts of all runs.
+    Progress, telemetry and run_finished follow the waist error of the
+    front, finished carries its design with the smallest waist error and
+    front_finished the merged front as (positions, objective values).
+    """
+    front_finished = pyqtSignal(object)
+
+    def __init__(self, settings, workers=None):
+        super().__init__(settings, workers)
+        self.front = None
+
+    def run(self):
+        self.current_progress = 0
+        self.completed_runs = 0
+        self.best_fitness = np.inf
+        self.live_telemetry = Telemetry(self.settings)
+        sequential = self.workers <= 1
+        callback = self.report if sequential else None
+        self.current_run = 0
+        fronts = []
+        seeds = self.settings.run_seeds()
+        for run, (positions, values, history, reason) in iter_fronts(
+                self.settings, seeds, self.workers, lambda: self.abort_flag, callback):
+            self.current_run = run + 1
+            if not len(values):
+                continue
+            fronts.append((positions, values))
+            best = np.argmin(values[:, 0])
+            self.finish_run(run, (positions[best], values[best, 0], history, reason),
+                            0 if sequential else len(history) * self.settings.population_number)
+
+        if fronts:
+            self.front = merge_fronts(fronts, self.settings.objective_columns())
+            self.front_finished.emit(self.front)
+
+        # Signal mit dem (nachgeschärften) Entwurf mit dem kleinsten Taillenfehler senden
+        self.best_overall, self.refinement_report = refine_best(self.settings, self.best_overall)
+        self.finished.emit(self.best_overall)
@@ -0,0 +1,296 @@
+import json
+import time
+from dataclasses import asdict, dataclass, replace
+from functools import lru_cache, partial
+from os import path
+import numpy as np
+from src_resonator.resonator_types import TOPOLOGIES
+from src_resonator.topology import compile_topology
+from src_resonator import fitness
+from src_resonator.stability import StabilityScreen
+from src_physics.value_converter import parse_quantity
+
+# Topologie-Beschreibungen nach Namen, siehe resonator_types
+RESONATOR_TYPES = TOPOLOGIES
+
+
+def load_mirror_curvatures(filepath):
+    """
+    Loads mirror data from a JSON library file.
+    For non-round mirrors (IS_ROUND = 0.0), creates an additional entry
+    with swapped sagittal and tangential curvatures.
+
+    Args:
+        filepath (str): Path to the JSON file containing mirror definitions
+
+    Returns:
+        list: (r_sag, r_tan, is_round) per mirror
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file contains no mirrors.
+    """
+    # Überprüfen, ob die Datei existiert
+    if not path.exists(filepath):
+        raise FileNotFoundError(f"Die Datei '{filepath}' wurde nicht gefunden.")
+
+    # Laden der JSON-Daten
+    with open(filepath, 'r') as file:
+        data = json.load(file)
+
+    # Extrahieren der Spiegel-Daten
+    mirror_curvatures = []
+    for component in data.get("components", []):
+        if component.get("type") == "MIRROR":
+            properties = component.get("properties", {})
+            curvature_tangential = properties.get("Radius of curvature tangential", 0.0)
+            curvature_sagittal = properties.get("Radius of curvature sagittal", 0.0)
+            is_round = properties.get("IS_ROUND", False)
+
+            # Normale Variante speichern
+            mirror_curvatures.append((curvature_sagittal, curvature_tangential, is_round))
+
+            # Für nicht-runde Spiegel zusätzlich die getauschte Variante speichern
+            if not is_round:
+                mirror_curvatures.append((curvature_tangential, curvature_sagittal, is_round))
+
+    if not mirror_curvatures:
+        raise ValueError("Die Liste 'mirror_curvatures' ist leer.")
+    return mirror_curvatures
+
+
+def _quantity(value):
+    """Number or string with unit (e.g. '10 mm') in SI base units"""
+    return float(value) if isinstance(value, (int, float)) else parse_quantity(str(value))
+
+
+@dataclass(frozen=True)
+class OptimizationSettings:
+    """
+    Immutable snapshot of everything an optimization run needs.
+
+    Captured once from the resonator window before the run starts, so the
+    optimizer never reads Qt widgets and the settings can be handed to
+    worker threads and processes (the object only holds plain values and
+    is picklable).
+
+    Attributes:
+        resonator_type (str): Key of RESONATOR_TYPES
+        bounds (tuple): (min, max) per continuous variable name, e.g. (("l1", 0.01, 0.2), ...)
+        mirror_curvatures (tuple): (r_sag, r_tan, is_round) per mirror
+        target_sag, target_tan (float): Target waists
+        nc, lc, n_prop, wavelength (float): Crystal index and length, refractive
+            index of the propagation medium and wavelength
+        num_runs, population_number, generation_number (int): PSO size
+        phi1, phi2, smin, smax, mutation_probability (float): PSO coefficients
+        engine (str): "Vectorized" (PSO), "CMA-ES", "Differential evolution"
+            (see swarm.BACKENDS), "Pareto front" (see pareto.NSGA2), "DEAP"
+            or "Mirror pairs"
+        stability_screening (bool): Sample and clamp l1 only inside the
+            analytic stability intervals (see stability.StabilityScreen)
+        plateau_generations, plateau_tolerance, diameter_tolerance,
+            target_fitness: Early stopping per run, 0 switches a criterion
+            off (see swarm.StoppingCriteria)
+        time_limit (float): Wall-clock budget of the whole optimization in
+            seconds, 0 for none
+        checkpoint_interval (int): Save the swarm state every so many
+            generations when a checkpoint is given, 0 only after every run
+        refinement (bool): Polish the best particle with the mirrors held
+            fixed (see refine.refine)
+        objectives (tuple): Names from fitness.OBJECTIVES that span the
+            Pareto front of the "Pareto front" engine
+        seed (int): Root seed of all random streams (see seed_sequence),
+            None for a new one, see with_seed
+    """
+    resonator_type: str
+    bounds: tuple
+    mirror_curvatures: tuple
+    target_sag: float
+    target_tan: float
+    nc: float
+    lc: float
+    n_prop: float
+    wavelength: float
+    num_runs: int = 10
+    population_number: int = 300
+    generation_number: int = 150
+    phi1: float = 3.0
+    phi2: float = 2.5
+    smin: float = -0.001
+    smax: float = 0.001
+    mutation_probability: float = 0.1
+    engine: str = "Vectorized"
+    stability_screening: bool = True
+    plateau_generations: int = 0
+    plateau_tolerance: float = 0.0
+    diameter_tolerance: float = 0.0
+    target_fitness: float = 0.0
+    time_limit: float = 0.0
+    checkpoint_interval: int = 0
+    refinement: bool = True
+    objectives: tuple = fitness.OBJECTIVES
+    seed: int = None
+
+    @classmethod
+    def from_job(cls, job, base_dir="."):
+        """
+        Creates settings from a job description (parsed JSON or TOML), e.g.
+
+            resonator_type = "BowTie"
+            mirrors = "Library/Mirrors.json"
+            target_sag = "21 µm"
+            target_tan = "577 µm"
+            wavelength = "514 nm"
+            crystal_length = "10 mm"
+            crystal_index = 1.675
+            [bounds]
+            l1 = ["40 mm", "100 mm"]
+            l3 = ["50 mm", "150 mm"]
+            theta = [0, 60]          # Grad, wie im Resonatorfenster (voller Winkel)
+            [optimizer]
+            num_runs = 10
+
+        Lengths may be numbers in meters or strings with units. Relative
+        mirror library paths are resolved against base_dir.
+
+        Raises:
+            KeyError: If a required entry is missing.
+            ValueError: If the resonator type or a value is invalid.
+        """
+        resonator_type = job["resonator_type"]
+        if resonator_type not in RESONATOR_TYPES:
+            raise ValueError(f"Unknown resonator type '{resonator_type}'.")
+
+        topology = RESONATOR_TYPES[resonator_type]
+        bounds = []
+        names = ("l1", "l2", "l3", "theta")
+        for name in names + tuple(name for name in topology.variables if name not in names):
+            lower, upper = job.get("bounds", {}).get(name, (0, 0))
+            if name == "theta" or name in topology.angles:
+                # Wie im Resonatorfenster: Winkel in Grad, halbiert
+                lower, upper = float(np.deg2rad(float(lower) / 2)), float(np.deg2rad(float(upper) / 2))
+            else:
+                lower, upper = _quantity(lower), _quantity(upper)
+            bounds.append((name, lower, upper))
+        missing = [name for name in topology.variables if name not in job.get("bounds", {})]
+        if missing:
+            raise KeyError(f"Missing bounds for {', '.join(missing)}.")
+
+        optimizer = {key: value for key, value in job.get("optimizer", {}).items() if key in cls.__dataclass_fields__}
+        if "objectives" in optimizer:
+            optimizer["objectives"] = tuple(optimizer["objectives"])
+            unknown = [name for name in optimizer["objectives"] if name not in fitness.OBJECTIVES]
+            if unknown or len(optimizer["objectives"]) < 2:
+                raise ValueError(f"Objectives must be at least two of {', '.join(fitness.OBJECTIVES)}.")
+        if optimizer.get("seed") is not None and (not isinstance(optimizer["seed"], int) or optimizer["seed"] < 0):
+            raise ValueError("The seed must be a non-negative integer.")
+        return cls(
+            resonator_type=resonator_type,
+            bounds=tuple(bounds),
+            mirror_curvatures=tuple(load_mirror_curvatures(path.join(base_dir, job["mirrors"]))),
+            target_sag=_quantity(job["target_sag"]),
+            target_tan=_quantity(job["target_tan"]),
+            nc=float(job.get("crystal_index", 1.0)),
+            lc=_quantity(job.get("crystal_length", 0.0)),
+            n_prop=float(job.get("n_prop", 1.0)),
+            wavelength=_quantity(job["wavelength"]),
+            **optimizer,
+        )
+
+    def to_json(self):
+        """JSON text of all fields, see from_json"""
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, text):
+        """Settings from to_json, lists are turned back into tuples"""
+        data = json.loads(text)
+        data["bounds"] = tuple(tuple(bound) for bound in data["bounds"])
+        data["mirror_curvatures"] = tuple(tuple(curvature) for curvature in data["mirror_curvatures"])
+        if "objectives" in data:
+            data["objectives"] = tuple(data["objectives"])
+        return cls(**{key: value for key, value in data.items() if key in cls.__dataclass_fields__})
+
+    def resonator(self):
+        """Compiled roundtrip kernel and variable layout of the resonator type, see topology.CompiledTopology"""
+        return compile_topology(RESONATOR_TYPES[self.resonator_type])
+
+    def bound(self, name):
+        """(min, max) of a continuous variable"""
+        for variable, lower, upper in self.bounds:
+            if variable == name:
+                return lower, upper
+        raise KeyError(f"No bounds for '{name}'.")
+
+    def swarm_bounds(self):
+        """
+        Bounds of the particle coordinates.
+
+        Returns:
+            tuple: (lower, upper, discrete), the mirror indices are the discrete coordinates
+        """
+        resonator = RESONATOR_TYPES[self.resonator_type]
+        continuous = [self.bound(name) for name in resonator.variables]
+        mirrors = [(0, len(self.mirror_curvatures) - 1)] * resonator.mirror_count
+        lower, upper = np.array(continuous + mirrors, dtype=np.float64).T
+        discrete = np.arange(len(lower)) >= len(continuous)
+        return lower, upper, discrete
+
+    def objective(self, particle):
+        """Fitness of a single particle, see fitness.objective"""
+        return fitness.objective(
+            self.resonator(), particle, self.mirror_curvatures, self.nc, self.lc,
+            self.n_prop, self.wavelength, self.target_sag, self.target_tan)
+
+    def objective_batch(self):
+        """Function mapping an (N, dimension) array to (N,) fitness values"""
+        return partial(
+            fitness.objective_batch, self.resonator(),
+            table=fitness.mirror_table(self.mirror_curvatures), nc=self.nc, lc=self.lc,
+            n_prop=self.n_prop, wavelength=self.wavelength,
+            target_sag=self.target_sag, target_tan=self.target_tan)
+
+    def objectives_batch(self):
+        """Function mapping an (N, dimension) array to (N, len(fitness.OBJECTIVES)) objective values"""
+        return partial(
+            fitness.objectives_batch, self.resonator(),
+            table=fitness.mirror_table(self.mirror_curvatures), nc=self.nc, lc=self.lc,
+            n_prop=self.n_prop, wavelength=self.wavelength,
+            target_sag=self.target_sag, target_tan=self.target_tan)
+
+    def objective_columns(self):
+        """Columns of objectives_batch selected by objectives"""
+        return tuple(fitness.OBJECTIVES.index(name) for name in self.objectives)
+
+    def with_seed(self):
+        """Copy with a fixed root seed (a new random one if seed is None), so the run can be repeated"""
+        return self if self.seed is not None else replace(self, seed=np.random.SeedSequence().entropy)
+
+    def seed_sequence(self):
+        """Root numpy.random.SeedSequence, all random streams of the optimization are spawned from it"""
+        return np.random.SeedSequence(self.seed)
+
+    def run_seeds(self):
+        """Independent SeedSequence per run, the same for any number of worker processes"""
+        return self.seed_sequence().spawn(self.num_runs)
+
+    def deadline(self):
+        """time.time() value at which the time limit ends if started now, None without limit"""
+        return time.time() + self.time_limit if self.time_limit > 0 else None
+
+    @lru_cache(maxsize=1)
+    def stability_screen(self):
+        """
+        Analytic stability intervals of l1 within its bounds, see
+        stability.StabilityScreen, None if the topology does not allow it
+        (see CompiledTopology.screen_variable). Equal settings get the same
+        screen, so the runs of a job in one process share its cell cache.
+        """
+        resonator = self.resonator()
+        if resonator.screen_variable is None:
+            return None
+        lower, upper, discrete = self.swarm_bounds()
+        return StabilityScreen(
+            resonator, fitness.mirror_table(self.mirror_curvatures), self.nc, self.lc,
+            self.n_prop, *self.bound(resonator.screen_variable), variable=resonator.screen_variable,
+            bounds=(lower[~discrete], upper[~discrete]))
@@ -0,0 +1,423 @@
+import numpy as np
+from numba import njit
+from src_resonator import fitness
+
+# A + D eines Umlaufs ist ein Polynom in l1 vom Grad <= 4: l1 steckt direkt oder über
+# die abgeleiteten Längen (l2 bzw. l3) linear in höchstens vier Freiraumstrecken
+# (von CompiledTopology.screen_variable geprüft)
+DEGREE = 4
+# Chebyshev-Stützstellen auf [0, 1], gut konditioniert für die Interpolation
+NODES = (1 - np.cos((2 * np.arange(DEGREE + 1) + 1) * np.pi / (2 * (DEGREE + 1)))) / 2
+_INVERSE_VANDERMONDE = np.linalg.inv(np.vander(NODES, DEGREE + 1, increasing=True))
+# Abstand zu einer Intervallgrenze beim Hineinschieben, relativ zur Intervalllänge
+_INSET = 1e-3
+# Segmente zwischen 0, 1 und den höchstens 4 * DEGREE Stabilitätsgrenzen beider Ebenen
+SEGMENTS = 4 * DEGREE + 1
+# Zellen je weiterer kontinuierlicher Koordinate: confine berechnet die Intervalle einmal pro
+# Spiegelkombination und Zelle (in der Zellmitte) und verwendet sie für alle Partikel darin
+CELLS = 16
+# Höchstzahl gespeicherter Zellen (je ca. 300 Byte), danach wird der Speicher geleert
+CACHE_LIMIT = 65536
+# Multiplikator des Fibonacci-Hashings der Zellschlüssel (2^64 / goldener Schnitt)
+_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+
+@njit(cache=True)
+def _horner(c, row, degree, t):
+    """Value of the polynomial with increasing coefficients c[row, :degree + 1] at t"""
+    value = 0.0
+    for j in range(degree, -1, -1):
+        value = value * t + c[row, j]
+    return value
+
+
+@njit(cache=True)
+def _unit_roots(derivatives, roots, breaks):
+    """
+    Roots in [0, 1] of the polynomial with increasing coefficients
+    derivatives[0], written to roots (the other rows of derivatives and
+    breaks are work space). The roots of every derivative split [0, 1]
+    into monotone pieces, from the highest derivative down, and each sign
+    change is refined with the Illinois variant of regula falsi.
+
+    Returns:
+        int: Number of roots
+    """
+    degree = derivatives.shape[1] - 1
+    # Keine Nullstelle möglich, wenn |c0| größer ist als die Summe der übrigen Beträge
+    bound = 0.0
+    for j in range(1, degree + 1):
+        bound += abs(derivatives[0, j])
+    if abs(derivatives[0, 0]) > bound:
+        return 0
+    for k in range(1, degree + 1):
+        for j in range(degree + 1 - k):
+            derivatives[k, j] = derivatives[k - 1, j + 1] * (j + 1)
+
+    count = 0
+    for k in range(degree - 1, -1, -1):
+        # Nullstellen der (k+1)-ten Ableitung begrenzen die monotonen Stücke der k-ten
+        breaks[0] = 0.0
+        for j in range(count):
+            breaks[j + 1] = roots[j]
+        breaks[count + 1] = 1.0
+        pieces = count + 1
+        d = degree - k
+        count = 0
+        if _horner(derivatives, k, d, 0.0) == 0.0:
+            roots[count] = 0.0
+            count += 1
+        for i in range(pieces):
+            a, b = breaks[i], breaks[i + 1]
+            fa, fb = _horner(derivatives, k, d, a), _horner(derivatives, k, d, b)
+            if fb == 0.0:
+                if b > a or count == 0:
+                    roots[count] = b
+                    count += 1
+                continue
+            if fa * fb >= 0.0:
+                continue
+            side = 0
+            x = a
+            for _ in range(100):
+                x = (a * fb - b * fa) / (fb - fa)
+                fx = _horner(derivatives, k, d, x)
+                if fx * fb > 0.0:
+                    b, fb = x, fx
+                    if side == -1:
+                        fa /= 2
+                    side = -1
+                else:
+                    a, fa = x, fx
+                    if side == 1:
+                        fb /= 2
+                    side = 1
+                if b - a < 1e-10 or fx == 0.0:
+                    break
+            roots[count] = x
+            count += 1
+    return count
+
+
+@njit(cache=True)
+def _stable_segments(coefficients, start, end, stable):
+    """Fills the segments between the stability boundaries, see StabilityScreen.intervals"""
+    size = coefficients.shape[2]
+    derivatives = np.zeros((size, size))
+    roots = np.empty(size)
+    pieces = np.empty(size + 1)
+    breaks = np.empty(SEGMENTS + 1)
+    for i in range(coefficients.shape[0]):
+        breaks[0] = 0.0
+        count = 1
+        # |A + D| = 2 in beiden Ebenen: Nullstellen von A + D - 2 und A + D + 2
+        for plane in range(2):
+            for limit in (-2.0, 2.0):
+                for j in range(size):
+                    derivatives[0, j] = coefficients[i, plane, j]
+                derivatives[0, 0] += limit
+                found = _unit_roots(derivatives, roots, pieces)
+                for j in range(found):
+                    breaks[count + j] = roots[j]
+                count += found
+        for j in range(count, SEGMENTS + 1):
+            breaks[j] = 1.0
+        breaks.sort()
+        for j in range(SEGMENTS):
+            start[i, j] = breaks[j]
+            end[i, j] = breaks[j + 1]
+            middle = (breaks[j] + breaks[j + 1]) / 2
+            stable[i, j] = breaks[j + 1] > breaks[j] \
+                and abs(_horner(coefficients[i], 0, size - 1, middle)) < 2 \
+                and abs(_horner(coefficients[i], 1, size - 1, middle)) < 2
+    return stable
+
+
+@njit(cache=True)
+def _cell_keys(positions, others, lower, width, first_mirror, mirror_count, catalog, keys):
+    """
+    Key of the cell of every particle: index of the cell of each other
+    continuous coordinate (CELLS per coordinate, zero for a zero width),
+    followed by the mirror indices, as one mixed radix integer
+    """
+    for i in range(len(positions)):
+        key = 0
+        for j in range(len(others)):
+            cell = 0
+            if width[j] > 0:
+                cell = int(min(max(np.floor((positions[i, others[j]] - lower[j]) / width[j]), 0.0), CELLS - 1.0))
+            key = key * CELLS + cell
+        for j in range(mirror_count):
+            key = key * catalog + int(np.rint(positions[i, first_mirror + j]))
+        keys[i] = key
+
+
+@njit(cache=True)
+def _cell_rows(table, values, shift, keys, rows):
+    """
+    Looks up keys in the open addressing hash table of the cell cache:
+    table holds the keys (-1 in free slots), values their rows. Writes the
+    rows of the keys to rows, -1 for missing keys.
+    """
+    mask = len(table) - 1
+    for i in range(len(keys)):
+        slot = np.int64((np.uint64(keys[i]) * _HASH) >> np.uint64(shift))
+        while table[slot] != keys[i] and table[slot] != -1:
+            slot = (slot + 1) & mask
+        rows[i] = values[slot] if table[slot] == keys[i] else -1
+
+
+@njit(cache=True)
+def _add_cells(table, values, shift, keys, rows):
+    """Inserts keys that are not yet in the hash table with their rows, see _cell_rows"""
+    mask = len(table) - 1
+    for i in range(len(keys)):
+        slot = np.int64((np.uint64(keys[i]) * _HASH) >> np.uint64(shift))
+        while table[slot] != -1:
+            slot = (slot + 1) & mask
+        table[slot] = keys[i]
+        values[slot] = rows[i]
+
+
+@njit(cache=True)
+def _outside(start, end, stable, rows, t, outside):
+    """Marks the particles whose t lies outside the stable segments of their row, if it has any"""
+    for i in range(len(t)):
+        row = rows[i]
+        found = False
+        inside = False
+        for j in range(SEGMENTS):
+            if stable[row, j]:
+                found = True
+                inside = inside or start[row, j] <= t[i] <= end[row, j]
+        outside[i] = found and not inside
+
+
+@njit(cache=True)
+def _confine(start, end, stable, rows, t, redraw, clamp, r):
+    """
+    Moves the normalized variable t into the stable segments of the row of
+    every particle, see StabilityScreen.confine: redraw particles get a
+    uniform draw (one value of r each), clamp particles the nearest point
+    of a stable segment. Rows without a stable segment must not be given.
+    """
+    drawn = 0
+    for i in range(len(t)):
+        row = rows[i]
+        if redraw[i]:
+            # Gleichverteilt über die Vereinigung der stabilen Intervalle
+            total = 0.0
+            for j in range(SEGMENTS):
+                if stable[row, j]:
+                    total += end[row, j] - start[row, j]
+            u = r[drawn] * total
+            drawn += 1
+            cumulative = 0.0
+            for j in range(SEGMENTS):
+                if stable[row, j]:
+                    cumulative += end[row, j] - start[row, j]
+                    t[i] = end[row, j] - (cumulative - u)
+                    if cumulative >= u:
+                        break
+        elif clamp[i]:
+            # Klemmen: nächster Punkt im Inneren eines stabilen Intervalls
+            distance = np.inf
+            nearest = t[i]
+            for j in range(SEGMENTS):
+                if stable[row, j]:
+                    inset = _INSET * (end[row, j] - start[row, j])
+                    clamped = min(max(t[i], start[row, j] + inset), end[row, j] - inset)
+                    if abs(clamped - t[i]) < distance:
+                        distance = abs(clamped - t[i])
+                        nearest = clamped
+            t[i] = nearest
+
+
+class StabilityScreen:
+    """
+    Analytic stability intervals of l1 for fixed mirrors and fixed other
+    continuous coordinates.
+
+    The trace A + D of both roundtrip matrices is a polynomial of degree
+    <= 4 in l1 for every resonator type. It is interpolated exactly from
+    five batched roundtrips per particle, the boundaries |A + D| = 2 are
+    its real roots in the bounds, found by a compiled kernel. Between
+    consecutive roots the stability does not change, so one evaluation
+    per segment gives the stable intervals.
+
+    confine uses the intervals at the center of a cell of the other
+    continuous coordinates instead of the exact ones, computed once per
+    cell. They are approximate: a confined particle can still be
+    unstable, the objective penalizes it as without the screen.
+    """
+
+    def __init__(self, resonator, table, nc, lc, n_prop, lower, upper, variable="l1", bounds=None):
+        """
+        Args:
+            resonator: CompiledTopology of the resonator type
+            table: (M, 2) array from fitness.mirror_table
+            nc, lc, n_prop (float): Crystal index and length, refractive
+                index of the propagation medium
+            lower, upper (float): Bounds of the screened variable
+            variable (str): Screened coordinate, one of resonator.variables
+            bounds: Optional (lower, upper) arrays of all continuous
+                coordinates, spans the cells of confine. Without bounds
+                confine uses the exact intervals of every particle.
+        """
+        self.resonator = resonator
+        self.table = table
+        self.nc = nc
+        self.lc = lc
+        self.n_prop = n_prop
+        self.lower = float(lower)
+        self.upper = float(upper)
+        self.index = resonator.variables.index(variable)
+        self.others = np.array([i for i in range(len(resonator.variables)) if i != self.index], dtype=np.intp)
+        # Ohne Grenzen oder wenn die Zellschlüssel nicht in int64 passen: exakte Intervalle pro Partikel
+        if bounds is None or CELLS ** len(self.others) * len(table) ** resonator.mirror_count >= 2 ** 63:
+            self.cell_lower = self.cell_width = None
+        else:
+            cell_lower, cell_upper = (np.asarray(bound, dtype=np.float64)[self.others] for bound in bounds)
+            self.cell_lower = cell_lower
+            self.cell_width = (cell_upper - cell_lower) / CELLS
+        self._start = np.empty((0, SEGMENTS))
+        self._end = np.empty((0, SEGMENTS))
+        self._stable = np.empty((0, SEGMENTS), dtype=np.bool_)
+        self._clear_cells(0)
+
+    def roundtrips(self, positions, x):
+        """Batched roundtrips for the continuous coordinates x and the mirrors of positions, repeated to len(x)"""
+        k = len(self.resonator.variables)
+        radii = fitness.mirror_radii_batch(positions[:, k:k + self.resonator.mirror_count], self.table)
+        radii = np.repeat(radii, len(x) // len(positions), axis=0)
+        return self.resonator.roundtrip_batch(self.nc, self.lc, self.n_prop, x, radii)
+
+    def is_stable(self, positions):
+        """(N,) boolean mask of the particles that are stable in both planes"""
+        positions = np.asarray(positions, dtype=np.float64)
+        roundtrip = self.roundtrips(positions, positions[:, :len(self.resonator.variables)])
+        return (np.abs(roundtrip[:, 0] + roundtrip[:, 3]) < 2) & (np.abs(roundtrip[:, 4] + roundtrip[:, 7]) < 2)
+
+    def traces(self, positions):
+        """
+        A + D sagittal and tangential as polynomials of the normalized
+        variable t = (l1 - lower) / (upper - lower).
+
+        Returns:
+            numpy.ndarray: (N, 2, DEGREE + 1) coefficients, increasing powers
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        k = len(self.resonator.variables)
+        x = np.repeat(positions[:, np.newaxis, :k], len(NODES), axis=1)
+        x[:, :, self.index] = self.lower + NODES * (self.upper - self.lower)
+        roundtrip = self.roundtrips(positions, x.reshape(-1, k)).reshape(len(positions), len(NODES), 8)
+        trace = np.stack((roundtrip[..., 0] + roundtrip[..., 3], roundtrip[..., 4] + roundtrip[..., 7]), axis=1)
+        # Zeilenweise in fester Reihenfolge statt BLAS: das Ergebnis einer Zeile hängt nicht von N ab
+        return sum(trace[..., j, np.newaxis] * _INVERSE_VANDERMONDE[:, j] for j in range(len(NODES)))
+
+    def intervals(self, positions):
+        """
+        Segments of the normalized variable between the stability boundaries.
+
+        Returns:
+            tuple: (start, end, stable), (N, S) arrays in the normalized
+            variable, stable marks the segments where both planes are stable
+        """
+        coefficients = np.ascontiguousarray(self.traces(positions))
+        start = np.empty((len(coefficients), SEGMENTS))
+        end = np.empty((len(coefficients), SEGMENTS))
+        stable = np.empty((len(coefficients), SEGMENTS), dtype=np.bool_)
+        _stable_segments(coefficients, start, end, stable)
+        return start, end, stable
+
+    def _cell_rows(self, positions):
+        """
+        Rows of the intervals of every particle in the cell cache. The
+        intervals are computed at the center of the particle's cell (CELLS
+        per other continuous coordinate) once per mirror combination and
+        cell, only the cells not yet in the cache are computed.
+
+        Returns:
+            numpy.ndarray: (N,) rows of self._start, self._end, self._stable
+        """
+        k = len(self.resonator.variables)
+        keys = np.empty(len(positions), dtype=np.int64)
+        _cell_keys(positions, self.others, self.cell_lower, self.cell_width,
+                   k, self.resonator.mirror_count, len(self.table), keys)
+        rows = np.empty(len(keys), dtype=np.int64)
+        _cell_rows(self._table, self._values, self._shift, keys, rows)
+        missing = rows < 0
+        if np.any(missing):
+            new, first, inverse = np.unique(keys[missing], return_index=True, return_inverse=True)
+            if self._count + len(new) > len(self._table) // 2:
+                self._clear_cells(len(new))
+            cells = positions[np.flatnonzero(missing)[first]]
+            cell = (cells[:, self.others] - self.cell_lower) / np.where(self.cell_width > 0, self.cell_width, 1)
+            cells[:, self.others] = self.cell_lower + (np.clip(np.floor(cell), 0, CELLS - 1) + 0.5) * self.cell_width
+            cells[:, self.index] = self.lower
+            added = self._store(*self.intervals(cells))
+            _add_cells(self._table, self._values, self._shift, new, added)
+            rows[missing] = added[inverse.reshape(-1)]
+        return rows
+
+    def _clear_cells(self, cells):
+        """Empties the cell cache, with room for max(CACHE_LIMIT, cells) cells"""
+        bits = int(np.ceil(np.log2(2 * max(cells, CACHE_LIMIT))))
+        self._table = np.full(2 ** bits, -1, dtype=np.int64)
+        self._values = np.empty(2 ** bits, dtype=np.int64)
+        self._shift = 64 - bits
+        self._count = 0
+
+    def _store(self, start, end, stable):
+        """Appends intervals after the cached rows, growing the arrays geometrically, returns their rows"""
+        used = self._count
+        if used + len(start) > len(self._start):
+            size = max(min(2 * len(self._start), len(self._table) // 2), used + len(start))
+            self._start, self._end, self._stable = (
+                np.concatenate((array[:used], np.empty((size - used, SEGMENTS), dtype=array.dtype)))
+                for array in (self._start, self._end, self._stable))
+        rows = np.arange(used, used + len(start))
+        self._start[rows], self._end[rows], self._stable[rows] = start, end, stable
+        self._count += len(start)
+        return rows
+
+    def confine(self, positions, rng, redraw=None):
+        """
+        Moves the screened variable of every particle into its stable set:
+        rows in redraw get a uniform draw from the stable intervals, all
+        other unstable rows are clamped into the nearest stable interval.
+        Stable rows and particles without any stable interval are left
+        unchanged. With bounds the intervals are those of the particle's
+        cell (see _cell_rows), and only the particles outside them are
+        checked for stability.
+
+        Args:
+            positions: (N, dimension) array, not modified
+            rng (numpy.random.Generator): Random number generator
+            redraw: Optional (N,) boolean mask
+
+        Returns:
+            numpy.ndarray: Confined copy of positions
+        """
+        positions = np.array(positions, dtype=np.float64)
+        redraw = np.zeros(len(positions), dtype=bool) if redraw is None else np.asarray(redraw, dtype=bool)
+        if self.cell_width is None:
+            start, end, stable = self.intervals(positions)
+            rows = np.arange(len(positions))
+        else:
+            rows = self._cell_rows(positions)
+            start, end, stable = self._start, self._end, self._stable
+        width = self.upper - self.lower
+        t = (positions[:, self.index] - self.lower) / width if width > 0 else np.zeros(len(positions))
+        clamp = np.zeros(len(positions), dtype=bool)
+        _outside(start, end, stable, rows, t, clamp)
+        redraw = redraw & np.any(stable[rows], axis=1)
+        clamp &= ~redraw
+        # Außerhalb der Zellintervalle kann ein Partikel trotzdem stabil sein, nur instabile klemmen
+        check = np.flatnonzero(clamp)
+        if len(check):
+            clamp[check] = ~self.is_stable(positions[check])
+        _confine(start, end, stable, rows, t, redraw, clamp, rng.random(np.count_nonzero(redraw)))
+        moved = redraw | clamp
+        positions[moved, self.index] = self.lower + t[moved] * width
+        return positions
@@ -0,0 +1,311 @@
+import multiprocessing
+import time
+from functools import partial
+from os import path
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from src_resonator.checkpoint import save_arrays, load_arrays
+from src_resonator.population import (
+    PopulationOptimizer, swarm_diameter, STOP_GENERATIONS, STOP_TARGET, STOP_PLATEAU, STOP_DIAMETER, STOP_TIME,
+    STOP_ABORTED)
+from src_resonator.backends import CMAES, DifferentialEvolution
+
+# Abbruchsignal in den Worker-Prozessen, von iter_tasks über den Initializer des Pools gesetzt
+_stop_event = None
+
+
+class StoppingCriteria:
+    """
+    Convergence and budget checks after every generation. A criterion set
+    to 0 (or a deadline of None) is switched off.
+    """
+
+    def __init__(self, plateau_generations=0, plateau_tolerance=0.0, diameter_tolerance=0.0,
+                 target_fitness=0.0, deadline=None):
+        """
+        Args:
+            plateau_generations (int): Stop when the best fitness improved by no more
+                than plateau_tolerance (relative) over this many generations
+            plateau_tolerance (float): Relative improvement counted as plateau
+            diameter_tolerance (float): Stop when swarm_diameter drops below this value
+            target_fitness (float): Stop when the best fitness reaches this value
+            deadline (float): Stop after this time.time() value, shared by all runs
+                of an optimization (also across worker processes)
+        """
+        self.plateau_generations = int(plateau_generations)
+        self.plateau_tolerance = plateau_tolerance
+        self.diameter_tolerance = diameter_tolerance
+        self.target_fitness = target_fitness
+        self.deadline = deadline
+
+    @classmethod
+    def from_settings(cls, settings, deadline=None):
+        """Criteria of an OptimizationSettings snapshot"""
+        return cls(settings.plateau_generations, settings.plateau_tolerance, settings.diameter_tolerance,
+                   settings.target_fitness, deadline)
+
+    def reason(self, history, diameter=None):
+        """
+        Checks the criteria.
+
+        Args:
+            history: Best fitness per generation so far
+            diameter: Current swarm_diameter, only needed for the diameter criterion
+
+        Returns:
+            str: STOP_* constant of the first criterion met, None to continue
+        """
+        best = history[-1]
+        if self.target_fitness > 0 and best <= self.target_fitness:
+            return STOP_TARGET
+        k = self.plateau_generations
+        if k > 0 and len(history) > k and history[-k - 1] - best <= self.plateau_tolerance * abs(history[-k - 1]):
+            return STOP_PLATEAU
+        if self.diameter_tolerance > 0 and diameter is not None and diameter < self.diameter_tolerance:
+            return STOP_DIAMETER
+        if self.deadline is not None and time.time() >= self.deadline:
+            return STOP_TIME
+        return None
+
+
+class SwarmOptimizer(PopulationOptimizer):
+    """
+    Particle swarm optimizer working on the whole swarm at once.
+
+    Positions, velocities, personal bests and fitness values are stored as
+    (population, dimension) arrays, so every generation is one batched
+    objective call plus a few array operations. The update rule is the same
+    as in Resonator.update_particle: the velocity is pulled towards the
+    personal and the global best, clipped to [smin, smax], discrete
+    coordinates (mirror indices) are rounded and every coordinate is
+    re-drawn with the mutation probability.
+    """
+
+    state_arrays = ("positions", "velocities", "fitness", "best_positions", "best_fitness", "global_best")
+
+    def __init__(self, objective, lower, upper, discrete, population_number,
+                 phi1, phi2, smin, smax, mutation_probability, rng=None, screen=None):
+        """
+        Args:
+            objective, lower, upper, discrete, population_number, rng, screen:
+                See PopulationOptimizer
+            phi1, phi2 (float): Personal and global best weight
+            smin, smax (float): Velocity limits
+            mutation_probability (float): Probability to re-draw a coordinate
+        """
+        super().__init__(objective, lower, upper, discrete, population_number, rng, screen)
+        self.phi1 = phi1
+        self.phi2 = phi2
+        self.smin = smin
+        self.smax = smax
+        self.mutation_probability = mutation_probability
+        self.initialize()
+
+    @classmethod
+    def from_settings(cls, settings, lower, upper, discrete, rng=None, screen=None):
+        """Swarm with the PSO coefficients of an OptimizationSettings snapshot"""
+        return cls(settings.objective_batch(), lower, upper, discrete, settings.population_number,
+                   settings.phi1, settings.phi2, settings.smin, settings.smax, settings.mutation_probability,
+                   rng=rng, screen=screen)
+
+    def initialize(self):
+        """Creates a new swarm, personal bests are set by the first evaluation."""
+        shape = (self.population_number, self.dimension)
+        self.positions = self.sample(shape)
+        if self.screen is not None:
+            self.positions = self.screen.confine(self.positions, self.rng, redraw=np.ones(self.population_number, dtype=bool))
+        self.velocities = self.rng.uniform(self.smin, self.smax, size=shape)
+        self.fitness = np.full(self.population_number, np.inf)
+        self.best_positions = self.positions.copy()
+        self.best_fitness = np.full(self.population_number, np.inf)
+        self.global_best = self.positions[0].copy()
+        self.global_best_fitness = np.inf
+        self.history = []
+
+    def evaluate(self):
+        """Evaluates the swarm and updates the personal and global bests."""
+        self.fitness = self.objective(self.positions)
+        improved = self.fitness < self.best_fitness
+        self.best_positions[improved] = self.positions[improved]
+        self.best_fitness[improved] = self.fitness[improved]
+        self.update_best(self.best_positions, self.best_fitness)
+
+    def move(self):
+        """Velocity and position update of all particles."""
+        shape = self.positions.shape
+        u1 = self.rng.uniform(0, self.phi1, size=shape)
+        u2 = self.rng.uniform(0, self.phi2, size=shape)
+        self.velocities += u1 * (self.best_positions - self.positions) + u2 * (self.global_best - self.positions)
+        np.clip(self.velocities, self.smin, self.smax, out=self.velocities)
+
+        positions = self.repair(self.positions + self.velocities)
+
+        # Mutation: Zufällige Änderung mit einer kleinen Wahrscheinlichkeit
+        mutate = self.rng.random(shape) < self.mutation_probability
+        if np.any(mutate):
+            positions[mutate] = self.sample(shape)[mutate]
+        if self.screen is not None:
+            # Mutiertes l1 im stabilen Bereich neu ziehen, alle anderen Partikel hineinschieben
+            positions = self.screen.confine(positions, self.rng, redraw=mutate[:, self.screen.index])
+        self.positions = positions
+
+
+# Auswählbare Backends der vektorisierten Optimierung (OptimizationSettings.engine)
+BACKENDS = {
+    "Vectorized": SwarmOptimizer,
+    "CMA-ES": CMAES,
+    "Differential evolution": DifferentialEvolution,
+}
+
+
+def build_optimizer(settings, rng=None, mirrors=None):
+    """
+    Backend of settings.engine (SwarmOptimizer for engines without an own
+    backend, e.g. the mirror enumeration), with the stability screen if enabled.
+
+    Args:
+        settings (OptimizationSettings): Problem description
+        rng (numpy.random.Generator): Random number generator
+        mirrors: Optional mirror indices, fixes the discrete coordinates
+    """
+    lower, upper, discrete = settings.swarm_bounds()
+    if mirrors is not None:
+        lower[discrete] = mirrors
+        upper[discrete] = mirrors
+    backend = BACKENDS.get(settings.engine, SwarmOptimizer)
+    return backend.from_settings(settings, lower, upper, discrete, rng,
+                                 settings.stability_screen() if settings.stability_screening else None)
+
+
+def optimize_run(settings, seed=None, deadline=None, checkpoint=None, callback=None):
+    """
+    One independent optimizer run, used as process pool worker.
+
+    Args:
+        settings (OptimizationSettings): Picklable problem description
+        seed: Seed or numpy.random.SeedSequence of the run
+        deadline (float): time.time() value of the wall-clock budget, see StoppingCriteria
+        checkpoint (str): Optional swarm state file, the run continues from it
+            if it exists and saves to it every settings.checkpoint_interval
+            generations and when aborted
+        callback: Optional per-generation callback, see SwarmOptimizer.run
+
+    Returns:
+        tuple: (best position, its fitness, best fitness per generation, stop reason)
+    """
+    optimizer = build_optimizer(settings, np.random.default_rng(seed))
+    save = None
+    if checkpoint is not None:
+        if path.exists(checkpoint):
+            optimizer.set_state(load_arrays(checkpoint))
+        interval = settings.checkpoint_interval
+
+        def save(optimizer):
+            if interval > 0 and len(optimizer.history) % interval == 0:
+                save_arrays(checkpoint, optimizer.get_state())
+
+    result = optimizer.run(settings.generation_number, abortable(callback),
+                           StoppingCriteria.from_settings(settings, deadline), save)
+    if checkpoint is not None and optimizer.stop_reason == STOP_ABORTED:
+        save_arrays(checkpoint, optimizer.get_state())
+    return result
+
+
+def run_task(settings, deadline, task):
+    """optimize_run for a (seed, swarm state file) task, used as process pool worker"""
+    seed, checkpoint = task
+    return optimize_run(settings, seed, deadline, checkpoint)
+
+
+def iter_runs(settings, seeds, workers=1, should_stop=None, checkpoint=None, callback=None):
+    """
+    Runs one optimize_run per seed and yields (run index, result) as soon
+    as a run is done, see iter_tasks. The time limit of the settings is
+    shared by all runs.
+
+    Args:
+        checkpoint (Checkpoint): Optional, only the pending runs of the
+            checkpoint are started (with its seeds instead of seeds) and
+            every finished run is added to it
+        callback: Per-generation callback of the runs, only with a single worker
+    """
+    if checkpoint is not None:
+        seeds = checkpoint.seeds()
+        runs = checkpoint.pending()
+        tasks = [(seeds[run], checkpoint.run_path(run)) for run in runs]
+    else:
+        runs = list(range(len(seeds)))
+        tasks = [(seed, None) for seed in seeds]
+
+    deadline = settings.deadline()
+    if workers <= 1 and callback is not None:
+        function = lambda task: optimize_run(settings, task[0], deadline, task[1], callback)
+    else:
+        function = partial(run_task, settings, deadline)
+
+    for index, result in iter_tasks(function, tasks, workers, should_stop):
+        # Abgebrochene Läufe bleiben offen und werden beim Fortsetzen weitergeführt
+        if checkpoint is not None and result[3] != STOP_ABORTED:
+            checkpoint.add(runs[index], result)
+        yield runs[index], result
+
+
+def _set_stop_event(event):
+    """Initializer of the worker processes, see worker_aborted"""
+    global _stop_event
+    _stop_event = event
+
+
+def worker_aborted(*args):
+    """True once iter_tasks has signalled an abort to this worker process, usable as run callback"""
+    return _stop_event is not None and _stop_event.is_set()
+
+
+def abortable(callback=None):
+    """
+    Run callback (see PopulationOptimizer.run) that also aborts on the
+    worker stop signal, after the move so an aborted state can be resumed.
+    """
+    if callback is None:
+        return worker_aborted
+    return lambda gen, optimizer: callback(gen, optimizer) or worker_aborted()
+
+
+def iter_tasks(function, arguments, workers=1, should_stop=None):
+    """
+    Calls function once per argument and yields (index, result) as soon as
+    a call is done. With more than one worker the calls are distributed
+    over a process pool, function and arguments must then be picklable.
+
+    Args:
+        function: Top-level function (or partial of one)
+        arguments: One argument per call, e.g. the seeds of independent runs
+        workers (int): Number of worker processes
+        should_stop: Optional function, returning True cancels the pending
+            calls and aborts the running ones after their current generation
+            (see abortable), the worker processes have exited when the
+            generator returns
+    """
+    should_stop = should_stop or (lambda: False)
+    if workers <= 1:
+        for index, argument in enumerate(arguments):
+            if should_stop():
+                return
+            yield index, function(argument)
+        return
+
+    # "spawn" statt fork, damit keine Threads des Elternprozesses (z. B. Qt) geerbt werden
+    context = multiprocessing.get_context("spawn")
+    stop_event = context.Event()
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                   initializer=_set_stop_event, initargs=(stop_event,))
+    try:
+        pending = {executor.submit(function, argument): index for index, argument in enumerate(arguments)}
+        while pending and not should_stop():
+            done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+    finally:
+        # Laufende Aufrufe enden nach ihrer aktuellen Generation, danach die Prozesse
+        stop_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
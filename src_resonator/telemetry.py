@@ -0,0 +1,93 @@
+import time
+import numpy as np
+from src_resonator import fitness
+
+# Höchstzahl an Live-Updates pro Sekunde, unabhängig von der Generationsrate
+TELEMETRY_RATE = 10.0
+
+
+class Throttle:
+    """Lets at most rate events per second pass, the others are dropped."""
+
+    def __init__(self, rate=TELEMETRY_RATE, clock=time.perf_counter):
+        """
+        Args:
+            rate (float): Events per second, 0 lets every event pass
+            clock: Monotonic time function in seconds
+        """
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.clock = clock
+        self.last = -np.inf
+
+    def ready(self, force=False):
+        """True if the event may pass (always with force), starts a new interval then."""
+        now = self.clock()
+        if not force and now - self.last < self.interval:
+            return False
+        self.last = now
+        return True
+
+
+class Telemetry:
+    """
+    Rate-limited live snapshots of a running optimization.
+
+    update is cheap to call after every generation: it only counts the
+    evaluations and returns None until the throttle lets the next snapshot
+    pass. Only then the best particle is evaluated once more for its
+    waists and stability values.
+    """
+
+    def __init__(self, settings, rate=TELEMETRY_RATE, clock=time.perf_counter):
+        """
+        Args:
+            settings (OptimizationSettings): Problem description of the optimization
+            rate (float): Snapshots per second
+        """
+        self.settings = settings
+        self.resonator = settings.resonator()
+        self.throttle = Throttle(rate, clock)
+        self.clock = clock
+        self.evaluations = 0
+        self.last_time = clock()
+        self.last_evaluations = 0
+
+    def update(self, run, generation, evaluations, position, value, history, force=False):
+        """
+        Counts evaluations and builds a snapshot when the throttle allows it.
+
+        Args:
+            run (int): Index of the run
+            generation (int): Completed generations of the run
+            evaluations (int): Objective evaluations since the last update call
+            position: Best particle of the run so far
+            value (float): Its fitness
+            history: Best fitness per generation of the run
+            force (bool): Snapshot regardless of the rate, e.g. at the end of a run
+
+        Returns:
+            dict: run, generation, best_fitness, best_position, waist (sag, tan),
+            stability (sag, tan), evaluations_per_second and history, or None
+        """
+        self.evaluations += evaluations
+        if not self.throttle.ready(force):
+            return None
+        now = self.clock()
+        elapsed = now - self.last_time
+        rate = (self.evaluations - self.last_evaluations) / elapsed if elapsed > 0 else 0.0
+        self.last_time, self.last_evaluations = now, self.evaluations
+
+        position = [float(p) for p in position]
+        waist_sag, waist_tan, m_sag, m_tan = fitness.evaluate(
+            self.resonator, position, self.settings.mirror_curvatures,
+            self.settings.nc, self.settings.lc, self.settings.n_prop, self.settings.wavelength)
+        return {
+            "run": run,
+            "generation": generation,
+            "best_fitness": float(value),
+            "best_position": position,
+            "waist": (float(waist_sag), float(waist_tan)),
+            "stability": (float(m_sag), float(m_tan)),
+            "evaluations_per_second": rate,
+            "history": np.array(history, dtype=np.float64),
+        }
@@ -0,0 +1,424 @@
+import ast
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
+from numba import njit
+from src_resonator import fitness
+from src_resonator.stability import DEGREE
+
+# Elementarten der Umlaufmatrix, siehe CompiledTopology.elements
+FREE_SPACE_ELEMENT = 0
+THIN_ELEMENT = 1
+# Funktionen und Konstanten, die in Längen, Winkeln und Nebenbedingungen erlaubt sind
+FUNCTIONS = ("sin", "cos", "tan", "sqrt")
+CONSTANTS = {"pi": math.pi}
+
+
+@dataclass(frozen=True)
+class Topology:
+    """
+    Ring or linear cavity as an ordered list of roundtrip elements.
+
+    The roundtrip starts in the center of the crystal. Elements are
+    ("crystal", length) and ("space", length) for free space in the crystal
+    and in the propagation medium, and ("mirror", slot, angle) for the
+    library mirror slot (0 .. mirror_count - 1) at the given angle of
+    incidence. Plane mirrors at normal incidence do not change the
+    roundtrip and are left out. Lengths and angles are arithmetic
+    expressions (Python syntax, with FUNCTIONS and pi) of the variables,
+    the crystal length lc and the constraints.
+
+    Attributes:
+        name (str): Name in the resonator window and in jobs
+        variables (tuple): Continuous particle coordinates, the mirror indices follow
+        mirror_count (int): Number of mirrors taken from the library
+        elements (tuple): Roundtrip elements, see above
+        constraints (tuple): (name, expression) of derived quantities, e.g.
+            the arm that closes a ring, later ones may use earlier ones
+        angles (tuple): Variables that are angles (radians in the particle,
+            full angle in degrees in jobs and in the window)
+        fold_angle (str): Angle of incidence on the folding mirrors, Pareto
+            objective and shown as full angle
+        picture (str): Layout picture in assets, empty for none
+        picture_height (int): Height of the picture in the window
+    """
+    name: str
+    variables: tuple
+    mirror_count: int
+    elements: tuple
+    constraints: tuple = ()
+    angles: tuple = ()
+    fold_angle: str = "0"
+    picture: str = ""
+    picture_height: int = 200
+
+
+@njit(cache=True)
+def topology_roundtrip_batch(kinds, columns, media, slots, lengths, cosines, radii, nc, n0, out):
+    """
+    Roundtrips of a whole population for any element list, both planes in
+    scalar arithmetic.
+
+    Args:
+        kinds: (E,) FREE_SPACE_ELEMENT or THIN_ELEMENT
+        columns: (E,) column of lengths (free space) or cosines (mirrors)
+        media: (E,) 1 for crystal, 0 for the propagation medium
+        slots: (E,) mirror slot, radii columns 2 * slot and 2 * slot + 1
+        lengths: (N, L) free space lengths per particle
+        cosines: (N, A) cosines of the angles of incidence per particle
+        radii: (N, 2 * mirror_count) r1_sag, r1_tan, r2_sag, r2_tan, ...
+        out: (N, 8) result, (A, B, C, D) sagittal followed by tangential
+    """
+    for i in range(out.shape[0]):
+        As, Bs, Cs, Ds = 1.0, 0.0, 0.0, 1.0
+        At, Bt, Ct, Dt = 1.0, 0.0, 0.0, 1.0
+        for e in range(kinds.shape[0]):
+            if kinds[e] == FREE_SPACE_ELEMENT:
+                # [[1, d], [0, 1]] @ M
+                d = lengths[i, columns[e]] / (nc if media[e] else n0)
+                As, Bs = As + d * Cs, Bs + d * Ds
+                At, Bt = At + d * Ct, Bt + d * Dt
+            else:
+                # [[1, 0], [c, 1]] @ M, c = -2 cos(theta) / R bzw. -2 / (R cos(theta))
+                cos = cosines[i, columns[e]]
+                cs = (-2 * cos) / radii[i, 2 * slots[e]]
+                ct = -2 / (radii[i, 2 * slots[e] + 1] * cos)
+                Cs, Ds = Cs + cs * As, Ds + cs * Bs
+                Ct, Dt = Ct + ct * At, Dt + ct * Bt
+        out[i, 0], out[i, 1], out[i, 2], out[i, 3] = As, Bs, Cs, Ds
+        out[i, 4], out[i, 5], out[i, 6], out[i, 7] = At, Bt, Ct, Dt
+    return out
+
+
+class _Dual:
+    """Value with its gradient over the variables, forward-mode derivatives for the refinement"""
+
+    __slots__ = ("value", "gradient")
+
+    def __init__(self, value, gradient):
+        self.value = value
+        self.gradient = gradient
+
+    @staticmethod
+    def split(x, dimension):
+        """(value, gradient) of a _Dual or a constant"""
+        return (x.value, x.gradient) if isinstance(x, _Dual) else (x, np.zeros(dimension))
+
+    def _other(self, other):
+        return other if isinstance(other, _Dual) else _Dual(other, np.zeros_like(self.gradient))
+
+    def __add__(self, other):
+        other = self._other(other)
+        return _Dual(self.value + other.value, self.gradient + other.gradient)
+
+    def __sub__(self, other):
+        other = self._other(other)
+        return _Dual(self.value - other.value, self.gradient - other.gradient)
+
+    def __mul__(self, other):
+        other = self._other(other)
+        return _Dual(self.value * other.value, self.value * other.gradient + other.value * self.gradient)
+
+    def __truediv__(self, other):
+        other = self._other(other)
+        return _Dual(self.value / other.value,
+                     (self.gradient * other.value - self.value * other.gradient) / other.value**2)
+
+    def __pow__(self, other):
+        other = self._other(other)
+        value = self.value**other.value
+        gradient = other.value * self.value**(other.value - 1) * self.gradient
+        if np.any(other.gradient):
+            gradient = gradient + value * math.log(self.value) * other.gradient
+        return _Dual(value, gradient)
+
+    def __radd__(self, other):
+        return self._other(other) + self
+
+    def __rsub__(self, other):
+        return self._other(other) - self
+
+    def __rmul__(self, other):
+        return self._other(other) * self
+
+    def __rtruediv__(self, other):
+        return self._other(other) / self
+
+    def __rpow__(self, other):
+        return self._other(other)**self
+
+    def __neg__(self):
+        return _Dual(-self.value, -self.gradient)
+
+    def __pos__(self):
+        return self
+
+
+def _dual_function(function, derivative):
+    """Scalar function that also accepts _Dual arguments"""
+    def wrapped(x):
+        if isinstance(x, _Dual):
+            return _Dual(function(x.value), derivative(x.value) * x.gradient)
+        return function(x)
+    return wrapped
+
+
+NUMPY_FUNCTIONS = {"sin": np.sin, "cos": np.cos, "tan": np.tan, "sqrt": np.sqrt}
+DUAL_FUNCTIONS = {
+    "sin": _dual_function(math.sin, math.cos),
+    "cos": _dual_function(math.cos, lambda x: -math.sin(x)),
+    "tan": _dual_function(math.tan, lambda x: 1 / math.cos(x)**2),
+    "sqrt": _dual_function(math.sqrt, lambda x: 0.5 / math.sqrt(x)),
+}
+
+
+class _Expression:
+    """Parsed and compiled arithmetic expression of a Topology"""
+
+    _operators = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd)
+
+    def __init__(self, expression, names):
+        """
+        Args:
+            expression: Number or string
+            names: Names the expression may use besides FUNCTIONS and CONSTANTS
+
+        Raises:
+            ValueError: If the expression is not valid.
+        """
+        try:
+            self.tree = ast.parse(str(expression).strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression '{expression}': {e.msg}")
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.Name):
+                valid = node.id in names or node.id in CONSTANTS or node.id in FUNCTIONS
+            elif isinstance(node, ast.Call):
+                valid = isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS \
+                    and len(node.args) == 1 and not node.keywords
+            elif isinstance(node, ast.Constant):
+                valid = isinstance(node.value, (int, float))
+            else:
+                valid = isinstance(node, (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Load) + self._operators)
+            if not valid:
+                raise ValueError(f"Invalid expression '{expression}': '{ast.unparse(node)}' is not allowed.")
+        self.key = ast.dump(self.tree)
+        self.code = compile(self.tree, "<topology>", "eval")
+
+    def __call__(self, namespace):
+        return eval(self.code, {"__builtins__": {}}, namespace)
+
+    def degree(self, variable, degrees):
+        """
+        Polynomial degree in variable, None if not polynomial.
+
+        Args:
+            degrees: Degrees of the constraint names in variable
+        """
+        def degree(node):
+            if isinstance(node, ast.Expression):
+                return degree(node.body)
+            if isinstance(node, ast.Constant):
+                return 0
+            if isinstance(node, ast.Name):
+                return 1 if node.id == variable else degrees.get(node.id, 0)
+            if isinstance(node, ast.UnaryOp):
+                return degree(node.operand)
+            if isinstance(node, ast.Call):
+                return 0 if degree(node.args[0]) == 0 else None
+            left, right = degree(node.left), degree(node.right)
+            if left is None or right is None:
+                return None
+            if isinstance(node.op, (ast.Add, ast.Sub)):
+                return max(left, right)
+            if isinstance(node.op, ast.Mult):
+                return left + right
+            if isinstance(node.op, ast.Div):
+                return left if right == 0 else None
+            # Potenz: nur mit konstantem, ganzzahligem Exponenten ein Polynom
+            if left == 0 and right == 0:
+                return 0
+            exponent = node.right
+            if isinstance(exponent, ast.Constant) and float(exponent.value).is_integer() and exponent.value >= 0:
+                return left * int(exponent.value)
+            return None
+        return degree(self.tree)
+
+
+def _unique(expressions, expression):
+    """Index of an expression with the same syntax tree in the list, appended if new"""
+    keys = [e.key for e in expressions]
+    if expression.key not in keys:
+        expressions.append(expression)
+        keys.append(expression.key)
+    return keys.index(expression.key)
+
+
+def _columns(values, rows):
+    """(rows, count) array of evaluated expressions, constants broadcast to all rows"""
+    out = np.empty((rows, len(values)))
+    for column, value in enumerate(values):
+        out[:, column] = value
+    return out
+
+
+class CompiledTopology:
+    """
+    Roundtrip kernel and variable layout of a Topology, see compile_topology.
+
+    The length and angle expressions are evaluated vectorized with numpy,
+    the matrix chain runs in the shared compiled kernel
+    topology_roundtrip_batch. Gradients for the refinement (elements) come
+    from forward-mode differentiation of the same expressions.
+    """
+
+    def __init__(self, topology):
+        """
+        Raises:
+            ValueError: If an element, a mirror slot or an expression is invalid.
+        """
+        self.topology = topology
+        self.name = topology.name
+        self.variables = tuple(topology.variables)
+        self.mirror_count = int(topology.mirror_count)
+
+        names = set(self.variables) | {"lc"}
+        self.constraints = []
+        for name, expression in topology.constraints:
+            self.constraints.append((name, _Expression(expression, names)))
+            names.add(name)
+
+        lengths, angles, kinds, columns, media, slots = [], [], [], [], [], []
+        for element in topology.elements:
+            kind = element[0]
+            if kind in ("space", "crystal"):
+                kinds.append(FREE_SPACE_ELEMENT)
+                columns.append(_unique(lengths, _Expression(element[1], names)))
+                media.append(kind == "crystal")
+                slots.append(0)
+            elif kind == "mirror":
+                slot = int(element[1])
+                if not 0 <= slot < self.mirror_count:
+                    raise ValueError(f"{topology.name}: mirror slot {slot} outside 0 .. {self.mirror_count - 1}.")
+                kinds.append(THIN_ELEMENT)
+                columns.append(_unique(angles, _Expression(element[2], names)))
+                media.append(False)
+                slots.append(slot)
+            else:
+                raise ValueError(f"{topology.name}: unknown element '{kind}'.")
+        self.lengths = lengths
+        self.angles = angles
+        self.kinds = np.array(kinds, dtype=np.int64)
+        self.columns = np.array(columns, dtype=np.int64)
+        self.media = np.array(media, dtype=np.int64)
+        self.slots = np.array(slots, dtype=np.int64)
+        self.fold = _Expression(topology.fold_angle, names)
+        self.quantity_names = self.variables + tuple(name for name, _ in self.constraints)
+
+        # Stabilitäts-Screening über l1 braucht A + D als Polynom vom Grad <= DEGREE in l1
+        self.screen_variable = None
+        if "l1" in self.variables:
+            degrees = {}
+            for name, expression in self.constraints:
+                degrees[name] = expression.degree("l1", degrees)
+            spaces = [lengths[c].degree("l1", degrees) for k, c in zip(kinds, columns) if k == FREE_SPACE_ELEMENT]
+            if all(angle.degree("l1", degrees) == 0 for angle in angles) \
+                    and all(d is not None and d <= 1 for d in spaces) and sum(d == 1 for d in spaces) <= DEGREE:
+                self.screen_variable = "l1"
+
+    def namespace(self, values, lc, functions=NUMPY_FUNCTIONS):
+        """Names of the expressions: variables (values in their order), lc, constraints, functions and constants"""
+        namespace = {**CONSTANTS, **functions, "lc": lc, **dict(zip(self.variables, values))}
+        for name, expression in self.constraints:
+            namespace[name] = expression(namespace)
+        return namespace
+
+    def roundtrip(self, nc, lc, n0, *args):
+        """Roundtrip (A, B, C, D) sagittal followed by tangential for the variables followed by the radii"""
+        k = len(self.variables)
+        out = self.roundtrip_batch(nc, lc, n0, np.array([args[:k]]), np.array([args[k:]]))
+        return tuple(out[0])
+
+    def roundtrip_batch(self, nc, lc, n0, x, radii):
+        """
+        Roundtrips of a whole population.
+
+        Args:
+            x: (N, len(variables)) array of the continuous coordinates
+            radii: (N, 2 * mirror_count) array, r1_sag, r1_tan, r2_sag, r2_tan, ...
+
+        Returns:
+            numpy.ndarray: (N, 8) array, (A, B, C, D) sagittal followed by tangential
+        """
+        x = np.asarray(x, dtype=np.float64)
+        radii = np.ascontiguousarray(radii, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            namespace = self.namespace(x.T, lc)
+            lengths = _columns([e(namespace) for e in self.lengths], len(x))
+            # Jeder Winkel kommt meist mehrfach vor, der Kosinus wird einmal pro Spalte berechnet
+            cosines = np.cos(_columns([e(namespace) for e in self.angles], len(x)))
+        out = np.empty((x.shape[0], 8), dtype=np.float64)
+        return topology_roundtrip_batch(self.kinds, self.columns, self.media, self.slots, lengths, cosines, radii,
+                                        float(nc), float(n0), out)
+
+    def elements(self, nc, lc, n0, x, radii):
+        """
+        Roundtrip elements with gradients over the variables as
+        (kind, (value sagittal, value tangential), (gradient sagittal,
+        gradient tangential)): the reduced length L / n for free space, the
+        lower left entry c of [[1, 0], [c, 1]] for mirrors.
+        """
+        k = len(self.variables)
+        unit = np.eye(k)
+        namespace = self.namespace([_Dual(float(v), unit[i]) for i, v in enumerate(x)], lc, DUAL_FUNCTIONS)
+        lengths = [_Dual.split(e(namespace), k) for e in self.lengths]
+        angles = [_Dual.split(e(namespace), k) for e in self.angles]
+        elements = []
+        for kind, column, medium, slot in zip(self.kinds, self.columns, self.media, self.slots):
+            if kind == FREE_SPACE_ELEMENT:
+                n = nc if medium else n0
+                length, gradient = lengths[column]
+                gradient = np.asarray(gradient, dtype=np.float64) / n
+                elements.append((kind, (length / n,) * 2, (gradient, gradient)))
+            else:
+                theta, gradient = angles[column]
+                r_sag, r_tan = radii[2 * slot], radii[2 * slot + 1]
+                gradient = np.asarray(gradient, dtype=np.float64)
+                c_sag = (-2 * math.cos(theta)) / r_sag
+                c_tan = -2 / (r_tan * math.cos(theta))
+                dc_sag = (2 * math.sin(theta)) / r_sag
+                dc_tan = (-2 * math.sin(theta)) / (r_tan * math.cos(theta)**2)
+                elements.append((kind, (c_sag, c_tan), (dc_sag * gradient, dc_tan * gradient)))
+        return elements
+
+    def roundtrip_length(self, lc, x):
+        """Geometric roundtrip length per row of the (N, len(variables)) array x"""
+        x = np.asarray(x, dtype=np.float64)
+        namespace = self.namespace(x.T, lc)
+        lengths = _columns([e(namespace) for e in self.lengths], len(x))
+        return lengths[:, self.columns[self.kinds == FREE_SPACE_ELEMENT]].sum(axis=1)
+
+    def fold_angle(self, x):
+        """Angle of incidence on the folding mirrors per row of x"""
+        x = np.asarray(x, dtype=np.float64)
+        return np.broadcast_to(self.fold(self.namespace(x.T, 0.0)), (len(x),)).astype(np.float64)
+
+    def quantities(self, lc, x):
+        """Variables and constraints of one particle by name, e.g. {"l1": ..., "l2": ...}"""
+        namespace = self.namespace([float(v) for v in x], lc)
+        return {name: float(namespace[name]) for name in self.quantity_names}
+
+    def set_problem_dimension(self):
+        self.dimension = len(self.variables) + self.mirror_count
+        return self.dimension
+
+    def set_fitness(self, waist_sag, waist_tan, target_sag, target_tan):
+        """Fitness value of the waists, the smaller waist counts double (see fitness.weighted_fitness)"""
+        return float(fitness.weighted_fitness(waist_sag, waist_tan, target_sag, target_tan)),
+
+
+@lru_cache(maxsize=None)
+def compile_topology(topology):
+    """CompiledTopology of a Topology, compiled once per process"""
+    return CompiledTopology(topology)
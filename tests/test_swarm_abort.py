@@ -0,0 +1,52 @@
+"""
+Aborting a multi-worker optimization stops the runs that have already
+started and leaves no worker processes behind.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import multiprocessing
+import sys
+import time
+from dataclasses import replace
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+import numpy as np
+from src_resonator.settings import OptimizationSettings
+from src_resonator.swarm import iter_runs
+
+JOB = {
+    "resonator_type": "BowTie",
+    "mirrors": path.join(path.dirname(path.dirname(path.abspath(__file__))), "Library", "Mirrors.json"),
+    "target_sag": "21 µm",
+    "target_tan": "577 µm",
+    "wavelength": "514 nm",
+    "crystal_length": "10 mm",
+    "crystal_index": 1.675,
+    "bounds": {"l1": ["40 mm", "100 mm"], "l3": ["50 mm", "150 mm"], "theta": [0, 60]},
+}
+# Zeit für den Start der Worker (spawn, Import von numpy/numba) und bis zum Ende nach dem Abbruch
+STARTUP = 15.0
+EXIT_TIMEOUT = 5.0
+
+
+def test_abort_stops_running_workers():
+    # Budget, das ohne Abbruch viele Minuten dauern würde
+    settings = replace(OptimizationSettings.from_job(JOB), num_runs=2, population_number=200,
+                       generation_number=10**7)
+    t_start = time.time()
+    aborted = []
+
+    def should_stop():
+        if time.time() - t_start > STARTUP:
+            aborted.append(aborted[0] if aborted else time.time())
+            return True
+        return False
+
+    results = list(iter_runs(settings, np.random.SeedSequence(0).spawn(2), workers=2, should_stop=should_stop))
+
+    assert results == []
+    assert time.time() - aborted[0] < EXIT_TIMEOUT
+    assert multiprocessing.active_children() == []